@@ -1,23 +1,100 @@
 # db.py
-from neo4j import GraphDatabase
+from neo4j import AsyncDriver, AsyncGraphDatabase, GraphDatabase
+from typing import Any, Dict, Optional
+import asyncio
 import os
 from dotenv import load_dotenv
+from app.utils.logger import get_logger
 
 load_dotenv()
 
+logger = get_logger(__name__)
+
 NEO4J_URI = os.getenv("NEO4J_URI")
 NEO4J_USER = os.getenv("NEO4J_USER")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
 
-# Initialize Neo4j driver
-driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+# Pool tuning; the defaults are the driver's own except where noted
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "100"))
+# Seconds a request may wait for a pooled connection before failing
+NEO4J_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "60"))
+NEO4J_CONNECTION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_TIMEOUT", "30"))
+# Recycle connections before load balancers or firewalls silently drop them
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+# Records pulled per round-trip while a result is consumed
+NEO4J_FETCH_SIZE = int(os.getenv("NEO4J_FETCH_SIZE", "1000"))
+# Connections opened at startup so the first requests do not pay for the handshakes
+NEO4J_WARM_CONNECTIONS = int(os.getenv("NEO4J_WARM_CONNECTIONS", "4"))
+
+# Async driver, opened and closed by the app lifespan. Requests wait on its
+# connection pool rather than on threadpool threads. Everything that talks to
+# Neo4j goes through get_driver(), so there is a single pool per process.
+driver: Optional[AsyncDriver] = None
+
+async def init_driver() -> AsyncDriver:
+    global driver
+    if driver is None:
+        driver = AsyncGraphDatabase.driver(
+            NEO4J_URI,
+            auth=(NEO4J_USER, NEO4J_PASSWORD),
+            max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+            connection_acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT,
+            connection_timeout=NEO4J_CONNECTION_TIMEOUT,
+            max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME,
+            fetch_size=NEO4J_FETCH_SIZE,
+        )
+        await warm_pool(driver, min(NEO4J_WARM_CONNECTIONS, NEO4J_MAX_POOL_SIZE))
+    return driver
+
+async def ping(target: AsyncDriver) -> None:
+    async with target.session() as session:
+        result = await session.run("RETURN 1")
+        await result.consume()
+
+async def warm_pool(target: AsyncDriver, connections: int):
+    """Open `connections` pooled connections at once; failures are logged, not raised."""
+    if connections <= 0:
+        return
+    results = await asyncio.gather(*(ping(target) for _ in range(connections)), return_exceptions=True)
+    failed = [r for r in results if isinstance(r, Exception)]
+    if failed:
+        logger.warning(f"Neo4j pool warm-up: {len(failed)} of {connections} connections failed: {failed[0]}")
+    else:
+        logger.info(f"Neo4j pool warmed with {connections} connections")
+
+def pool_usage() -> Optional[Dict[str, Any]]:
+    """
+    Connections checked out and idle per server address. Read from driver
+    internals, so None when the driver is closed or its layout has moved.
+    """
+    pool = getattr(driver, "_pool", None)
+    try:
+        addresses = {}
+        for address, connections in list(pool.connections.items()):
+            busy = sum(1 for connection in list(connections) if connection.in_use)
+            addresses[str(address)] = {"in_use": busy, "idle": len(connections) - busy}
+        return {"max_size": pool.pool_config.max_connection_pool_size, "addresses": addresses}
+    except AttributeError:
+        return None
+
+async def close_driver():
+    global driver
+    if driver is not None:
+        await driver.close()
+        driver = None
+
+def get_driver() -> AsyncDriver:
+    if driver is None:
+        raise RuntimeError("Neo4j driver is not initialised; it is opened in the app lifespan")
+    return driver
 
 def test_connection():
     """Simple function to test Neo4j connectivity"""
     try:
-        with driver.session() as session:
-            result = session.run("RETURN 'Neo4j connection successful' AS message")
-            message = result.single()["message"]
-            return message
+        with GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD)) as sync_driver:
+            with sync_driver.session() as session:
+                result = session.run("RETURN 'Neo4j connection successful' AS message")
+                message = result.single()["message"]
+                return message
     except Exception as e:
         return str(e)
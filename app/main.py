@@ -1,8 +1,19 @@
-from fastapi import FastAPI
-from app.routes import user, leads, accounts, opportunities, deals, activities
+from fastapi import Depends, FastAPI, Response
+from app.routes import user, leads, accounts, opportunities, deals, activities, admin, analytics, changes, health, batch
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+import asyncio
 from contextlib import asynccontextmanager
-from app.utils.logger import get_logger
+from app.utils.logger import RequestIdMiddleware, get_logger
+from app.db import init_driver, close_driver
+from app.schema import ensure_schema
+from app.repositories.registry import repos, require_neo4j
+from app.utils.changes import CHANGE_SEQUENCE_INTERVAL, change_sequencer, sequence_forever
+from app.utils.coalescer import drain_coalescers
+from app.utils.metrics import MetricsMiddleware
+from app.utils.rollups import RECONCILE_INTERVAL, reconcile_forever
+from app.utils.scoring import SCORING_INTERVAL, score_forever
+from app.utils.slow_queries import slow_queries
 
 logger = get_logger(__name__)
 
@@ -14,6 +25,21 @@ __version__ = "0.0.1"
 async def lifespan(app: FastAPI):
     # Startup event
     logger.info("App is starting up...")
+    background = []
+    # The in-memory backend serves the entity routes without a database
+    if repos.backend == "neo4j":
+        driver = await init_driver()
+        try:
+            app.state.schema_report = await ensure_schema(driver)
+        except Exception as e:
+            # Keep serving; queries still work, just without the guaranteed indexes
+            logger.error(f"Schema bootstrap failed: {e}")
+        if RECONCILE_INTERVAL > 0:
+            background.append(asyncio.create_task(reconcile_forever(RECONCILE_INTERVAL)))
+        if SCORING_INTERVAL > 0:
+            background.append(asyncio.create_task(score_forever(SCORING_INTERVAL)))
+        if CHANGE_SEQUENCE_INTERVAL > 0:
+            background.append(asyncio.create_task(sequence_forever(CHANGE_SEQUENCE_INTERVAL)))
     try:
         yield
     except Exception as e:
@@ -22,10 +48,19 @@ async def lifespan(app: FastAPI):
         raise  # Ensure the exception is still raised
     finally:
         # Shutdown event
+        for task in background:
+            task.cancel()
+        # Queued creates still have callers waiting; write them before the driver goes
+        await drain_coalescers()
+        await change_sequencer.drain()
+        await slow_queries.close()
+        await close_driver()
         logger.info("App is shutting down...")
         
 app = FastAPI(title="CRM System API", version=__version__, lifespan=lifespan)
 
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -40,7 +75,16 @@ app.include_router(accounts.router, prefix="/accounts", tags=["Accounts"])
 app.include_router(opportunities.router, prefix="/opportunities", tags=["Opportunities"])
 app.include_router(deals.router, prefix="/deals", tags=["Deals"])
 app.include_router(activities.router, prefix="/activities", tags=["Activities"])
+app.include_router(changes.router, prefix="/changes", tags=["Changes"], dependencies=[Depends(require_neo4j)])
+app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"], dependencies=[Depends(require_neo4j)])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+app.include_router(health.router, tags=["Health"])
+app.include_router(batch.router, tags=["Batch"])
 
 @app.get("/")
 def root():
     return {"message": "CRM API is running"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
+from app.models.timestamps import Timestamps
 
 class AccountBase(BaseModel):
     name: str
@@ -16,7 +17,7 @@ class AccountUpdate(BaseModel):
     size: Optional[str] = None
     revenue: Optional[float] = None
 
-class Account(AccountBase):
+class Account(AccountBase, Timestamps):
     id: str
 
     class Config:
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
+from app.models.timestamps import Timestamps
 
 class ActivityBase(BaseModel):
     type: str  # call, email, meeting, note
@@ -20,7 +21,7 @@ class ActivityUpdate(BaseModel):
     duration: Optional[float] = None
     channel: Optional[str] = None
 
-class Activity(ActivityBase):
+class Activity(ActivityBase, Timestamps):
     id: str
     user_id: str
     lead_id: str
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import List
+
+class DealStatusRollup(BaseModel):
+    status: str
+    count: int
+    total_amount: float
+
+class OpportunityStageRollup(BaseModel):
+    stage: str
+    count: int
+    total_value: float
+    weighted_value: float  # sum of estimated_value * probability
+
+class LeadRollup(BaseModel):
+    region: str
+    status: str
+    source: str
+    count: int
+    total_value: float
+
+class PipelineSummary(BaseModel):
+    deals_by_status: List[DealStatusRollup]
+    opportunities_by_stage: List[OpportunityStageRollup]
+    leads: List[LeadRollup]
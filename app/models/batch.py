@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Generic, List, Literal, Optional, TypeVar
+
+T = TypeVar("T")
+
+MAX_BATCH_IDS = 500
+
+class BatchGetRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_IDS)
+
+class BatchGetResult(BaseModel, Generic[T]):
+    items: List[T]  # in request order, duplicates removed
+    missing: List[str]  # requested ids that do not exist
+
+MAX_BATCH_OPERATIONS = 100
+
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "link"]
+    entity: Literal["user", "lead", "account", "opportunity", "deal", "activity"]
+    # Target of update/link; for create, defaults to data.id or a generated id
+    id: Optional[str] = None
+    # Later operations may use "$<ref>" for this operation's id, in `id` or as any value in `data`
+    ref: Optional[str] = Field(None, pattern=r"^[A-Za-z_][\w-]*$")
+    # Fields to create or update; link takes {"account_id": ...}
+    data: Dict[str, Any] = {}
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+class BatchOperationResult(BaseModel):
+    index: int
+    op: str
+    entity: str
+    id: str
+    ref: Optional[str] = None
+    item: Optional[Dict[str, Any]] = None  # the created or updated row; None for links
+
+class BatchResponse(BaseModel):
+    results: List[BatchOperationResult]  # one per operation, in request order
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class BulkRowResult(BaseModel):
+    index: int  # position of the row in the request body
+    id: Optional[str] = None
+    status: str  # upserted, invalid, not_found, failed
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BulkRowResult]
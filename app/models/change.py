@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List
+
+class ChangeEvent(BaseModel):
+    seq: int
+    entity: str  # user, lead, account, opportunity, deal, activity
+    id: str
+    op: str  # upsert, update, link
+    fields: List[str]
+    at: str  # ISO timestamp of the write
+
+class ChangePage(BaseModel):
+    items: List[ChangeEvent]
+    next_since: int  # pass as `since` to continue after this page
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
+from app.models.timestamps import Timestamps
 
 class DealBase(BaseModel):
     name: str
@@ -17,7 +18,7 @@ class DealUpdate(BaseModel):
     status: Optional[str] = None
     closed_date: Optional[str] = None
 
-class Deal(DealBase):
+class Deal(DealBase, Timestamps):
     id: str
     opportunity_id: str
 
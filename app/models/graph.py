@@ -0,0 +1,19 @@
+from typing import List, Optional
+from app.models.account import Account
+from app.models.activity import Activity
+from app.models.deal import Deal
+from app.models.lead import Lead
+from app.models.opportunity import Opportunity
+
+# Nested lists are None when the requested depth stopped above them,
+# and [] when that level was fetched but is empty.
+
+class OpportunityGraph(Opportunity):
+    deals: Optional[List[Deal]] = None
+
+class LeadGraph(Lead):
+    opportunities: Optional[List[OpportunityGraph]] = None
+    activities: Optional[List[Activity]] = None
+
+class AccountGraph(Account):
+    leads: Optional[List[LeadGraph]] = None
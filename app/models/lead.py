@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional
+from app.models.timestamps import Timestamps
 
 class LeadBase(BaseModel):
     name: str
@@ -24,7 +25,7 @@ class LeadUpdate(BaseModel):
     assigned_to: Optional[str] = None
     account_id: Optional[str] = None
 
-class Lead(LeadBase):
+class Lead(LeadBase, Timestamps):
     id: str
     assigned_to: Optional[str] = None
     account_id: Optional[str] = None
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
+from app.models.timestamps import Timestamps
 
 class OpportunityBase(BaseModel):
     name: str
@@ -19,7 +20,7 @@ class OpportunityUpdate(BaseModel):
     probability: Optional[float] = None
     expected_close_date: Optional[str] = None
 
-class Opportunity(OpportunityBase):
+class Opportunity(OpportunityBase, Timestamps):
     id: str
     lead_id: str
 
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+class ScoringRun(BaseModel):
+    scored: int
+    batches: int
+    seconds: float
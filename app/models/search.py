@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+class SearchHit(BaseModel, Generic[T]):
+    item: T
+    score: float  # full-text relevance, higher is better
@@ -0,0 +1,14 @@
+from datetime import datetime
+from pydantic import BaseModel, field_validator
+from typing import Optional
+
+class Timestamps(BaseModel):
+    # Maintained by the server on every MERGE/SET; never taken from clients
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @field_validator("created_at", "updated_at", mode="before")
+    @classmethod
+    def from_neo4j(cls, value):
+        # neo4j.time.DateTime is not a datetime subclass
+        return value.to_native() if hasattr(value, "to_native") else value
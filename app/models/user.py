@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional
+from app.models.timestamps import Timestamps
 
 class UserBase(BaseModel):
     name: str
@@ -16,7 +17,7 @@ class UserUpdate(BaseModel):
     region: Optional[str] = None
     email: Optional[EmailStr] = None
 
-class User(UserBase):
+class User(UserBase, Timestamps):
     id: str
 
     class Config:
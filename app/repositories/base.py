@@ -0,0 +1,113 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Generic, List, Optional, Type, TypeVar
+from pydantic import BaseModel
+from app.models.account import Account
+from app.models.activity import Activity
+from app.models.batch import BatchGetResult
+from app.models.bulk import BulkResult, BulkRowResult
+from app.models.deal import Deal
+from app.models.graph import AccountGraph
+from app.models.lead import Lead
+from app.models.opportunity import Opportunity
+from app.models.page import Page
+from app.models.search import SearchHit
+from app.models.user import User
+from app.utils.bulk import Rows
+from app.utils.filters import ListQuery
+
+M = TypeVar("M", bound=BaseModel)
+
+RowResults = List[Optional[BulkRowResult]]
+Fields = Optional[List[str]]
+
+
+class Repository(ABC, Generic[M]):
+    """
+    Storage for one entity, as the routers use it. Implementations return
+    API models and None (or False) for missing rows; HTTP errors stay in
+    the routers.
+
+    Reads that take `fields` (a parse_fields() selection) return the
+    sparse_model() for it and should only fetch what those fields need.
+    """
+
+    entity: str
+    model: Type[M]
+    # Bulk result message for rows dropped because a required related node is missing
+    not_found = "Row was not written"
+
+    @abstractmethod
+    async def create(self, data: Dict) -> Optional[M]:
+        """Upsert by id; None when a required related node does not exist."""
+
+    @abstractmethod
+    async def bulk_upsert(self, rows: Rows, results: RowResults, batch_size: int) -> BulkResult:
+        """Upsert already validated rows, filling in `results` for each of them."""
+
+    @abstractmethod
+    async def get(self, item_id: str, fields: Fields = None) -> Optional[M]:
+        ...
+
+    @abstractmethod
+    async def get_many(self, ids: List[str]) -> BatchGetResult[M]:
+        ...
+
+    @abstractmethod
+    async def list(self, q: ListQuery, limit: int, fields: Fields = None) -> Page[M]:
+        ...
+
+    @abstractmethod
+    def stream(self, q: ListQuery, fields: Fields = None) -> AsyncIterator[M]:
+        """Every row after the cursor that passes the filters, in list order."""
+
+    @abstractmethod
+    async def search(self, text: str, limit: int) -> List[SearchHit[M]]:
+        ...
+
+    @abstractmethod
+    async def update(self, item_id: str, updates: Dict) -> Optional[M]:
+        ...
+
+
+class LinksToAccount(ABC):
+    @abstractmethod
+    async def link_account(self, item_id: str, account_id: str) -> bool:
+        """False when either side does not exist."""
+
+
+class UserRepository(Repository[User]):
+    entity = "user"
+    model = User
+
+
+class LeadRepository(Repository[Lead], LinksToAccount):
+    entity = "lead"
+    model = Lead
+
+
+class AccountRepository(Repository[Account]):
+    entity = "account"
+    model = Account
+
+    @abstractmethod
+    async def graph(self, account_id: str, depth: int, max_leads: int, max_opportunities: int,
+                    max_activities: int, max_deals: int) -> Optional[AccountGraph]:
+        """Account 360; see GET /accounts/{id}/graph for what each depth adds."""
+
+
+class OpportunityRepository(Repository[Opportunity], LinksToAccount):
+    entity = "opportunity"
+    model = Opportunity
+    not_found = "Lead not found for this opportunity"
+
+
+class DealRepository(Repository[Deal], LinksToAccount):
+    entity = "deal"
+    model = Deal
+    not_found = "Opportunity not found for this deal"
+
+
+class ActivityRepository(Repository[Activity]):
+    entity = "activity"
+    model = Activity
+    not_found = "Lead or User not found for this activity"
@@ -0,0 +1,303 @@
+import bisect
+import copy
+from collections import defaultdict
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple, TypeVar
+from app.models.batch import BatchGetResult
+from app.models.bulk import BulkResult
+from app.models.graph import AccountGraph
+from app.models.page import Page
+from app.models.search import SearchHit
+from app.repositories.base import (
+    AccountRepository, ActivityRepository, DealRepository, Fields, LeadRepository, M, OpportunityRepository,
+    Repository, RowResults, Rows, UserRepository,
+)
+from app.utils.bulk import write_bulk
+from app.utils.fast_json import to_model
+from app.utils.fields import sparse_model
+from app.utils.filters import ListQuery
+
+NodeKey = Tuple[str, str]  # (label, id)
+T = TypeVar("T")
+
+# Properties with a value -> ids index per label; the list filters that use equality
+INDEXED_FIELDS = {
+    "User": ("region", "role"),
+    "Lead": ("status", "source"),
+    "Account": ("industry", "size"),
+    "Opportunity": ("stage",),
+    "Deal": ("status",),
+    "Activity": ("type", "channel"),
+}
+
+
+class MemoryGraph:
+    """
+    Process-local property graph with the same shape as the Neo4j one:
+    nodes by label and id, relationships kept as adjacency maps in both
+    directions, a sorted id list per label for keyset paging and secondary
+    indexes on the INDEXED_FIELDS. Nothing in it awaits, so every call runs
+    to completion on the event loop without interleaving.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        self.ids: Dict[str, List[str]] = defaultdict(list)
+        self.out: Dict[NodeKey, Dict[str, Dict[NodeKey, None]]] = defaultdict(lambda: defaultdict(dict))
+        self.incoming: Dict[NodeKey, Dict[str, Dict[NodeKey, None]]] = defaultdict(lambda: defaultdict(dict))
+        self.indexes: Dict[Tuple[str, str], Dict[Any, Set[str]]] = defaultdict(lambda: defaultdict(set))
+
+    def node(self, label: str, node_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        return self.nodes[label].get(node_id) if node_id is not None else None
+
+    def merge(self, label: str, node_id: str, props: Dict[str, Any]) -> Dict[str, Any]:
+        node = self.nodes[label].get(node_id)
+        now = datetime.now(timezone.utc)
+        if node is None:
+            node = {"id": node_id, "created_at": now}
+            self.nodes[label][node_id] = node
+            bisect.insort(self.ids[label], node_id)
+        self.set(label, node, {**props, "updated_at": now})
+        return node
+
+    def set(self, label: str, node: Dict[str, Any], props: Dict[str, Any]):
+        indexed = INDEXED_FIELDS.get(label, ())
+        for field, value in props.items():
+            if field in indexed:
+                self.indexes[(label, field)][node.get(field)].discard(node["id"])
+                self.indexes[(label, field)][value].add(node["id"])
+            node[field] = value
+
+    def relate(self, source: NodeKey, rel: str, target: NodeKey):
+        self.out[source][rel][target] = None
+        self.incoming[target][rel][source] = None
+
+    def targets(self, source: NodeKey, rel: str, label: str) -> List[str]:
+        return [node_id for (lbl, node_id) in self.out[source][rel] if lbl == label]
+
+    def sources(self, target: NodeKey, rel: str, label: str) -> List[str]:
+        return [node_id for (lbl, node_id) in self.incoming[target][rel] if lbl == label]
+
+    async def atomic(self, work: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `work` and put the graph back as it was if it raises. Copies the
+        whole graph first, so it is meant for test and benchmark sizes.
+        """
+        saved = copy.deepcopy((self.nodes, self.ids, self.out, self.incoming, self.indexes))
+        try:
+            return await work()
+        except BaseException:
+            self.nodes, self.ids, self.out, self.incoming, self.indexes = saved
+            raise
+
+    def candidates(self, label: str, conditions: List[Tuple[str, str, Any]]) -> Optional[Set[str]]:
+        """Ids allowed by the indexed equality filters; None when no filter can use an index."""
+        found = None
+        for op, field, values in conditions:
+            if op == "in" and field in INDEXED_FIELDS.get(label, ()):
+                index = self.indexes[(label, field)]
+                ids = set().union(*(index.get(value, ()) for value in values))
+                found = ids if found is None else found & ids
+        return found
+
+
+def matches(node: Dict[str, Any], conditions: List[Tuple[str, str, Any]]) -> bool:
+    for op, field, value in conditions:
+        current = node.get(field)
+        if op == "in":
+            if current not in value:
+                return False
+        elif current is None or (current < value if op == ">=" else current > value):
+            return False
+    return True
+
+
+class MemoryRepository(Repository[M]):
+    """
+    Repository over a MemoryGraph. `relations` maps the model's related-id
+    fields to (relationship type, target label, required); a write whose
+    required target is missing is dropped, as the Cypher MATCH would drop it.
+
+    Writes are not recorded in the change feed or the pipeline rollups,
+    which live in Neo4j.
+    """
+
+    label: str
+    relations: Dict[str, Tuple[str, str, bool]] = {}
+    search_fields: Tuple[str, ...] = ("name",)
+
+    def __init__(self, store: MemoryGraph):
+        self.store = store
+
+    def key(self, item_id: str) -> NodeKey:
+        return (self.label, item_id)
+
+    def project(self, node: Dict[str, Any], fields: Fields = None) -> M:
+        """The node as its API model; relationships are only followed for the selected fields."""
+        data = dict(node) if fields is None else {field: node.get(field) for field in fields}
+        for field, (rel, label, _) in self.relations.items():
+            if fields is None or field in fields:
+                targets = self.store.targets(self.key(node["id"]), rel, label)
+                data[field] = targets[0] if targets else None
+        return to_model(sparse_model(self.model, fields), data)
+
+    def write(self, data: Dict) -> Optional[M]:
+        links = {}
+        for field, (rel, label, required) in self.relations.items():
+            if self.store.node(label, data.get(field)) is not None:
+                links[field] = data[field]
+            elif required:
+                return None
+        props = {k: v for k, v in data.items() if k not in self.relations and k not in ("id", "idx")}
+        node = self.store.merge(self.label, data["id"], props)
+        for field, target in links.items():
+            rel, label, _ = self.relations[field]
+            self.store.relate(self.key(node["id"]), rel, (label, target))
+        return self.project(node)
+
+    async def create(self, data: Dict) -> Optional[M]:
+        return self.write(data)
+
+    async def bulk_upsert(self, rows: Rows, results: RowResults, batch_size: int) -> BulkResult:
+        async def write_batch(batch: List[Dict]) -> Set[int]:
+            return {row["idx"] for row in batch if self.write(row) is not None}
+        return await write_bulk(rows, results, batch_size, self.not_found, write_batch)
+
+    async def get(self, item_id: str, fields: Fields = None) -> Optional[M]:
+        node = self.store.node(self.label, item_id)
+        return self.project(node, fields) if node is not None else None
+
+    async def get_many(self, ids: List[str]) -> BatchGetResult[M]:
+        ids = list(dict.fromkeys(ids))
+        nodes = self.store.nodes[self.label]
+        return BatchGetResult(
+            items=[self.project(nodes[item_id]) for item_id in ids if item_id in nodes],
+            missing=[item_id for item_id in ids if item_id not in nodes],
+        )
+
+    def matching(self, q: ListQuery, fields: Fields = None) -> Iterator[M]:
+        """The rows a list query selects, in its order, starting after its cursor."""
+        nodes = self.store.nodes[self.label]
+        candidates = self.store.candidates(self.label, q.conditions)
+        after = q.after
+        if q.sort_field is None:
+            if candidates is None:
+                ids = self.store.ids[self.label]
+                ordered = ids[bisect.bisect_right(ids, after["id"]):] if after else list(ids)
+            else:
+                ordered = sorted(i for i in candidates if not after or i > after["id"])
+        else:
+            field = q.sort_field
+            pool = nodes.values() if candidates is None else (nodes[i] for i in candidates)
+            keyed = sorted(
+                ((node[field], node["id"]) for node in pool if node.get(field) is not None),
+                reverse=q.descending,
+            )
+            if after:
+                seek = (after["v"], after["id"])
+                keyed = [k for k in keyed if (k < seek if q.descending else k > seek)]
+            ordered = [node_id for _, node_id in keyed]
+        for node_id in ordered:
+            node = nodes.get(node_id)
+            if node is not None and matches(node, q.conditions):
+                yield self.project(node, fields)
+
+    async def list(self, q: ListQuery, limit: int, fields: Fields = None) -> Page[M]:
+        return q.page(list(islice(self.matching(q, fields), limit + 1)), limit)
+
+    async def stream(self, q: ListQuery, fields: Fields = None) -> AsyncIterator[M]:
+        for item in self.matching(q, fields):
+            yield item
+
+    async def search(self, text: str, limit: int) -> List[SearchHit[M]]:
+        """Scan scored like the full-text queries: an exact word beats a prefix."""
+        terms = text.lower().split()
+        hits = []
+        for node in self.store.nodes[self.label].values():
+            words = " ".join(str(node.get(f) or "") for f in self.search_fields).lower().split()
+            relevance = sum(
+                2.0 if term in words else 1.0 if any(w.startswith(term) for w in words) else 0.0
+                for term in terms
+            )
+            if relevance:
+                hits.append((relevance, node))
+        hits.sort(key=lambda hit: (-hit[0], hit[1]["id"]))
+        return [SearchHit(item=self.project(node), score=relevance) for relevance, node in hits[:limit]]
+
+    async def update(self, item_id: str, updates: Dict) -> Optional[M]:
+        node = self.store.node(self.label, item_id)
+        if node is None:
+            return None
+        props = {k: v for k, v in updates.items() if k not in self.relations}
+        self.store.set(self.label, node, {**props, "updated_at": datetime.now(timezone.utc)})
+        return self.project(node)
+
+    async def link_account(self, item_id: str, account_id: str) -> bool:
+        node = self.store.node(self.label, item_id)
+        if node is None or self.store.node("Account", account_id) is None:
+            return False
+        self.store.relate(self.key(item_id), "BELONGS_TO", ("Account", account_id))
+        self.store.set(self.label, node, {"updated_at": datetime.now(timezone.utc)})
+        return True
+
+
+class MemoryUserRepository(MemoryRepository, UserRepository):
+    label = "User"
+
+
+class MemoryLeadRepository(MemoryRepository, LeadRepository):
+    label = "Lead"
+    relations = {"assigned_to": ("ASSIGNED_TO", "User", False), "account_id": ("BELONGS_TO", "Account", False)}
+
+
+class MemoryAccountRepository(MemoryRepository, AccountRepository):
+    label = "Account"
+
+    async def graph(self, account_id: str, depth: int, max_leads: int, max_opportunities: int,
+                    max_activities: int, max_deals: int) -> Optional[AccountGraph]:
+        g = self.store
+        account = g.node("Account", account_id)
+        if account is None:
+            return None
+
+        def deals(opportunity_id: str) -> List[Dict]:
+            ids = g.sources(("Opportunity", opportunity_id), "FOR_OPPORTUNITY", "Deal")[:max_deals]
+            return [{**g.node("Deal", i), "opportunity_id": opportunity_id} for i in ids]
+
+        def lead(lead_id: str) -> Dict:
+            key = ("Lead", lead_id)
+            data = {**g.node("Lead", lead_id), "account_id": account_id,
+                    "assigned_to": next(iter(g.targets(key, "ASSIGNED_TO", "User")), None)}
+            if depth >= 2:
+                data["opportunities"] = [
+                    {**g.node("Opportunity", i), "lead_id": lead_id, **({"deals": deals(i)} if depth >= 3 else {})}
+                    for i in g.sources(key, "FOR_LEAD", "Opportunity")[:max_opportunities]
+                ]
+                data["activities"] = [
+                    {**g.node("Activity", i), "lead_id": lead_id,
+                     "user_id": next(iter(g.targets(("Activity", i), "ASSIGNED_TO", "User")), None)}
+                    for i in g.sources(key, "FOR_LEAD", "Activity")[:max_activities]
+                ]
+            return data
+
+        data = dict(account)
+        if depth >= 1:
+            data["leads"] = [lead(i) for i in g.sources(("Account", account_id), "BELONGS_TO", "Lead")[:max_leads]]
+        return AccountGraph(**data)
+
+
+class MemoryOpportunityRepository(MemoryRepository, OpportunityRepository):
+    label = "Opportunity"
+    relations = {"lead_id": ("FOR_LEAD", "Lead", True)}
+
+
+class MemoryDealRepository(MemoryRepository, DealRepository):
+    label = "Deal"
+    relations = {"opportunity_id": ("FOR_OPPORTUNITY", "Opportunity", True)}
+
+
+class MemoryActivityRepository(MemoryRepository, ActivityRepository):
+    label = "Activity"
+    relations = {"lead_id": ("FOR_LEAD", "Lead", True), "user_id": ("ASSIGNED_TO", "User", True)}
+    search_fields = ("type", "note")
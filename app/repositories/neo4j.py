@@ -0,0 +1,473 @@
+from functools import partial
+from typing import AsyncIterator, Dict, List, Optional, Set
+from app.models.batch import BatchGetResult
+from app.models.bulk import BulkResult
+from app.models.graph import AccountGraph
+from app.models.page import Page
+from app.models.search import SearchHit
+from app.repositories.base import (
+    AccountRepository, ActivityRepository, DealRepository, LeadRepository, M, OpportunityRepository,
+    Fields, Repository, RowResults, Rows, UserRepository,
+)
+from app.utils.batch import batch_get
+from app.utils.bulk import write_bulk
+from app.utils.cache import get_cache
+from app.utils.changes import field_names, tracked_write
+from app.utils.coalescer import get_coalescer
+from app.utils.fast_json import to_model
+from app.utils.fields import sparse_model
+from app.utils.filters import ListQuery
+from app.utils.pagination import limit_clause
+from app.utils.query import after_commit, in_transaction, read
+from app.utils.search import search_nodes
+from app.utils.streaming import stream_records
+
+
+class Neo4jRepository(Repository[M]):
+    """
+    Reads and writes one label through query.read() and tracked_write(),
+    with the get-by-id cache in front. Subclasses supply the Cypher:
+
+    - `columns` maps each API model field to its Cypher expression;
+    - `matches` continues from the node bound to `var` to the required
+      parents (MATCH; always run, since they also filter);
+    - `expansions` maps a field to the OPTIONAL MATCH that only it needs,
+      so a `?fields=` selection without it skips the expansion;
+    - `snapshot` is the map of rollup fields, for the labels that have rollups;
+    - `UPSERT` writes one row from parameters, `UPSERT_ROWS` writes `$rows`
+      and must also return `row.idx AS idx`.
+    """
+
+    label: str
+    var: str
+    columns: Dict[str, str]
+    matches = ""
+    expansions: Dict[str, str] = {}
+    snapshot: Optional[str] = None
+    # Page on the label before expanding; only safe when there are no `matches`
+    limit_first = False
+    # Route single creates through a WriteCoalescer when it is enabled
+    coalesce = False
+    UPSERT: str
+    UPSERT_ROWS: str
+
+    def __init__(self):
+        self.cache = get_cache(self.entity)
+        self.writes = get_coalescer(self.entity, self.UPSERT_ROWS) if self.coalesce else None
+
+    def related(self, fields: Fields = None) -> str:
+        """MATCH clauses from `var` to what the projection of `fields` needs."""
+        expansions = [clause for field, clause in self.expansions.items() if fields is None or field in fields]
+        return "\n        ".join(filter(None, [self.matches, *expansions]))
+
+    def projection(self, fields: Fields = None) -> str:
+        """RETURN list for `fields`, or for the whole API model."""
+        return ", ".join(
+            f"{expression} AS {field}" for field, expression in self.columns.items() if fields is None or field in fields
+        )
+
+    async def create(self, data: Dict) -> Optional[M]:
+        # Coalesced creates commit in the coalescer's own transaction
+        if self.writes is not None and self.writes.enabled and not in_transaction():
+            record = await self.writes.submit(data)
+            records = [record] if record else []
+        else:
+            records = await tracked_write(self.entity, "upsert", field_names(data), self.UPSERT, **data)
+        after_commit(partial(self.cache.invalidate, data["id"]))
+        return self.model(**records[0]) if records else None
+
+    async def bulk_upsert(self, rows: Rows, results: RowResults, batch_size: int) -> BulkResult:
+        async def write_batch(batch: List[Dict]) -> Set[int]:
+            fields = field_names(rows[0][1])
+            records = await tracked_write(self.entity, "upsert", fields, self.UPSERT_ROWS, rows=batch)
+            return {record["idx"] for record in records}
+
+        try:
+            return await write_bulk(rows, results, batch_size, self.not_found, write_batch)
+        finally:
+            self.cache.invalidate_many(row["id"] for _, row in rows)
+
+    async def get(self, item_id: str, fields: Fields = None) -> Optional[M]:
+        model = sparse_model(self.model, fields)
+        cached = self.cache.get(item_id)
+        if cached is not None:
+            return cached if fields is None else to_model(model, {f: getattr(cached, f) for f in fields})
+        generation = self.cache.generation
+        query = f"""
+        MATCH ({self.var}:{self.label} {{id:$id}})
+        {self.related(fields)}
+        RETURN {self.projection(fields)}
+        """
+        records = await read(query, id=item_id)
+        if not records:
+            return None
+        item = to_model(model, records[0])
+        # Only whole rows are cached
+        if fields is None:
+            self.cache.set(item_id, item, generation)
+        return item
+
+    async def get_many(self, ids: List[str]) -> BatchGetResult[M]:
+        query = f"""
+        UNWIND $ids AS id
+        MATCH ({self.var}:{self.label} {{id:id}})
+        {self.related()}
+        RETURN {self.projection()}
+        """
+        return await batch_get(ids, query, self.model, self.cache)
+
+    def list_query(self, q: ListQuery, streaming: bool, fields: Fields = None) -> str:
+        if self.limit_first:
+            return f"""
+            MATCH ({self.var}:{self.label})
+            {q.where()}
+            WITH {self.var} {q.order_by()} {limit_clause(streaming)}
+            {self.related(fields)}
+            RETURN {self.projection(fields)}
+            {q.order_by()}
+            """
+        return f"""
+        MATCH ({self.var}:{self.label})
+        {q.where()}
+        {self.related(fields)}
+        RETURN {self.projection(fields)}
+        {q.order_by()} {limit_clause(streaming)}
+        """
+
+    async def list(self, q: ListQuery, limit: int, fields: Fields = None) -> Page[M]:
+        model = sparse_model(self.model, fields)
+        records = await read(self.list_query(q, False, fields), **q.params, limit=limit + 1)
+        return q.page([to_model(model, r) for r in records], limit)
+
+    async def stream(self, q: ListQuery, fields: Fields = None) -> AsyncIterator[M]:
+        model = sparse_model(self.model, fields)
+        async for record in stream_records(self.list_query(q, True, fields), **q.params):
+            yield to_model(model, record)
+
+    async def search(self, text: str, limit: int) -> List[SearchHit[M]]:
+        returns = f"""
+        {self.related()}
+        RETURN {self.projection()}, relevance
+        """
+        return await search_nodes(self.label, self.var, text, self.model, returns, limit)
+
+    async def update(self, item_id: str, updates: Dict) -> Optional[M]:
+        var = self.var
+        fields = ", ".join(f"{var}.{k}=${k}" for k in updates)
+        before = f", {var} {{{self.snapshot}}} AS before" if self.snapshot else ""
+        after = f", before, {var} {{{self.snapshot}}} AS after" if self.snapshot else ""
+        # One row per node, however many optional neighbours it has, so rollups move once
+        query = f"""
+        MATCH ({var}:{self.label} {{id:$id}})
+        {self.related()}
+        WITH *{before} LIMIT 1
+        SET {fields}, {var}.updated_at=datetime()
+        RETURN {self.projection()}{after}
+        """
+        records = await tracked_write(self.entity, "update", list(updates), query, id=item_id, **updates)
+        if not records:
+            return None
+        after_commit(partial(self.cache.invalidate, item_id))
+        return self.model(**records[0])
+
+    async def link_account(self, item_id: str, account_id: str) -> bool:
+        query = f"""
+        MATCH ({self.var}:{self.label} {{id:$id}}), (a:Account {{id:$account_id}})
+        MERGE ({self.var})-[:BELONGS_TO]->(a)
+        SET {self.var}.updated_at=datetime()
+        RETURN {self.var}.id AS id, a.id AS account_id
+        """
+        records = await tracked_write(self.entity, "link", ["account_id"], query, id=item_id, account_id=account_id)
+        # Cached rows may carry their account_id
+        after_commit(partial(self.cache.invalidate, item_id))
+        return bool(records)
+
+
+# -------------------------------
+# Users
+# -------------------------------
+class Neo4jUserRepository(Neo4jRepository, UserRepository):
+    label = "User"
+    var = "u"
+    columns = {
+        "id": "u.id", "name": "u.name", "role": "u.role", "region": "u.region", "email": "u.email",
+        "created_at": "u.created_at", "updated_at": "u.updated_at",
+    }
+    UPSERT = """
+    MERGE (u:User {id:$id})
+    ON CREATE SET u.created_at=datetime(), u.updated_at=datetime(), u.name=$name, u.role=$role, u.region=$region, u.email=$email
+    ON MATCH SET u.updated_at=datetime(), u.name=$name, u.role=$role, u.region=$region, u.email=$email
+    RETURN u.id AS id, u.name AS name, u.role AS role, u.region AS region, u.email AS email,
+           u.created_at AS created_at, u.updated_at AS updated_at
+    """
+    UPSERT_ROWS = """
+    UNWIND $rows AS row
+    MERGE (u:User {id:row.id})
+    ON CREATE SET u.created_at=datetime()
+    SET u.updated_at=datetime(), u.name=row.name, u.role=row.role, u.region=row.region, u.email=row.email
+    RETURN row.idx AS idx, row.id AS id
+    """
+
+
+# -------------------------------
+# Leads
+# -------------------------------
+LEAD_SNAPSHOT = ".status, .source, .value, region: head([(l)-[:ASSIGNED_TO]->(ru:User) | ru.region])"
+
+
+class Neo4jLeadRepository(Neo4jRepository, LeadRepository):
+    label = "Lead"
+    var = "l"
+    columns = {
+        "id": "l.id", "name": "l.name", "email": "l.email", "source": "l.source",
+        "status": "l.status", "score": "l.score", "value": "l.value",
+        "assigned_to": "u.id", "account_id": "a.id",
+        "created_at": "l.created_at", "updated_at": "l.updated_at",
+    }
+    expansions = {
+        "assigned_to": "OPTIONAL MATCH (l)-[:ASSIGNED_TO]->(u:User)",
+        "account_id": "OPTIONAL MATCH (l)-[:BELONGS_TO]->(a:Account)",
+    }
+    snapshot = LEAD_SNAPSHOT
+    limit_first = True
+    coalesce = True
+    # assigned_to and account_id are read back from the stored relationships,
+    # so an id with no matching node comes back null, as it would from a GET
+    UPSERT = """
+    OPTIONAL MATCH (prev:Lead {id:$id})
+    WITH prev {.status, .source, .value, region: head([(prev)-[:ASSIGNED_TO]->(ru:User) | ru.region])} AS before
+    MERGE (l:Lead {id:$id})
+    ON CREATE SET l.created_at=datetime(), l.updated_at=datetime(), l.name=$name, l.email=$email, l.source=$source, l.status=$status, l.score=$score, l.value=$value
+    ON MATCH SET l.updated_at=datetime(), l.name=$name, l.email=$email, l.source=$source, l.status=$status, l.score=$score, l.value=$value
+    WITH l, before
+    OPTIONAL MATCH (u:User {id:$assigned_to})
+    OPTIONAL MATCH (a:Account {id:$account_id})
+    FOREACH (_ IN CASE WHEN u IS NOT NULL THEN [1] ELSE [] END |
+        MERGE (l)-[:ASSIGNED_TO]->(u)
+    )
+    FOREACH (_ IN CASE WHEN a IS NOT NULL THEN [1] ELSE [] END |
+        MERGE (l)-[:BELONGS_TO]->(a)
+    )
+    RETURN l.id AS id, l.name AS name, l.email AS email, l.source AS source,
+           l.status AS status, l.score AS score, l.value AS value,
+           head([(l)-[:ASSIGNED_TO]->(lu:User) | lu.id]) AS assigned_to,
+           head([(l)-[:BELONGS_TO]->(la:Account) | la.id]) AS account_id,
+           l.created_at AS created_at, l.updated_at AS updated_at,
+           before, l {.status, .source, .value, region: head([(l)-[:ASSIGNED_TO]->(ru:User) | ru.region])} AS after
+    """
+    # Shared by bulk upserts and coalesced creates
+    UPSERT_ROWS = """
+    UNWIND $rows AS row
+    OPTIONAL MATCH (prev:Lead {id:row.id})
+    WITH row, prev {.status, .source, .value, region: head([(prev)-[:ASSIGNED_TO]->(ru:User) | ru.region])} AS before
+    MERGE (l:Lead {id:row.id})
+    ON CREATE SET l.created_at=datetime()
+    SET l.updated_at=datetime(), l.name=row.name, l.email=row.email, l.source=row.source, l.status=row.status,
+        l.score=row.score, l.value=row.value
+    WITH l, row, before
+    OPTIONAL MATCH (u:User {id:row.assigned_to})
+    OPTIONAL MATCH (a:Account {id:row.account_id})
+    FOREACH (_ IN CASE WHEN u IS NOT NULL THEN [1] ELSE [] END |
+        MERGE (l)-[:ASSIGNED_TO]->(u)
+    )
+    FOREACH (_ IN CASE WHEN a IS NOT NULL THEN [1] ELSE [] END |
+        MERGE (l)-[:BELONGS_TO]->(a)
+    )
+    RETURN row.idx AS idx, l.id AS id, l.name AS name, l.email AS email, l.source AS source,
+           l.status AS status, l.score AS score, l.value AS value,
+           head([(l)-[:ASSIGNED_TO]->(lu:User) | lu.id]) AS assigned_to,
+           head([(l)-[:BELONGS_TO]->(la:Account) | la.id]) AS account_id,
+           l.created_at AS created_at, l.updated_at AS updated_at,
+           before, l {.status, .source, .value, region: head([(l)-[:ASSIGNED_TO]->(ru:User) | ru.region])} AS after
+    """
+
+
+# -------------------------------
+# Accounts
+# -------------------------------
+def account_graph_query(depth: int) -> str:
+    """
+    One traversal built from nested pattern comprehensions; each level is
+    sliced to its size limit. depth 1 adds leads, 2 adds their opportunities
+    and activities, 3 adds the deals of those opportunities.
+    """
+    deals = """,
+                deals: [(d:Deal)-[:FOR_OPPORTUNITY]->(o) |
+                    d {.id, .name, .amount, .status, .closed_date, .created_at, .updated_at, opportunity_id: o.id}
+                ][..$max_deals]""" if depth >= 3 else ""
+    opportunities = f""",
+            opportunities: [(o:Opportunity)-[:FOR_LEAD]->(l) |
+                o {{.id, .name, .stage, .estimated_value, .probability, .expected_close_date,
+                    .created_at, .updated_at, lead_id: l.id{deals}}}
+            ][..$max_opportunities],
+            activities: [(act:Activity)-[:FOR_LEAD]->(l) |
+                act {{.id, .type, .note, .timestamp, .duration, .channel, .created_at, .updated_at, lead_id: l.id,
+                      user_id: head([(act)-[:ASSIGNED_TO]->(au:User) | au.id])}}
+            ][..$max_activities]""" if depth >= 2 else ""
+    leads = f""",
+        leads: [(l:Lead)-[:BELONGS_TO]->(a) |
+            l {{.id, .name, .email, .source, .status, .score, .value, .created_at, .updated_at, account_id: a.id,
+                assigned_to: head([(l)-[:ASSIGNED_TO]->(u:User) | u.id]){opportunities}}}
+        ][..$max_leads]""" if depth >= 1 else ""
+    return f"""
+    MATCH (a:Account {{id:$id}})
+    RETURN a {{.id, .name, .industry, .size, .revenue, .created_at, .updated_at{leads}}} AS account
+    """
+
+
+class Neo4jAccountRepository(Neo4jRepository, AccountRepository):
+    label = "Account"
+    var = "a"
+    columns = {
+        "id": "a.id", "name": "a.name", "industry": "a.industry", "size": "a.size", "revenue": "a.revenue",
+        "created_at": "a.created_at", "updated_at": "a.updated_at",
+    }
+    UPSERT = """
+    MERGE (a:Account {id:$id})
+    ON CREATE SET a.created_at=datetime()
+    SET a.updated_at=datetime(), a.name=$name, a.industry=$industry, a.size=$size, a.revenue=$revenue
+    RETURN a.id AS id, a.name AS name, a.industry AS industry, a.size AS size, a.revenue AS revenue,
+           a.created_at AS created_at, a.updated_at AS updated_at
+    """
+    UPSERT_ROWS = """
+    UNWIND $rows AS row
+    MERGE (a:Account {id:row.id})
+    ON CREATE SET a.created_at=datetime()
+    SET a.updated_at=datetime(), a.name=row.name, a.industry=row.industry, a.size=row.size, a.revenue=row.revenue
+    RETURN row.idx AS idx, row.id AS id
+    """
+
+    async def graph(self, account_id: str, depth: int, max_leads: int, max_opportunities: int,
+                    max_activities: int, max_deals: int) -> Optional[AccountGraph]:
+        records = await read(
+            account_graph_query(depth), id=account_id, max_leads=max_leads,
+            max_opportunities=max_opportunities, max_activities=max_activities, max_deals=max_deals,
+        )
+        return AccountGraph(**records[0]["account"]) if records else None
+
+
+# -------------------------------
+# Opportunities
+# -------------------------------
+class Neo4jOpportunityRepository(Neo4jRepository, OpportunityRepository):
+    label = "Opportunity"
+    var = "o"
+    matches = "MATCH (o)-[:FOR_LEAD]->(l:Lead)"
+    columns = {
+        "id": "o.id", "name": "o.name", "stage": "o.stage",
+        "estimated_value": "o.estimated_value", "probability": "o.probability",
+        "expected_close_date": "o.expected_close_date", "lead_id": "l.id",
+        "created_at": "o.created_at", "updated_at": "o.updated_at",
+    }
+    snapshot = ".stage, .estimated_value, .probability"
+    UPSERT = """
+    MATCH (l:Lead {id:$lead_id})
+    OPTIONAL MATCH (prev:Opportunity {id:$id})
+    WITH l, prev {.stage, .estimated_value, .probability} AS before
+    MERGE (o:Opportunity {id:$id})
+    ON CREATE SET o.created_at=datetime()
+    SET o.updated_at=datetime(), o.name=$name, o.stage=$stage, o.estimated_value=$estimated_value,
+        o.probability=$probability, o.expected_close_date=$expected_close_date
+    MERGE (o)-[:FOR_LEAD]->(l)
+    RETURN o.id AS id, o.name AS name, o.stage AS stage,
+           o.estimated_value AS estimated_value, o.probability AS probability,
+           o.expected_close_date AS expected_close_date, l.id AS lead_id,
+           o.created_at AS created_at, o.updated_at AS updated_at,
+           before, o {.stage, .estimated_value, .probability} AS after
+    """
+    UPSERT_ROWS = """
+    UNWIND $rows AS row
+    MATCH (l:Lead {id:row.lead_id})
+    OPTIONAL MATCH (prev:Opportunity {id:row.id})
+    WITH row, l, prev {.stage, .estimated_value, .probability} AS before
+    MERGE (o:Opportunity {id:row.id})
+    ON CREATE SET o.created_at=datetime()
+    SET o.updated_at=datetime(), o.name=row.name, o.stage=row.stage, o.estimated_value=row.estimated_value,
+        o.probability=row.probability, o.expected_close_date=row.expected_close_date
+    MERGE (o)-[:FOR_LEAD]->(l)
+    RETURN row.idx AS idx, row.id AS id, before, o {.stage, .estimated_value, .probability} AS after
+    """
+
+
+# -------------------------------
+# Deals
+# -------------------------------
+class Neo4jDealRepository(Neo4jRepository, DealRepository):
+    label = "Deal"
+    var = "d"
+    matches = "MATCH (d)-[:FOR_OPPORTUNITY]->(o:Opportunity)"
+    columns = {
+        "id": "d.id", "name": "d.name", "amount": "d.amount", "status": "d.status",
+        "closed_date": "d.closed_date", "opportunity_id": "o.id",
+        "created_at": "d.created_at", "updated_at": "d.updated_at",
+    }
+    snapshot = ".status, .amount"
+    UPSERT = """
+    MATCH (o:Opportunity {id:$opportunity_id})
+    OPTIONAL MATCH (prev:Deal {id:$id})
+    WITH o, prev {.status, .amount} AS before
+    MERGE (d:Deal {id:$id})
+    ON CREATE SET d.created_at=datetime()
+    SET d.updated_at=datetime(), d.name=$name, d.amount=$amount, d.status=$status, d.closed_date=$closed_date
+    MERGE (d)-[:FOR_OPPORTUNITY]->(o)
+    RETURN d.id AS id, d.name AS name, d.amount AS amount, d.status AS status,
+           d.closed_date AS closed_date, o.id AS opportunity_id,
+           d.created_at AS created_at, d.updated_at AS updated_at,
+           before, d {.status, .amount} AS after
+    """
+    UPSERT_ROWS = """
+    UNWIND $rows AS row
+    MATCH (o:Opportunity {id:row.opportunity_id})
+    OPTIONAL MATCH (prev:Deal {id:row.id})
+    WITH row, o, prev {.status, .amount} AS before
+    MERGE (d:Deal {id:row.id})
+    ON CREATE SET d.created_at=datetime()
+    SET d.updated_at=datetime(), d.name=row.name, d.amount=row.amount, d.status=row.status, d.closed_date=row.closed_date
+    MERGE (d)-[:FOR_OPPORTUNITY]->(o)
+    RETURN row.idx AS idx, row.id AS id, before, d {.status, .amount} AS after
+    """
+
+
+# -------------------------------
+# Activities
+# -------------------------------
+class Neo4jActivityRepository(Neo4jRepository, ActivityRepository):
+    label = "Activity"
+    var = "act"
+    columns = {
+        "id": "act.id", "type": "act.type", "note": "act.note", "timestamp": "act.timestamp",
+        "duration": "act.duration", "channel": "act.channel", "user_id": "u.id", "lead_id": "l.id",
+        "created_at": "act.created_at", "updated_at": "act.updated_at",
+    }
+    expansions = {
+        "lead_id": "OPTIONAL MATCH (act)-[:FOR_LEAD]->(l:Lead)",
+        "user_id": "OPTIONAL MATCH (act)-[:ASSIGNED_TO]->(u:User)",
+    }
+    limit_first = True
+    coalesce = True
+    UPSERT = """
+    MATCH (l:Lead {id:$lead_id}), (u:User {id:$user_id})
+    MERGE (act:Activity {id:$id})
+    ON CREATE SET act.created_at=datetime()
+    SET act.updated_at=datetime(), act.type=$type, act.note=$note, act.timestamp=$timestamp,
+        act.duration=$duration, act.channel=$channel
+    MERGE (act)-[:FOR_LEAD]->(l)
+    MERGE (act)-[:ASSIGNED_TO]->(u)
+    RETURN act.id AS id, act.type AS type, act.note AS note, act.timestamp AS timestamp,
+           act.duration AS duration, act.channel AS channel, u.id AS user_id, l.id AS lead_id,
+           act.created_at AS created_at, act.updated_at AS updated_at
+    """
+    # Shared by bulk upserts and coalesced creates
+    UPSERT_ROWS = """
+    UNWIND $rows AS row
+    MATCH (l:Lead {id:row.lead_id}), (u:User {id:row.user_id})
+    MERGE (act:Activity {id:row.id})
+    ON CREATE SET act.created_at=datetime()
+    SET act.updated_at=datetime(), act.type=row.type, act.note=row.note, act.timestamp=row.timestamp,
+        act.duration=row.duration, act.channel=row.channel
+    MERGE (act)-[:FOR_LEAD]->(l)
+    MERGE (act)-[:ASSIGNED_TO]->(u)
+    RETURN row.idx AS idx, act.id AS id, act.type AS type, act.note AS note, act.timestamp AS timestamp,
+           act.duration AS duration, act.channel AS channel, u.id AS user_id, l.id AS lead_id,
+           act.created_at AS created_at, act.updated_at AS updated_at
+    """
@@ -0,0 +1,77 @@
+import os
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional, TypeVar
+from fastapi import HTTPException
+from app.repositories.base import (
+    AccountRepository, ActivityRepository, DealRepository, LeadRepository, OpportunityRepository, UserRepository,
+)
+
+if TYPE_CHECKING:
+    from app.repositories.memory import MemoryGraph
+
+T = TypeVar("T")
+
+# "neo4j" for the real database, "memory" to serve the API from a process-local
+# graph (tests, benchmarks, laptops without Neo4j)
+REPOSITORY_BACKEND = os.getenv("REPOSITORY_BACKEND", "neo4j").lower()
+
+
+class Repositories:
+    """
+    The repositories the routers use. Routers look them up on every call, so
+    use() can swap the backend in place (e.g. from a test fixture).
+    """
+
+    users: UserRepository
+    leads: LeadRepository
+    accounts: AccountRepository
+    opportunities: OpportunityRepository
+    deals: DealRepository
+    activities: ActivityRepository
+    # The store behind the memory backend; None for Neo4j
+    graph: Optional["MemoryGraph"]
+
+    def __init__(self, backend: str = REPOSITORY_BACKEND):
+        self.use(backend)
+
+    def use(self, backend: str, graph: Optional["MemoryGraph"] = None):
+        if backend == "memory":
+            from app.repositories import memory
+            graph = graph or memory.MemoryGraph()
+            self.graph = graph
+            self.users = memory.MemoryUserRepository(graph)
+            self.leads = memory.MemoryLeadRepository(graph)
+            self.accounts = memory.MemoryAccountRepository(graph)
+            self.opportunities = memory.MemoryOpportunityRepository(graph)
+            self.deals = memory.MemoryDealRepository(graph)
+            self.activities = memory.MemoryActivityRepository(graph)
+        elif backend == "neo4j":
+            from app.repositories import neo4j
+            self.users = neo4j.Neo4jUserRepository()
+            self.leads = neo4j.Neo4jLeadRepository()
+            self.accounts = neo4j.Neo4jAccountRepository()
+            self.opportunities = neo4j.Neo4jOpportunityRepository()
+            self.deals = neo4j.Neo4jDealRepository()
+            self.activities = neo4j.Neo4jActivityRepository()
+            self.graph = None
+        else:
+            raise ValueError(f"Unknown repository backend {backend!r}; use 'neo4j' or 'memory'")
+        self.backend = backend
+
+    async def atomic(self, work: Callable[[], Awaitable[T]]) -> T:
+        """Run the repository writes `work` makes as one transaction: all of them, or none if it raises."""
+        if self.graph is not None:
+            return await self.graph.atomic(work)
+        from app.utils.query import atomic
+        return await atomic(work)
+
+
+repos = Repositories()
+
+
+def require_neo4j():
+    """
+    Route dependency for features written directly in Cypher rather than
+    through the repositories (analytics, the change feed, lead scoring).
+    """
+    if repos.backend != "neo4j":
+        raise HTTPException(status_code=501, detail="Not available with the in-memory backend")
@@ -1,89 +1,144 @@
-from fastapi import APIRouter, Query, HTTPException
-from app.utils.search import search_nodes
-from typing import List
-from app.db import driver
+from fastapi import APIRouter, Query, HTTPException, Request
+from datetime import datetime
+from typing import List, Optional
 from app.models.account import Account, AccountCreate, AccountUpdate
+from app.models.batch import BatchGetRequest, BatchGetResult
+from app.models.bulk import BulkResult
+from app.models.graph import AccountGraph
+from app.models.page import Page
+from app.models.search import SearchHit
+from app.repositories.registry import repos
+from app.utils.pagination import DEFAULT_LIMIT, MAX_LIMIT
+from app.utils.filters import ListQuery, sort_pattern
+from app.utils.bulk import BULK_BATCH_SIZE, MAX_BULK_BATCH_SIZE, bulk_openapi, parse_bulk_rows
+from app.utils.fast_json import respond
+from app.utils.fields import FIELDS_DESCRIPTION, parse_fields
+from app.utils.streaming import NDJSON_RESPONSES, ndjson_response, wants_ndjson
+from app.utils.search import MAX_SEARCH_LIMIT, SEARCH_LIMIT
 
 router = APIRouter()
 
+# Fields list routes may sort by (prefix with - for descending)
+ACCOUNT_SORTABLE = ["name", "revenue"]
+
 # -------------------------------
 # Create Account
 # -------------------------------
 @router.post("/", response_model=Account)
-def create_account(account: AccountCreate):
-    query = """
-    MERGE (a:Account {id:$id})
-    SET a.name=$name, a.industry=$industry, a.size=$size, a.revenue=$revenue
-    RETURN a.id AS id, a.name AS name, a.industry AS industry, a.size AS size, a.revenue AS revenue
-    """
-    with driver.session() as session:
-        record = session.run(query, **account.model_dump()).single()
-        return Account(**record)
+async def create_account(account: AccountCreate):
+    return await repos.accounts.create(account.model_dump())
+
+# -------------------------------
+# Bulk Upsert Accounts
+# -------------------------------
+@router.post("/bulk", response_model=BulkResult, openapi_extra=bulk_openapi(AccountCreate))
+async def bulk_upsert_accounts(
+    request: Request,
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=MAX_BULK_BATCH_SIZE),
+):
+    rows, results = await parse_bulk_rows(request, AccountCreate)
+    return await repos.accounts.bulk_upsert(rows, results, batch_size)
 
 # -------------------------------
 # Get All Accounts
 # -------------------------------
-@router.get("/", response_model=List[Account])
-def get_accounts():
-    query = "MATCH (a:Account) RETURN a.id AS id, a.name AS name, a.industry AS industry, a.size AS size, a.revenue AS revenue"
-    with driver.session() as session:
-        return [Account(**r) for r in session.run(query)]
+@router.get("/", response_model=Page[Account], responses=NDJSON_RESPONSES)
+async def get_accounts(
+    request: Request,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    stream: bool = Query(False, description="Stream all accounts after the cursor as NDJSON"),
+    industry: Optional[List[str]] = Query(None, description="One or more industries"),
+    size: Optional[List[str]] = Query(None, description="One or more company sizes"),
+    revenue_gte: Optional[float] = Query(None),
+    revenue_lte: Optional[float] = Query(None),
+    updated_since: Optional[datetime] = Query(None, description="Only rows created or updated at or after this time (ISO 8601)"),
+    sort: Optional[str] = Query(None, pattern=sort_pattern(ACCOUNT_SORTABLE), description="Sort field, prefix with - for descending"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    q = ListQuery("a", cursor, sort, ACCOUNT_SORTABLE)
+    q.any_of("industry", industry)
+    q.any_of("size", size)
+    q.between("revenue", revenue_gte, revenue_lte)
+    q.updated_since(updated_since)
+    selected = parse_fields(fields, Account, q.sort_field)
+    if wants_ndjson(request, stream):
+        return ndjson_response(repos.accounts.stream(q, selected))
+    return respond(await repos.accounts.list(q, limit, selected), sparse=selected is not None)
+
+# -------------------------------
+# Search Accounts by Name
+# -------------------------------
+# Declared before /{id} so "search_name" is not captured as an id
+@router.get("/search_name", response_model=List[SearchHit[Account]])
+async def search_accounts(
+    name: str = Query(..., min_length=1, description="Search accounts by name"),
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+):
+    try:
+        return await repos.accounts.search(name, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# -------------------------------
+# Batch Get Accounts by ID
+# -------------------------------
+@router.post("/batch-get", response_model=BatchGetResult[Account])
+async def batch_get_accounts(batch: BatchGetRequest):
+    return respond(await repos.accounts.get_many(batch.ids))
 
 # -------------------------------
 # Get Account by ID
 # -------------------------------
 @router.get("/{account_id}", response_model=Account)
-def get_account(account_id: str):
-    query = """
-    MATCH (a:Account {id:$id})
-    RETURN a.id AS id, a.name AS name, a.industry AS industry, a.size AS size, a.revenue AS revenue
-    """
-    with driver.session() as session:
-        record = session.run(query, id=account_id).single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Account not found")
-        return Account(**record)
+async def get_account(
+    account_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    selected = parse_fields(fields, Account)
+    account = await repos.accounts.get(account_id, selected)
+    if account is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return respond(account, sparse=selected is not None)
+
+# -------------------------------
+# Account 360: account, leads, opportunities, deals, activities
+# -------------------------------
+@router.get("/{account_id}/graph", response_model=AccountGraph)
+async def get_account_graph(
+    account_id: str,
+    depth: int = Query(3, ge=0, le=3, description="1 = leads, 2 = + opportunities and activities, 3 = + deals"),
+    max_leads: int = Query(50, ge=1, le=500),
+    max_opportunities: int = Query(20, ge=1, le=100, description="Per lead"),
+    max_activities: int = Query(20, ge=1, le=100, description="Per lead"),
+    max_deals: int = Query(20, ge=1, le=100, description="Per opportunity"),
+):
+    graph = await repos.accounts.graph(
+        account_id, depth, max_leads=max_leads, max_opportunities=max_opportunities,
+        max_activities=max_activities, max_deals=max_deals,
+    )
+    if graph is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return graph
 
 # -------------------------------
 # Update Account
 # -------------------------------
 @router.patch("/{account_id}", response_model=Account)
-def update_account(account_id: str, account: AccountUpdate):
-    fields = ", ".join([f"a.{k}=${k}" for k in account.model_dump(exclude_unset=True).keys()])
-    if not fields:
+async def update_account(account_id: str, account: AccountUpdate):
+    updates = account.model_dump(exclude_unset=True)
+    if not updates:
         raise HTTPException(status_code=400, detail="No fields to update")
-    
-    query = f"""
-    MATCH (a:Account {{id:$id}})
-    SET {fields}
-    RETURN a.id AS id, a.name AS name, a.industry AS industry, a.size AS size, a.revenue AS revenue
-    """
-    with driver.session() as session:
-        record = session.run(query, **{"id": account_id, **account.model_dump(exclude_unset=True)}).single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Account not found")
-        return Account(**record)
+    updated = await repos.accounts.update(account_id, updates)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return updated
 
 # -------------------------------
 # Optional: Link Lead to Account
 # -------------------------------
 @router.post("/{account_id}/link-lead/{lead_id}")
-def link_lead_to_account(account_id: str, lead_id: str):
-    query = """
-    MATCH (a:Account {id:$account_id}), (l:Lead {id:$lead_id})
-    MERGE (l)-[:BELONGS_TO]->(a)
-    RETURN a.id AS account_id, l.id AS lead_id
-    """
-    with driver.session() as session:
-        record = session.run(query, account_id=account_id, lead_id=lead_id).single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Account or Lead not found")
-        return {"message": f"Lead {lead_id} linked to Account {account_id}"}
-
-@router.get("/search_name")
-def search_users(name: str = Query(..., description="Search accounts by name")):
-    try:
-        results = search_nodes("Account",name)
-        return results
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+async def link_lead_to_account(account_id: str, lead_id: str):
+    if not await repos.leads.link_account(lead_id, account_id):
+        raise HTTPException(status_code=404, detail="Account or Lead not found")
+    return {"message": f"Lead {lead_id} linked to Account {account_id}"}
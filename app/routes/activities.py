@@ -1,106 +1,117 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from app.db import driver
+from fastapi import APIRouter, HTTPException, Query, Request
+from datetime import datetime
+from typing import List, Optional
 from app.models.activity import Activity, ActivityCreate, ActivityUpdate
-from app.utils.search import search_nodes
+from app.models.batch import BatchGetRequest, BatchGetResult
+from app.models.bulk import BulkResult
+from app.models.page import Page
+from app.models.search import SearchHit
+from app.repositories.registry import repos
+from app.utils.pagination import DEFAULT_LIMIT, MAX_LIMIT
+from app.utils.filters import ListQuery, sort_pattern
+from app.utils.bulk import BULK_BATCH_SIZE, MAX_BULK_BATCH_SIZE, bulk_openapi, parse_bulk_rows
+from app.utils.fast_json import respond
+from app.utils.fields import FIELDS_DESCRIPTION, parse_fields
+from app.utils.streaming import NDJSON_RESPONSES, ndjson_response, wants_ndjson
+from app.utils.search import MAX_SEARCH_LIMIT, SEARCH_LIMIT
 
 router = APIRouter()
 
+# Fields list routes may sort by (prefix with - for descending)
+ACTIVITY_SORTABLE = ["timestamp", "duration"]
+
 # -------------------------------
-# Create Activity (linked to Lead, Opportunity, or Deal)
+# Create Activity (linked to Lead, logged by User)
 # -------------------------------
 @router.post("/", response_model=Activity)
-def create_activity(activity: ActivityCreate):
-    query = """
-    MERGE (act:Activity {id:$id})
-    SET act.type=$type, act.date=$date, act.notes=$notes
-    WITH act
-    OPTIONAL MATCH (l:Lead {id:$lead_id})
-    OPTIONAL MATCH (o:Opportunity {id:$opportunity_id})
-    OPTIONAL MATCH (d:Deal {id:$deal_id})
-    FOREACH(ignoreMe IN CASE WHEN l IS NOT NULL THEN [1] ELSE [] END |
-        MERGE (act)-[:FOR_LEAD]->(l)
-    )
-    FOREACH(ignoreMe IN CASE WHEN o IS NOT NULL THEN [1] ELSE [] END |
-        MERGE (act)-[:FOR_OPPORTUNITY]->(o)
-    )
-    FOREACH(ignoreMe IN CASE WHEN d IS NOT NULL THEN [1] ELSE [] END |
-        MERGE (act)-[:FOR_DEAL]->(d)
-    )
-    RETURN act.id AS id, act.type AS type, act.date AS date, act.notes AS notes,
-           l.id AS lead_id, o.id AS opportunity_id, d.id AS deal_id
-    """
-    with driver.session() as session:
-        record = session.run(query, **activity.model_dump()).single()
-        if not record:
-            raise HTTPException(status_code=400, detail="Invalid references for activity")
-        return Activity(**record)
+async def create_activity(activity: ActivityCreate):
+    created = await repos.activities.create(activity.model_dump())
+    if created is None:
+        raise HTTPException(status_code=404, detail="Lead or User not found for this activity")
+    return created
+
+# -------------------------------
+# Bulk Upsert Activities
+# -------------------------------
+@router.post("/bulk", response_model=BulkResult, openapi_extra=bulk_openapi(ActivityCreate))
+async def bulk_upsert_activities(
+    request: Request,
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=MAX_BULK_BATCH_SIZE),
+):
+    rows, results = await parse_bulk_rows(request, ActivityCreate)
+    return await repos.activities.bulk_upsert(rows, results, batch_size)
 
 # -------------------------------
 # Get All Activities
 # -------------------------------
-@router.get("/", response_model=List[Activity])
-def get_activities():
-    query = """
-    MATCH (act:Activity)
-    OPTIONAL MATCH (act)-[:FOR_LEAD]->(l:Lead)
-    OPTIONAL MATCH (act)-[:FOR_OPPORTUNITY]->(o:Opportunity)
-    OPTIONAL MATCH (act)-[:FOR_DEAL]->(d:Deal)
-    RETURN act.id AS id, act.type AS type, act.date AS date, act.notes AS notes,
-           l.id AS lead_id, o.id AS opportunity_id, d.id AS deal_id
-    """
-    with driver.session() as session:
-        return [Activity(**r) for r in session.run(query)]
+@router.get("/", response_model=Page[Activity], responses=NDJSON_RESPONSES)
+async def get_activities(
+    request: Request,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    stream: bool = Query(False, description="Stream all activities after the cursor as NDJSON"),
+    type: Optional[List[str]] = Query(None, description="One or more activity types"),
+    channel: Optional[List[str]] = Query(None, description="One or more channels"),
+    duration_gte: Optional[float] = Query(None),
+    duration_lte: Optional[float] = Query(None),
+    updated_since: Optional[datetime] = Query(None, description="Only rows created or updated at or after this time (ISO 8601)"),
+    sort: Optional[str] = Query(None, pattern=sort_pattern(ACTIVITY_SORTABLE), description="Sort field, prefix with - for descending"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    q = ListQuery("act", cursor, sort, ACTIVITY_SORTABLE)
+    q.any_of("type", type)
+    q.any_of("channel", channel)
+    q.between("duration", duration_gte, duration_lte)
+    q.updated_since(updated_since)
+    selected = parse_fields(fields, Activity, q.sort_field)
+    if wants_ndjson(request, stream):
+        return ndjson_response(repos.activities.stream(q, selected))
+    return respond(await repos.activities.list(q, limit, selected), sparse=selected is not None)
+
+# -------------------------------
+# Search Activities by Name
+# -------------------------------
+# Declared before /{id} so "search_name" is not captured as an id
+@router.get("/search_name", response_model=List[SearchHit[Activity]])
+async def search_activities(
+    name: str = Query(..., min_length=1, description="Search activities by type or note"),
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+):
+    try:
+        return await repos.activities.search(name, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# -------------------------------
+# Batch Get Activities by ID
+# -------------------------------
+@router.post("/batch-get", response_model=BatchGetResult[Activity])
+async def batch_get_activities(batch: BatchGetRequest):
+    return respond(await repos.activities.get_many(batch.ids))
 
 # -------------------------------
 # Get Activity by ID
 # -------------------------------
 @router.get("/{activity_id}", response_model=Activity)
-def get_activity(activity_id: str):
-    query = """
-    MATCH (act:Activity {id:$id})
-    OPTIONAL MATCH (act)-[:FOR_LEAD]->(l:Lead)
-    OPTIONAL MATCH (act)-[:FOR_OPPORTUNITY]->(o:Opportunity)
-    OPTIONAL MATCH (act)-[:FOR_DEAL]->(d:Deal)
-    RETURN act.id AS id, act.type AS type, act.date AS date, act.notes AS notes,
-           l.id AS lead_id, o.id AS opportunity_id, d.id AS deal_id
-    """
-    with driver.session() as session:
-        record = session.run(query, id=activity_id).single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Activity not found")
-        return Activity(**record)
+async def get_activity(
+    activity_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    selected = parse_fields(fields, Activity)
+    activity = await repos.activities.get(activity_id, selected)
+    if activity is None:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    return respond(activity, sparse=selected is not None)
 
 # -------------------------------
 # Update Activity
 # -------------------------------
 @router.patch("/{activity_id}", response_model=Activity)
-def update_activity(activity_id: str, activity: ActivityUpdate):
-    fields = ", ".join([f"act.{k}=${k}" for k in activity.model_dump(exclude_unset=True).keys()])
-    if not fields:
+async def update_activity(activity_id: str, activity: ActivityUpdate):
+    updates = activity.model_dump(exclude_unset=True)
+    if not updates:
         raise HTTPException(status_code=400, detail="No fields to update")
-    
-    query = f"""
-    MATCH (act:Activity {{id:$id}})
-    SET {fields}
-    OPTIONAL MATCH (act)-[:FOR_LEAD]->(l:Lead)
-    OPTIONAL MATCH (act)-[:FOR_OPPORTUNITY]->(o:Opportunity)
-    OPTIONAL MATCH (act)-[:FOR_DEAL]->(d:Deal)
-    RETURN act.id AS id, act.type AS type, act.date AS date, act.notes AS notes,
-           l.id AS lead_id, o.id AS opportunity_id, d.id AS deal_id
-    """
-    with driver.session() as session:
-        record = session.run(query, **{"id": activity_id, **activity.model_dump(exclude_unset=True)}).single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Activity not found")
-        return Activity(**record)
-
-
-#Search by activity name:
-@router.get("/search_name")
-def search_users(name: str = Query(..., description="Search Activity by name")):
-    try:
-        results = search_nodes("Activity",name)
-        return results
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+    updated = await repos.activities.update(activity_id, updates)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    return updated
@@ -0,0 +1,71 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from app.utils.cache import caches
+from app.utils.coalescer import coalescers
+from app.utils.query import read_flight
+from app.utils.slow_queries import slow_queries
+
+router = APIRouter()
+
+# -------------------------------
+# Get-by-id Cache Counters
+# -------------------------------
+@router.get("/cache")
+async def cache_stats():
+    return {name: cache.stats() for name, cache in caches.items()}
+
+# -------------------------------
+# Read Coalescing Counters
+# -------------------------------
+@router.get("/coalescing")
+async def coalescing_stats():
+    return read_flight.stats()
+
+# -------------------------------
+# Write Coalescing Counters
+# -------------------------------
+@router.get("/write-coalescing")
+async def write_coalescing_stats():
+    return {entity: coalescer.stats() for entity, coalescer in coalescers.items()}
+
+# -------------------------------
+# Tune Write Coalescing at Runtime
+# -------------------------------
+@router.patch("/write-coalescing/{entity}")
+async def tune_write_coalescing(
+    entity: str,
+    enabled: Optional[bool] = Query(None),
+    window_ms: Optional[float] = Query(None, ge=0, le=1000, description="Longest a create waits for company"),
+    max_rows: Optional[int] = Query(None, ge=1, le=10000, description="Flush as soon as this many creates are queued"),
+):
+    coalescer = coalescers.get(entity)
+    if coalescer is None:
+        raise HTTPException(status_code=404, detail=f"No write coalescer for {entity}")
+    if enabled is not None:
+        coalescer.enabled = enabled
+    if window_ms is not None:
+        coalescer.window_ms = window_ms
+    if max_rows is not None:
+        coalescer.max_rows = max_rows
+    return coalescer.stats()
+
+# -------------------------------
+# Recent Slow Queries
+# -------------------------------
+@router.get("/slow-queries")
+async def recent_slow_queries(limit: Optional[int] = Query(None, ge=1, le=1000, description="Newest entries first")):
+    return {**slow_queries.stats(), "entries": slow_queries.recent(limit)}
+
+# -------------------------------
+# Tune Slow Query Capture at Runtime
+# -------------------------------
+@router.patch("/slow-queries")
+async def tune_slow_queries(
+    threshold_ms: Optional[float] = Query(None, ge=0, description="Capture statements slower than this"),
+    plan_sample: Optional[float] = Query(None, ge=0, le=1, description="Share of slow statements to PROFILE/EXPLAIN"),
+):
+    if threshold_ms is not None:
+        slow_queries.threshold_ms = threshold_ms
+    if plan_sample is not None:
+        slow_queries.plan_sample = plan_sample
+    return slow_queries.stats()
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException
+from app.models.analytics import DealStatusRollup, LeadRollup, OpportunityStageRollup, PipelineSummary
+from app.utils.query import read
+from app.utils.rollups import recompute_rollups
+
+router = APIRouter()
+
+# -------------------------------
+# Pipeline Summary (precomputed rollups)
+# -------------------------------
+@router.get("/pipeline", response_model=PipelineSummary)
+async def get_pipeline():
+    # One row per rollup key; cost does not grow with the number of deals or leads
+    query = """
+    MATCH (r:Rollup)
+    WHERE r.count > 0
+    RETURN r.metric AS metric, r.key AS key, r.count AS count, r.total AS total, r.weighted AS weighted
+    ORDER BY r.id
+    """
+    records = await read(query)
+    summary = PipelineSummary(deals_by_status=[], opportunities_by_stage=[], leads=[])
+    for r in records:
+        if r["metric"] == "deal_status":
+            summary.deals_by_status.append(DealStatusRollup(
+                status=r["key"][0], count=r["count"], total_amount=r["total"]))
+        elif r["metric"] == "opportunity_stage":
+            summary.opportunities_by_stage.append(OpportunityStageRollup(
+                stage=r["key"][0], count=r["count"], total_value=r["total"], weighted_value=r["weighted"]))
+        elif r["metric"] == "lead_breakdown":
+            region, status, source = r["key"]
+            summary.leads.append(LeadRollup(
+                region=region, status=status, source=source, count=r["count"], total_value=r["total"]))
+    return summary
+
+# -------------------------------
+# Recompute Pipeline Rollups
+# -------------------------------
+@router.post("/pipeline/recompute", response_model=PipelineSummary)
+async def recompute_pipeline():
+    try:
+        await recompute_rollups()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return await get_pipeline()
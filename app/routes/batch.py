@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from app.models.batch import BatchRequest, BatchResponse
+from app.utils.operations import execute
+
+router = APIRouter()
+
+# -------------------------------
+# Run Operations in One Transaction
+# -------------------------------
+@router.post("/batch", response_model=BatchResponse)
+async def run_batch(batch: BatchRequest):
+    """
+    Create, update and link entities in order, in one write transaction.
+    An operation with a `ref` can be referred to by later ones as "$<ref>",
+    in their `id` or as a value in their `data`. If any operation fails,
+    none of them is applied.
+    """
+    return BatchResponse(results=await execute(batch.operations))
@@ -0,0 +1,60 @@
+import asyncio
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.models.change import ChangeEvent, ChangePage
+from app.utils.changes import (CHANGE_POLL_INTERVAL, CHANGES_LIMIT, MAX_CHANGES_LIMIT,
+                               change_notifier, changes_since)
+
+router = APIRouter()
+
+# -------------------------------
+# Get Changes (paged, optional long-poll)
+# -------------------------------
+@router.get("/", response_model=ChangePage)
+async def get_changes(
+    since: int = Query(0, ge=0, description="Return changes with a sequence number above this"),
+    limit: int = Query(CHANGES_LIMIT, ge=1, le=MAX_CHANGES_LIMIT),
+    entity: Optional[List[str]] = Query(None, description="Only these entity types"),
+    wait: float = Query(0, ge=0, le=60, description="Seconds to hold the request open when there is nothing new"),
+):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    while True:
+        seen = change_notifier.version
+        records = await changes_since(since, limit, entity)
+        remaining = deadline - loop.time()
+        if records or remaining <= 0:
+            break
+        await change_notifier.wait(seen, min(remaining, CHANGE_POLL_INTERVAL))
+    items = [ChangeEvent(**r) for r in records]
+    return ChangePage(items=items, next_since=items[-1].seq if items else since)
+
+# -------------------------------
+# Stream Changes (Server-Sent Events)
+# -------------------------------
+@router.get("/stream", response_class=StreamingResponse,
+            responses={200: {"content": {"text/event-stream": {}}, "description": "One `change` event per write"}})
+async def stream_changes(
+    request: Request,
+    since: int = Query(0, ge=0, description="Start after this sequence number"),
+    entity: Optional[List[str]] = Query(None, description="Only these entity types"),
+    last_event_id: Optional[int] = Header(None, description="Sent by EventSource on reconnect; overrides `since`"),
+):
+    async def events():
+        cursor = last_event_id if last_event_id is not None else since
+        while not await request.is_disconnected():
+            seen = change_notifier.version
+            records = await changes_since(cursor, CHANGES_LIMIT, entity)
+            for r in records:
+                event = ChangeEvent(**r)
+                cursor = event.seq
+                yield f"id: {event.seq}\nevent: change\ndata: {event.model_dump_json()}\n\n"
+            if not records:
+                # Comment line keeps idle proxies from closing the connection
+                yield ": idle\n\n"
+            if len(records) < CHANGES_LIMIT:
+                await change_notifier.wait(seen, CHANGE_POLL_INTERVAL)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -1,103 +1,124 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from app.db import driver
+from fastapi import APIRouter, HTTPException, Query, Request
+from datetime import datetime
+from typing import List, Optional
 from app.models.deal import Deal, DealCreate, DealUpdate
-from app.utils.search import search_nodes
+from app.models.batch import BatchGetRequest, BatchGetResult
+from app.models.bulk import BulkResult
+from app.models.page import Page
+from app.models.search import SearchHit
+from app.repositories.registry import repos
+from app.utils.pagination import DEFAULT_LIMIT, MAX_LIMIT
+from app.utils.filters import ListQuery, sort_pattern
+from app.utils.bulk import BULK_BATCH_SIZE, MAX_BULK_BATCH_SIZE, bulk_openapi, parse_bulk_rows
+from app.utils.fast_json import respond
+from app.utils.fields import FIELDS_DESCRIPTION, parse_fields
+from app.utils.streaming import NDJSON_RESPONSES, ndjson_response, wants_ndjson
+from app.utils.search import MAX_SEARCH_LIMIT, SEARCH_LIMIT
 
 router = APIRouter()
 
+# Fields list routes may sort by (prefix with - for descending)
+DEAL_SORTABLE = ["name", "amount", "closed_date"]
+
 # -------------------------------
 # Create Deal (linked to Opportunity)
 # -------------------------------
 @router.post("/", response_model=Deal)
-def create_deal(deal: DealCreate):
-    query = """
-    MERGE (d:Deal {id:$id})
-    SET d.name=$name, d.stage=$stage, d.value=$value, d.close_date=$close_date
-    WITH d
-    MATCH (o:Opportunity {id:$opportunity_id})
-    MERGE (d)-[:FOR_OPPORTUNITY]->(o)
-    RETURN d.id AS id, d.name AS name, d.stage AS stage, d.value AS value,
-           d.close_date AS close_date, o.id AS opportunity_id
-    """
-    with driver.session() as session:
-        record = session.run(query, **deal.model_dump()).single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Opportunity not found for this deal")
-        return Deal(**record)
+async def create_deal(deal: DealCreate):
+    created = await repos.deals.create(deal.model_dump())
+    if created is None:
+        raise HTTPException(status_code=404, detail="Opportunity not found for this deal")
+    return created
+
+# -------------------------------
+# Bulk Upsert Deals
+# -------------------------------
+@router.post("/bulk", response_model=BulkResult, openapi_extra=bulk_openapi(DealCreate))
+async def bulk_upsert_deals(
+    request: Request,
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=MAX_BULK_BATCH_SIZE),
+):
+    rows, results = await parse_bulk_rows(request, DealCreate)
+    return await repos.deals.bulk_upsert(rows, results, batch_size)
 
 # -------------------------------
 # Get All Deals
 # -------------------------------
-@router.get("/", response_model=List[Deal])
-def get_deals():
-    query = """
-    MATCH (d:Deal)-[:FOR_OPPORTUNITY]->(o:Opportunity)
-    RETURN d.id AS id, d.name AS name, d.stage AS stage, d.value AS value,
-           d.close_date AS close_date, o.id AS opportunity_id
-    """
-    with driver.session() as session:
-        return [Deal(**r) for r in session.run(query)]
+@router.get("/", response_model=Page[Deal], responses=NDJSON_RESPONSES)
+async def get_deals(
+    request: Request,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    stream: bool = Query(False, description="Stream all deals after the cursor as NDJSON"),
+    status: Optional[List[str]] = Query(None, description="One or more deal statuses"),
+    amount_gte: Optional[float] = Query(None),
+    amount_lte: Optional[float] = Query(None),
+    updated_since: Optional[datetime] = Query(None, description="Only rows created or updated at or after this time (ISO 8601)"),
+    sort: Optional[str] = Query(None, pattern=sort_pattern(DEAL_SORTABLE), description="Sort field, prefix with - for descending"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    q = ListQuery("d", cursor, sort, DEAL_SORTABLE)
+    q.any_of("status", status)
+    q.between("amount", amount_gte, amount_lte)
+    q.updated_since(updated_since)
+    selected = parse_fields(fields, Deal, q.sort_field)
+    if wants_ndjson(request, stream):
+        return ndjson_response(repos.deals.stream(q, selected))
+    return respond(await repos.deals.list(q, limit, selected), sparse=selected is not None)
+
+# -------------------------------
+# Search Deals by Name
+# -------------------------------
+# Declared before /{id} so "search_name" is not captured as an id
+@router.get("/search_name", response_model=List[SearchHit[Deal]])
+async def search_deals(
+    name: str = Query(..., min_length=1, description="Search deals by name"),
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+):
+    try:
+        return await repos.deals.search(name, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# -------------------------------
+# Batch Get Deals by ID
+# -------------------------------
+@router.post("/batch-get", response_model=BatchGetResult[Deal])
+async def batch_get_deals(batch: BatchGetRequest):
+    return respond(await repos.deals.get_many(batch.ids))
 
 # -------------------------------
 # Get Deal by ID
 # -------------------------------
 @router.get("/{deal_id}", response_model=Deal)
-def get_deal(deal_id: str):
-    query = """
-    MATCH (d:Deal {id:$id})-[:FOR_OPPORTUNITY]->(o:Opportunity)
-    RETURN d.id AS id, d.name AS name, d.stage AS stage, d.value AS value,
-           d.close_date AS close_date, o.id AS opportunity_id
-    """
-    with driver.session() as session:
-        record = session.run(query, id=deal_id).single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Deal not found")
-        return Deal(**record)
+async def get_deal(
+    deal_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    selected = parse_fields(fields, Deal)
+    deal = await repos.deals.get(deal_id, selected)
+    if deal is None:
+        raise HTTPException(status_code=404, detail="Deal not found")
+    return respond(deal, sparse=selected is not None)
 
 # -------------------------------
 # Update Deal
 # -------------------------------
 @router.patch("/{deal_id}", response_model=Deal)
-def update_deal(deal_id: str, deal: DealUpdate):
-    fields = ", ".join([f"d.{k}=${k}" for k in deal.model_dump(exclude_unset=True).keys()])
-    if not fields:
+async def update_deal(deal_id: str, deal: DealUpdate):
+    updates = deal.model_dump(exclude_unset=True)
+    if not updates:
         raise HTTPException(status_code=400, detail="No fields to update")
-    
-    query = f"""
-    MATCH (d:Deal {{id:$id}})-[:FOR_OPPORTUNITY]->(o:Opportunity)
-    SET {fields}
-    RETURN d.id AS id, d.name AS name, d.stage AS stage, d.value AS value,
-           d.close_date AS close_date, o.id AS opportunity_id
-    """
-    with driver.session() as session:
-        record = session.run(query, **{"id": deal_id, **deal.model_dump(exclude_unset=True)}).single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Deal not found")
-        return Deal(**record)
+    updated = await repos.deals.update(deal_id, updates)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Deal not found")
+    return updated
 
 # -------------------------------
 # Optional: Link Deal to Account
 # -------------------------------
 @router.post("/{deal_id}/link-account/{account_id}")
-def link_deal_to_account(deal_id: str, account_id: str):
-    query = """
-    MATCH (d:Deal {id:$deal_id}), (a:Account {id:$account_id})
-    MERGE (d)-[:BELONGS_TO]->(a)
-    RETURN d.id AS deal_id, a.id AS account_id
-    """
-    with driver.session() as session:
-        record = session.run(query, deal_id=deal_id, account_id=account_id).single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Deal or Account not found")
-        return {"message": f"Deal {deal_id} linked to Account {account_id}"}
-
-
-#Search by activity name:
-@router.get("/search_name")
-def search_users(name: str = Query(..., description="Search Deal by name")):
-    try:
-        results = search_nodes("Deal",name)
-        return results
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+async def link_deal_to_account(deal_id: str, account_id: str):
+    if not await repos.deals.link_account(deal_id, account_id):
+        raise HTTPException(status_code=404, detail="Deal or Account not found")
+    return {"message": f"Deal {deal_id} linked to Account {account_id}"}
@@ -0,0 +1,58 @@
+import asyncio
+import os
+from typing import Any, Dict
+from fastapi import APIRouter, Response
+from app import db
+from app.repositories.registry import repos
+
+router = APIRouter()
+
+# Seconds /readyz waits for Neo4j to answer before calling the worker unready
+READY_TIMEOUT = float(os.getenv("READY_TIMEOUT", "2"))
+# Unready once this share of the pool (per server) is checked out
+READY_MAX_POOL_USAGE = float(os.getenv("READY_MAX_POOL_USAGE", "1.0"))
+
+
+def pool_report() -> Dict[str, Any]:
+    usage = db.pool_usage()
+    if usage is None:
+        return {"available": False}
+    busiest = max((counts["in_use"] for counts in usage["addresses"].values()), default=0)
+    saturation = busiest / usage["max_size"] if usage["max_size"] else 0.0
+    return {
+        "available": True,
+        **usage,
+        "saturation": round(saturation, 3),
+        "saturated": saturation >= READY_MAX_POOL_USAGE,
+    }
+
+# -------------------------------
+# Liveness: the process is serving requests
+# -------------------------------
+@router.get("/healthz")
+async def healthz():
+    return {"status": "ok", "driver": db.driver is not None, "pool": pool_report()}
+
+# -------------------------------
+# Readiness: Neo4j answers and the pool has room
+# -------------------------------
+@router.get("/readyz")
+async def readyz(response: Response):
+    pool = pool_report()
+    report = {"status": "ready", "database": "unknown", "pool": pool}
+    if repos.backend == "memory":
+        report["database"] = "in-memory"
+    elif db.driver is None:
+        report.update(status="unready", database="driver closed")
+    elif pool.get("saturated"):
+        # A ping would only queue behind the requests holding the pool
+        report["status"] = "unready"
+    else:
+        try:
+            await asyncio.wait_for(db.ping(db.driver), READY_TIMEOUT)
+            report["database"] = "reachable"
+        except Exception as e:
+            report.update(status="unready", database=f"unreachable: {type(e).__name__}")
+    if report["status"] != "ready":
+        response.status_code = 503
+    return report
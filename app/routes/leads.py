@@ -1,94 +1,112 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from app.db import driver
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from datetime import datetime
+from typing import List, Optional
 from app.models.lead import Lead, LeadCreate, LeadUpdate
-from app.utils.search import search_nodes
+from app.models.batch import BatchGetRequest, BatchGetResult
+from app.models.bulk import BulkResult
+from app.models.page import Page
+from app.models.search import SearchHit
+from app.models.scoring import ScoringRun
+from app.repositories.registry import repos, require_neo4j
+from app.utils.pagination import DEFAULT_LIMIT, MAX_LIMIT
+from app.utils.filters import ListQuery, sort_pattern
+from app.utils.bulk import BULK_BATCH_SIZE, MAX_BULK_BATCH_SIZE, bulk_openapi, parse_bulk_rows
+from app.utils.fast_json import respond
+from app.utils.fields import FIELDS_DESCRIPTION, parse_fields
+from app.utils.streaming import NDJSON_RESPONSES, ndjson_response, wants_ndjson
+from app.utils.search import MAX_SEARCH_LIMIT, SEARCH_LIMIT
+from app.utils.scoring import MAX_SCORING_BATCH_SIZE, SCORING_BATCH_SIZE, score_all_leads, scoring_lock
 
 router = APIRouter()
 
+# Fields list routes may sort by (prefix with - for descending)
+LEAD_SORTABLE = ["name", "score", "value"]
+
 # Create Lead
 @router.post("/", response_model=Lead)
-def create_lead(lead: LeadCreate):
-    query = """
-    MERGE (l:Lead {id:$id})
-    ON CREATE SET l.name=$name, l.email=$email, l.source=$source, l.status=$status, l.score=$score, l.value=$value
-    ON MATCH SET l.name=$name, l.email=$email, l.source=$source, l.status=$status, l.score=$score, l.value=$value
-    WITH l
-    OPTIONAL MATCH (u:User {id:$assigned_to})
-    OPTIONAL MATCH (a:Account {id:$account_id})
-    FOREACH (_ IN CASE WHEN u IS NOT NULL THEN [1] ELSE [] END |
-        MERGE (l)-[:ASSIGNED_TO]->(u)
-    )
-    FOREACH (_ IN CASE WHEN a IS NOT NULL THEN [1] ELSE [] END |
-        MERGE (l)-[:BELONGS_TO]->(a)
-    )
-    RETURN l.id AS id, l.name AS name, l.email AS email, l.source AS source,
-           l.status AS status, l.score AS score, l.value AS value,
-           $assigned_to AS assigned_to, $account_id AS account_id
-    """
-    with driver.session() as session:
-        result = session.run(query, **lead.model_dump())
-        record = result.single()
-        return Lead(**record)
+async def create_lead(lead: LeadCreate):
+    return await repos.leads.create(lead.model_dump())
+
+# Bulk Upsert Leads
+@router.post("/bulk", response_model=BulkResult, openapi_extra=bulk_openapi(LeadCreate))
+async def bulk_upsert_leads(
+    request: Request,
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=MAX_BULK_BATCH_SIZE),
+):
+    rows, results = await parse_bulk_rows(request, LeadCreate)
+    return await repos.leads.bulk_upsert(rows, results, batch_size)
+
+# Recompute Lead Scores
+@router.post("/score", response_model=ScoringRun, dependencies=[Depends(require_neo4j)])
+async def score_leads(batch_size: int = Query(SCORING_BATCH_SIZE, ge=1, le=MAX_SCORING_BATCH_SIZE)):
+    if scoring_lock.locked():
+        raise HTTPException(status_code=409, detail="Lead scoring is already running")
+    return await score_all_leads(batch_size)
 
 # Get All Leads
-@router.get("/", response_model=List[Lead])
-def get_leads():
-    query = """
-    MATCH (l:Lead)
-    OPTIONAL MATCH (l)-[:ASSIGNED_TO]->(u:User)
-    OPTIONAL MATCH (l)-[:BELONGS_TO]->(a:Account)
-    RETURN l.id AS id, l.name AS name, l.email AS email, l.source AS source,
-           l.status AS status, l.score AS score, l.value AS value,
-           u.id AS assigned_to, a.id AS account_id
-    """
-    with driver.session() as session:
-        result = session.run(query)
-        leads = [Lead(**record) for record in result]
-        return leads
+@router.get("/", response_model=Page[Lead], responses=NDJSON_RESPONSES)
+async def get_leads(
+    request: Request,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    stream: bool = Query(False, description="Stream all leads after the cursor as NDJSON"),
+    status: Optional[List[str]] = Query(None, description="One or more lead statuses"),
+    source: Optional[List[str]] = Query(None, description="One or more lead sources"),
+    score_gte: Optional[float] = Query(None),
+    score_lte: Optional[float] = Query(None),
+    value_gte: Optional[float] = Query(None),
+    value_lte: Optional[float] = Query(None),
+    updated_since: Optional[datetime] = Query(None, description="Only rows created or updated at or after this time (ISO 8601)"),
+    sort: Optional[str] = Query(None, pattern=sort_pattern(LEAD_SORTABLE), description="Sort field, prefix with - for descending"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    q = ListQuery("l", cursor, sort, LEAD_SORTABLE)
+    q.any_of("status", status)
+    q.any_of("source", source)
+    q.between("score", score_gte, score_lte)
+    q.between("value", value_gte, value_lte)
+    q.updated_since(updated_since)
+    selected = parse_fields(fields, Lead, q.sort_field)
+    if wants_ndjson(request, stream):
+        return ndjson_response(repos.leads.stream(q, selected))
+    return respond(await repos.leads.list(q, limit, selected), sparse=selected is not None)
+
+# Search Leads by Name
+# Declared before /{id} so "search_name" is not captured as an id
+@router.get("/search_name", response_model=List[SearchHit[Lead]])
+async def search_leads(
+    name: str = Query(..., min_length=1, description="Search leads by name"),
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+):
+    try:
+        return await repos.leads.search(name, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Batch Get Leads by ID
+@router.post("/batch-get", response_model=BatchGetResult[Lead])
+async def batch_get_leads(batch: BatchGetRequest):
+    return respond(await repos.leads.get_many(batch.ids))
 
 # Get Lead by ID
 @router.get("/{lead_id}", response_model=Lead)
-def get_lead(lead_id: str):
-    query = """
-    MATCH (l:Lead {id:$id})
-    OPTIONAL MATCH (l)-[:ASSIGNED_TO]->(u:User)
-    OPTIONAL MATCH (l)-[:BELONGS_TO]->(a:Account)
-    RETURN l.id AS id, l.name AS name, l.email AS email, l.source AS source,
-           l.status AS status, l.score AS score, l.value AS value,
-           u.id AS assigned_to, a.id AS account_id
-    """
-    with driver.session() as session:
-        result = session.run(query, id=lead_id)
-        record = result.single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Lead not found")
-        return Lead(**record)
+async def get_lead(
+    lead_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    selected = parse_fields(fields, Lead)
+    lead = await repos.leads.get(lead_id, selected)
+    if lead is None:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    return respond(lead, sparse=selected is not None)
 
 # Update Lead
 @router.patch("/{lead_id}", response_model=Lead)
-def update_lead(lead_id: str, lead: LeadUpdate):
-    fields = ", ".join([f"l.{k}=${k}" for k in lead.model_dump(exclude_unset=True).keys()])
-    if not fields:
+async def update_lead(lead_id: str, lead: LeadUpdate):
+    updates = lead.model_dump(exclude_unset=True)
+    if not updates:
         raise HTTPException(status_code=400, detail="No fields to update")
-    query = f"""
-    MATCH (l:Lead {{id:$id}})
-    SET {fields}
-    RETURN l.id AS id, l.name AS name, l.email AS email, l.source AS source,
-           l.status AS status, l.score AS score, l.value AS value
-    """
-    with driver.session() as session:
-        result = session.run(query, **{"id": lead_id, **lead.model_dump(exclude_unset=True)})
-        record = result.single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Lead not found")
-        return Lead(**record)
-    
-#Search by activity name:
-@router.get("/search_name")
-def search_users(name: str = Query(..., description="Search Leads by name")):
-    try:
-        results = search_nodes("Lead",name)
-        return results
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))    
+    updated = await repos.leads.update(lead_id, updates)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    return updated
@@ -1,107 +1,127 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from app.db import driver
+from fastapi import APIRouter, HTTPException, Query, Request
+from datetime import datetime
+from typing import List, Optional
 from app.models.opportunity import Opportunity, OpportunityCreate, OpportunityUpdate
-from app.utils.search import search_nodes
+from app.models.batch import BatchGetRequest, BatchGetResult
+from app.models.bulk import BulkResult
+from app.models.page import Page
+from app.models.search import SearchHit
+from app.repositories.registry import repos
+from app.utils.pagination import DEFAULT_LIMIT, MAX_LIMIT
+from app.utils.filters import ListQuery, sort_pattern
+from app.utils.bulk import BULK_BATCH_SIZE, MAX_BULK_BATCH_SIZE, bulk_openapi, parse_bulk_rows
+from app.utils.fast_json import respond
+from app.utils.fields import FIELDS_DESCRIPTION, parse_fields
+from app.utils.streaming import NDJSON_RESPONSES, ndjson_response, wants_ndjson
+from app.utils.search import MAX_SEARCH_LIMIT, SEARCH_LIMIT
 
 router = APIRouter()
 
+# Fields list routes may sort by (prefix with - for descending)
+OPPORTUNITY_SORTABLE = ["name", "probability", "estimated_value", "expected_close_date"]
+
 # -------------------------------
 # Create Opportunity
 # -------------------------------
 @router.post("/", response_model=Opportunity)
-def create_opportunity(opportunity: OpportunityCreate):
-    query = """
-    MERGE (o:Opportunity {id:$id})
-    SET o.name=$name, o.stage=$stage, o.estimated_value=$estimated_value, 
-        o.probability=$probability, o.expected_close_date=$expected_close_date
-    WITH o
-    MATCH (l:Lead {id:$lead_id})
-    MERGE (o)-[:FOR_LEAD]->(l)
-    RETURN o.id AS id, o.name AS name, o.stage AS stage,
-           o.estimated_value AS estimated_value, o.probability AS probability,
-           o.expected_close_date AS expected_close_date, l.id AS lead_id
-    """
-    with driver.session() as session:
-        record = session.run(query, **opportunity.model_dump()).single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Lead not found for this opportunity")
-        return Opportunity(**record)
+async def create_opportunity(opportunity: OpportunityCreate):
+    created = await repos.opportunities.create(opportunity.model_dump())
+    if created is None:
+        raise HTTPException(status_code=404, detail="Lead not found for this opportunity")
+    return created
+
+# -------------------------------
+# Bulk Upsert Opportunities
+# -------------------------------
+@router.post("/bulk", response_model=BulkResult, openapi_extra=bulk_openapi(OpportunityCreate))
+async def bulk_upsert_opportunities(
+    request: Request,
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=MAX_BULK_BATCH_SIZE),
+):
+    rows, results = await parse_bulk_rows(request, OpportunityCreate)
+    return await repos.opportunities.bulk_upsert(rows, results, batch_size)
 
 # -------------------------------
 # Get All Opportunities
 # -------------------------------
-@router.get("/", response_model=List[Opportunity])
-def get_opportunities():
-    query = """
-    MATCH (o:Opportunity)-[:FOR_LEAD]->(l:Lead)
-    RETURN o.id AS id, o.name AS name, o.stage AS stage,
-           o.estimated_value AS estimated_value, o.probability AS probability,
-           o.expected_close_date AS expected_close_date, l.id AS lead_id
-    """
-    with driver.session() as session:
-        return [Opportunity(**r) for r in session.run(query)]
+@router.get("/", response_model=Page[Opportunity], responses=NDJSON_RESPONSES)
+async def get_opportunities(
+    request: Request,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    stream: bool = Query(False, description="Stream all opportunities after the cursor as NDJSON"),
+    stage: Optional[List[str]] = Query(None, description="One or more stages"),
+    probability_gte: Optional[float] = Query(None),
+    probability_lte: Optional[float] = Query(None),
+    estimated_value_gte: Optional[float] = Query(None),
+    estimated_value_lte: Optional[float] = Query(None),
+    updated_since: Optional[datetime] = Query(None, description="Only rows created or updated at or after this time (ISO 8601)"),
+    sort: Optional[str] = Query(None, pattern=sort_pattern(OPPORTUNITY_SORTABLE), description="Sort field, prefix with - for descending"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    q = ListQuery("o", cursor, sort, OPPORTUNITY_SORTABLE)
+    q.any_of("stage", stage)
+    q.between("probability", probability_gte, probability_lte)
+    q.between("estimated_value", estimated_value_gte, estimated_value_lte)
+    q.updated_since(updated_since)
+    selected = parse_fields(fields, Opportunity, q.sort_field)
+    if wants_ndjson(request, stream):
+        return ndjson_response(repos.opportunities.stream(q, selected))
+    return respond(await repos.opportunities.list(q, limit, selected), sparse=selected is not None)
+
+# -------------------------------
+# Search Opportunities by Name
+# -------------------------------
+# Declared before /{id} so "search_name" is not captured as an id
+@router.get("/search_name", response_model=List[SearchHit[Opportunity]])
+async def search_opportunities(
+    name: str = Query(..., min_length=1, description="Search opportunities by name"),
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+):
+    try:
+        return await repos.opportunities.search(name, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# -------------------------------
+# Batch Get Opportunities by ID
+# -------------------------------
+@router.post("/batch-get", response_model=BatchGetResult[Opportunity])
+async def batch_get_opportunities(batch: BatchGetRequest):
+    return respond(await repos.opportunities.get_many(batch.ids))
 
 # -------------------------------
 # Get Opportunity by ID
 # -------------------------------
 @router.get("/{opportunity_id}", response_model=Opportunity)
-def get_opportunity(opportunity_id: str):
-    query = """
-    MATCH (o:Opportunity {id:$id})-[:FOR_LEAD]->(l:Lead)
-    RETURN o.id AS id, o.name AS name, o.stage AS stage,
-           o.estimated_value AS estimated_value, o.probability AS probability,
-           o.expected_close_date AS expected_close_date, l.id AS lead_id
-    """
-    with driver.session() as session:
-        record = session.run(query, id=opportunity_id).single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Opportunity not found")
-        return Opportunity(**record)
+async def get_opportunity(
+    opportunity_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    selected = parse_fields(fields, Opportunity)
+    opportunity = await repos.opportunities.get(opportunity_id, selected)
+    if opportunity is None:
+        raise HTTPException(status_code=404, detail="Opportunity not found")
+    return respond(opportunity, sparse=selected is not None)
 
 # -------------------------------
 # Update Opportunity
 # -------------------------------
 @router.patch("/{opportunity_id}", response_model=Opportunity)
-def update_opportunity(opportunity_id: str, opportunity: OpportunityUpdate):
-    fields = ", ".join([f"o.{k}=${k}" for k in opportunity.model_dump(exclude_unset=True).keys()])
-    if not fields:
+async def update_opportunity(opportunity_id: str, opportunity: OpportunityUpdate):
+    updates = opportunity.model_dump(exclude_unset=True)
+    if not updates:
         raise HTTPException(status_code=400, detail="No fields to update")
-    
-    query = f"""
-    MATCH (o:Opportunity {{id:$id}})-[:FOR_LEAD]->(l:Lead)
-    SET {fields}
-    RETURN o.id AS id, o.name AS name, o.stage AS stage,
-           o.estimated_value AS estimated_value, o.probability AS probability,
-           o.expected_close_date AS expected_close_date, l.id AS lead_id
-    """
-    with driver.session() as session:
-        record = session.run(query, **{"id": opportunity_id, **opportunity.model_dump(exclude_unset=True)}).single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Opportunity not found")
-        return Opportunity(**record)
+    updated = await repos.opportunities.update(opportunity_id, updates)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Opportunity not found")
+    return updated
 
 # -------------------------------
 # Optional: Link Opportunity to Account
 # -------------------------------
 @router.post("/{opportunity_id}/link-account/{account_id}")
-def link_opportunity_to_account(opportunity_id: str, account_id: str):
-    query = """
-    MATCH (o:Opportunity {id:$opportunity_id}), (a:Account {id:$account_id})
-    MERGE (o)-[:BELONGS_TO]->(a)
-    RETURN o.id AS opportunity_id, a.id AS account_id
-    """
-    with driver.session() as session:
-        record = session.run(query, opportunity_id=opportunity_id, account_id=account_id).single()
-        if not record:
-            raise HTTPException(status_code=404, detail="Opportunity or Account not found")
-        return {"message": f"Opportunity {opportunity_id} linked to Account {account_id}"}
-    
-#Search by activity name:
-@router.get("/search_name")
-def search_users(name: str = Query(..., description="Search Opportunities by name")):
-    try:
-        results = search_nodes("Activity",name)
-        return results
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))    
+async def link_opportunity_to_account(opportunity_id: str, account_id: str):
+    if not await repos.opportunities.link_account(opportunity_id, account_id):
+        raise HTTPException(status_code=404, detail="Opportunity or Account not found")
+    return {"message": f"Opportunity {opportunity_id} linked to Account {account_id}"}
@@ -1,68 +1,97 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from app.db import driver
+from fastapi import APIRouter, HTTPException, Query, Request
+from datetime import datetime
+from typing import List, Optional
 from app.models.user import User, UserCreate, UserUpdate
-from app.utils.search import search_nodes
+from app.models.batch import BatchGetRequest, BatchGetResult
+from app.models.bulk import BulkResult
+from app.models.page import Page
+from app.models.search import SearchHit
+from app.repositories.registry import repos
+from app.utils.pagination import DEFAULT_LIMIT, MAX_LIMIT
+from app.utils.filters import ListQuery, sort_pattern
+from app.utils.bulk import BULK_BATCH_SIZE, MAX_BULK_BATCH_SIZE, bulk_openapi, parse_bulk_rows
+from app.utils.fast_json import respond
+from app.utils.fields import FIELDS_DESCRIPTION, parse_fields
+from app.utils.streaming import NDJSON_RESPONSES, ndjson_response, wants_ndjson
+from app.utils.search import MAX_SEARCH_LIMIT, SEARCH_LIMIT
 
 router = APIRouter()
 
+# Fields list routes may sort by (prefix with - for descending)
+USER_SORTABLE = ["name"]
+
 # Create User
 @router.post("/", response_model=User)
-def create_user(user: UserCreate):
-    query = """
-    MERGE (u:User {id:$id})
-    ON CREATE SET u.name=$name, u.role=$role, u.region=$region, u.email=$email
-    ON MATCH SET u.name=$name, u.role=$role, u.region=$region, u.email=$email
-    RETURN u.id AS id, u.name AS name, u.role AS role, u.region AS region, u.email AS email
-    """
-    with driver.session() as session:
-        result = session.run(query, **user.model_dump())
-        record = result.single()
-        return User(**record)
+async def create_user(user: UserCreate):
+    return await repos.users.create(user.model_dump())
+
+# Bulk Upsert Users
+@router.post("/bulk", response_model=BulkResult, openapi_extra=bulk_openapi(UserCreate))
+async def bulk_upsert_users(
+    request: Request,
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=MAX_BULK_BATCH_SIZE),
+):
+    rows, results = await parse_bulk_rows(request, UserCreate)
+    return await repos.users.bulk_upsert(rows, results, batch_size)
 
 # Get All Users
-@router.get("/", response_model=List[User])
-def get_users():
-    query = "MATCH (u:User) RETURN u.id AS id, u.name AS name, u.role AS role, u.region AS region, u.email AS email"
-    with driver.session() as session:
-        result = session.run(query)
-        users = [User(**record) for record in result]
-        return users
+@router.get("/", response_model=Page[User], responses=NDJSON_RESPONSES)
+async def get_users(
+    request: Request,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    stream: bool = Query(False, description="Stream all users after the cursor as NDJSON"),
+    region: Optional[List[str]] = Query(None, description="One or more regions"),
+    role: Optional[List[str]] = Query(None, description="One or more roles"),
+    updated_since: Optional[datetime] = Query(None, description="Only rows created or updated at or after this time (ISO 8601)"),
+    sort: Optional[str] = Query(None, pattern=sort_pattern(USER_SORTABLE), description="Sort field, prefix with - for descending"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    q = ListQuery("u", cursor, sort, USER_SORTABLE)
+    q.any_of("region", region)
+    q.any_of("role", role)
+    q.updated_since(updated_since)
+    selected = parse_fields(fields, User, q.sort_field)
+    if wants_ndjson(request, stream):
+        return ndjson_response(repos.users.stream(q, selected))
+    return respond(await repos.users.list(q, limit, selected), sparse=selected is not None)
+
+# Search Users by Name
+# Declared before /{id} so "search_name" is not captured as an id
+@router.get("/search_name", response_model=List[SearchHit[User]])
+async def search_users(
+    name: str = Query(..., min_length=1, description="Search users by name"),
+    limit: int = Query(SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+):
+    try:
+        return await repos.users.search(name, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Batch Get Users by ID
+@router.post("/batch-get", response_model=BatchGetResult[User])
+async def batch_get_users(batch: BatchGetRequest):
+    return respond(await repos.users.get_many(batch.ids))
 
 # Get User by ID
 @router.get("/{user_id}", response_model=User)
-def get_user(user_id: str):
-    query = "MATCH (u:User {id:$id}) RETURN u.id AS id, u.name AS name, u.role AS role, u.region AS region, u.email AS email"
-    with driver.session() as session:
-        result = session.run(query, id=user_id)
-        record = result.single()
-        if not record:
-            raise HTTPException(status_code=404, detail="User not found")
-        return User(**record)
+async def get_user(
+    user_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+):
+    selected = parse_fields(fields, User)
+    user = await repos.users.get(user_id, selected)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return respond(user, sparse=selected is not None)
 
 # Update User
 @router.patch("/{user_id}", response_model=User)
-def update_user(user_id: str, user: UserUpdate):
-    fields = ", ".join([f"u.{k}=${k}" for k in user.model_dump(exclude_unset=True).keys()])
-    if not fields:
+async def update_user(user_id: str, user: UserUpdate):
+    updates = user.model_dump(exclude_unset=True)
+    if not updates:
         raise HTTPException(status_code=400, detail="No fields to update")
-    query = f"""
-    MATCH (u:User {{id:$id}})
-    SET {fields}
-    RETURN u.id AS id, u.name AS name, u.role AS role, u.region AS region, u.email AS email
-    """
-    with driver.session() as session:
-        result = session.run(query, **{"id": user_id, **user.dict(exclude_unset=True)})
-        record = result.single()
-        if not record:
-            raise HTTPException(status_code=404, detail="User not found")
-        return User(**record)
-
-#Search by activity name:
-@router.get("/search_name")
-def search_users(name: str = Query(..., description="Search Users by name")):
-    try:
-        results = search_nodes("User",name)
-        return results
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+    updated = await repos.users.update(user_id, updates)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return updated
@@ -0,0 +1,119 @@
+# schema.py
+from typing import Dict, List
+from neo4j import AsyncDriver
+from neo4j.exceptions import Neo4jError
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Every create/get route MERGEs or MATCHes on `id`; the constraint also backs it with an index
+UNIQUE_ID_LABELS = ["User", "Lead", "Account", "Opportunity", "Deal", "Activity", "Rollup"]
+
+# Other (label, property) pairs that must be unique
+UNIQUE_PROPERTIES = [
+    ("Change", "seq"),
+    ("Sequence", "name"),
+]
+
+# (label, property) pairs the list routes filter or sort on; every sortable
+# field needs one, or ordering and cursor seeks fall back to a scan and sort
+PROPERTY_INDEXES = [
+    ("Lead", "name"),
+    ("Lead", "status"),
+    ("Lead", "email"),
+    ("Lead", "source"),
+    ("Lead", "score"),
+    ("Lead", "value"),
+    ("Account", "name"),
+    ("Account", "industry"),
+    ("Account", "size"),
+    ("Account", "revenue"),
+    ("Opportunity", "name"),
+    ("Opportunity", "stage"),
+    ("Opportunity", "probability"),
+    ("Opportunity", "estimated_value"),
+    ("Opportunity", "expected_close_date"),
+    ("Deal", "name"),
+    ("Deal", "status"),
+    ("Deal", "amount"),
+    ("Deal", "closed_date"),
+    ("Activity", "type"),
+    ("Activity", "channel"),
+    ("Activity", "timestamp"),
+    ("Activity", "duration"),
+    ("User", "name"),
+    ("User", "region"),
+    ("User", "role"),
+] + [(label, "updated_at") for label in UNIQUE_ID_LABELS if label != "Rollup"]
+
+# Full-text indexes behind the /search_name routes
+FULLTEXT_INDEXES = {
+    "User": ["name"],
+    "Lead": ["name"],
+    "Account": ["name"],
+    "Opportunity": ["name"],
+    "Deal": ["name"],
+    "Activity": ["type", "note"],
+}
+
+
+def fulltext_index_name(label: str) -> str:
+    return f"{label.lower()}_fulltext"
+
+
+def schema_statements() -> Dict[str, str]:
+    """Index/constraint name -> idempotent DDL statement."""
+    statements = {}
+    for label in UNIQUE_ID_LABELS:
+        name = f"{label.lower()}_id_unique"
+        statements[name] = f"CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{label}) REQUIRE n.id IS UNIQUE"
+    for label, prop in UNIQUE_PROPERTIES:
+        name = f"{label.lower()}_{prop}_unique"
+        statements[name] = f"CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE"
+    for label, prop in PROPERTY_INDEXES:
+        name = f"{label.lower()}_{prop}"
+        statements[name] = f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
+    for label, props in FULLTEXT_INDEXES.items():
+        name = fulltext_index_name(label)
+        fields = ", ".join(f"n.{prop}" for prop in props)
+        statements[name] = f"CREATE FULLTEXT INDEX {name} IF NOT EXISTS FOR (n:{label}) ON EACH [{fields}]"
+    return statements
+
+
+async def index_report(driver: AsyncDriver) -> Dict[str, List[str]]:
+    """Which of our expected indexes are missing, and which are not ONLINE yet."""
+    expected = set(schema_statements())
+    async with driver.session() as session:
+        result = await session.run("SHOW INDEXES YIELD name, owningConstraint, state, populationPercent")
+        # A uniqueness constraint is backed by an index that carries the constraint's name
+        found = {}
+        async for record in result:
+            found[record["owningConstraint"] or record["name"]] = record
+    populating = [
+        f"{name} ({found[name]['state']}, {found[name]['populationPercent']:.0f}%)"
+        for name in sorted(expected & set(found))
+        if found[name]["state"] != "ONLINE"
+    ]
+    return {"missing": sorted(expected - set(found)), "populating": populating}
+
+
+async def ensure_schema(driver: AsyncDriver) -> Dict[str, List[str]]:
+    """
+    Create constraints and indexes if they do not exist yet, then report
+    anything still missing or populating. Safe to run on every startup.
+    """
+    async with driver.session() as session:
+        for name, statement in schema_statements().items():
+            try:
+                result = await session.run(statement)
+                await result.consume()
+            except Neo4jError as e:
+                # e.g. duplicate ids already in the data block the uniqueness constraint
+                logger.error(f"Could not create {name}: {e.message}")
+
+    report = await index_report(driver)
+    if report["missing"]:
+        logger.warning(f"Missing indexes: {', '.join(report['missing'])}")
+    if report["populating"]:
+        logger.warning(f"Indexes still populating: {', '.join(report['populating'])}")
+    return report
@@ -0,0 +1,99 @@
+# tests/batch_test.py
+import asyncio
+from types import SimpleNamespace
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.repositories.memory import MemoryGraph
+from app.repositories.registry import repos
+from app.utils import query
+
+
+@pytest.fixture
+def client():
+    repos.use("memory", MemoryGraph())
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        repos.use("neo4j")
+
+
+def test_operations_run_in_order_with_back_references(client):
+    operations = [
+        {"op": "create", "entity": "user", "ref": "rep", "data": {"name": "Ada", "role": "rep"}},
+        {"op": "create", "entity": "account", "ref": "acme", "data": {"id": "a1", "name": "Acme"}},
+        {"op": "create", "entity": "lead", "ref": "lead", "data": {"name": "L", "account_id": "$acme", "assigned_to": "$rep"}},
+        {"op": "create", "entity": "opportunity", "ref": "opp", "data": {"name": "O", "lead_id": "$lead"}},
+        {"op": "link", "entity": "opportunity", "id": "$opp", "data": {"account_id": "$acme"}},
+        {"op": "update", "entity": "lead", "id": "$lead", "data": {"status": "Qualified"}},
+    ]
+    response = client.post("/batch", json={"operations": operations})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == list(range(6)) and results[1]["id"] == "a1"
+    lead = client.get(f"/leads/{results[2]['id']}").json()
+    assert lead["account_id"] == "a1" and lead["assigned_to"] == results[0]["id"] and lead["status"] == "Qualified"
+    assert results[4]["item"] is None and results[5]["item"]["status"] == "Qualified"
+
+
+def test_failed_operation_rolls_back_the_whole_batch(client):
+    operations = [
+        {"op": "create", "entity": "lead", "id": "l1", "data": {"name": "L"}},
+        {"op": "create", "entity": "deal", "data": {"name": "D", "opportunity_id": "missing"}},
+    ]
+    response = client.post("/batch", json={"operations": operations})
+    assert response.status_code == 404 and response.json()["detail"].startswith("Operation 1 (create deal")
+    assert client.get("/leads/l1").status_code == 404
+
+
+def test_invalid_operations_are_rejected_before_writing(client):
+    unknown_ref = [{"op": "update", "entity": "lead", "id": "$nope", "data": {"name": "X"}}]
+    assert client.post("/batch", json={"operations": unknown_ref}).status_code == 400
+    bad_email = [{"op": "create", "entity": "user", "data": {"name": "A", "role": "rep", "email": "x"}}]
+    response = client.post("/batch", json={"operations": bad_email})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "operations", 0, "data", "email"]
+    assert client.post("/batch", json={"operations": [{"op": "link", "entity": "user", "id": "u1",
+                                                       "data": {"account_id": "a1"}}]}).status_code == 400
+
+
+class FakeSession:
+    def __init__(self, transactions):
+        self.transactions = transactions
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute_write(self, work):
+        tx = object()
+        self.transactions.append(tx)
+        return await work(tx)
+
+
+def test_atomic_shares_one_transaction_and_defers_callbacks(monkeypatch):
+    transactions, seen, done = [], [], []
+    monkeypatch.setattr(query, "get_driver", lambda: SimpleNamespace(session=lambda: FakeSession(transactions)))
+
+    async def statement(tx):
+        seen.append(tx)
+        query.after_commit(lambda: done.append(len(seen)))
+
+    async def work():
+        await query.write_tx(statement)
+        await query.write_tx(statement)
+        assert query.in_transaction() and done == []
+
+    asyncio.run(query.atomic(work))
+    assert len(transactions) == 1 and seen == [transactions[0]] * 2 and done == [2, 2]
+
+    async def failing():
+        await query.write_tx(statement)
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(query.atomic(failing))
+    assert done == [2, 2] and not query.in_transaction()
@@ -0,0 +1,65 @@
+# tests/benchmarks_test.py
+import asyncio
+import argparse
+import random
+import httpx
+from app.main import app
+from app.repositories.memory import MemoryGraph
+from app.repositories.registry import repos
+from benchmarks.generate import Cardinalities, generate, load
+from benchmarks.report import compare, latency_summary, scenario_report
+from benchmarks import serialization
+from benchmarks.scenarios import SCENARIOS, Context, run_scenario
+
+SMALL = Cardinalities(users=3, accounts=4, leads_per_user=5, opportunities_per_lead=1, deals_per_opportunity=0.5,
+                      activities_per_lead=2)
+
+
+def test_generate_is_seeded_and_follows_cardinalities():
+    data = generate(SMALL, seed=7, progress=False)
+    assert data == generate(SMALL, seed=7, progress=False)
+    assert data != generate(SMALL, seed=8, progress=False)
+    assert len(data["leads"]) == 15 and len(data["opportunities"]) == 15 and len(data["activities"]) == 30
+    lead_ids = {lead["id"] for lead in data["leads"]}
+    assert all(opportunity["lead_id"] in lead_ids for opportunity in data["opportunities"])
+
+
+def test_latency_summary():
+    summary = latency_summary([i / 1000 for i in range(1, 101)])
+    assert summary["p50_ms"] == 50.5 and summary["p99_ms"] == 99.01 and summary["max_ms"] == 100
+
+
+def test_in_process_run_has_no_errors():
+    data = generate(SMALL, seed=1, progress=False)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await load(client, data, progress=False)
+            ctx = Context(data, random.Random(1), run_id="test")
+            return [await run_scenario(client, name, ctx, 20, 4, warmup=2, progress=False) for name in SCENARIOS]
+
+    repos.use("memory", MemoryGraph())
+    try:
+        results = asyncio.run(main())
+    finally:
+        repos.use("neo4j")
+    reports = {result.scenario: scenario_report(result) for result in results}
+    assert all(report["requests"] == 20 and report["errors"] == 0 for report in reports.values())
+    assert set(reports["mixed"]["operations"]) <= {"get", "list", "search", "create", "update"}
+
+    slower = {"commit": "b", "scenarios": {"get": {**reports["get"], "p99_ms": reports["get"]["p99_ms"] * 2}}}
+    lines = compare({"commit": "a", "scenarios": reports}, slower)
+    assert "p99_ms" in lines[1] and "+100.0%, worse" in lines[1]
+
+
+def test_serialization_benchmark_restores_the_backend():
+    graph = MemoryGraph()
+    repos.use("memory", graph)
+    try:
+        args = argparse.Namespace(users=2, leads_per_user=5, page_size=4, rounds=1, seed=1, quiet=True)
+        report = asyncio.run(serialization.benchmark(args))
+        assert report["modes"]["fast"]["rows"] == 10
+        assert repos.backend == "memory" and repos.graph is graph and not graph.nodes
+    finally:
+        repos.use("neo4j")
@@ -0,0 +1,67 @@
+# tests/bulk_test.py
+import asyncio
+from neo4j.exceptions import ServiceUnavailable
+from starlette.requests import Request
+from app.models.lead import LeadCreate
+from app.utils.bulk import bulk_batches, parse_bulk_rows, write_bulk
+from app.utils.rollups import rollup_deltas
+
+
+def make_request(body: bytes, content_type: str) -> Request:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+    scope = {"type": "http", "method": "POST", "headers": [(b"content-type", content_type.encode())]}
+    return Request(scope, receive)
+
+
+def test_json_array_reports_invalid_rows_individually():
+    body = b'[{"id": "l1", "name": "Ada"}, {"id": "l2"}, {"id": "l3", "name": "Grace"}]'
+    rows, results = asyncio.run(parse_bulk_rows(make_request(body, "application/json"), LeadCreate))
+    assert [index for index, _ in rows] == [0, 2]
+    assert results[1].status == "invalid" and results[1].id == "l2"
+    assert results[0] is None and results[2] is None
+
+
+def test_ndjson_body_skips_blank_lines_and_flags_malformed_json():
+    body = b'{"id": "l1", "name": "Ada"}\n\n{not json}\n{"id": "l2", "name": "Grace"}\n'
+    rows, results = asyncio.run(parse_bulk_rows(make_request(body, "application/x-ndjson"), LeadCreate))
+    assert [row["id"] for _, row in rows] == ["l1", "l2"]
+    assert results[1].status == "invalid"
+
+
+def test_repeated_id_starts_a_new_batch():
+    rows = [(0, {"id": "a"}), (1, {"id": "b"}), (2, {"id": "a"}), (3, {"id": "c"}), (4, {"id": "d"})]
+    batches = [[row["id"] for _, row in batch] for batch in bulk_batches(rows, 3)]
+    assert batches == [["a", "b"], ["a", "c", "d"]]
+
+
+def test_repeated_id_is_counted_once_in_rollups():
+    stored, rollups = {}, {}
+
+    async def write_batch(batch):
+        # Like the UPSERT_ROWS queries: every "before" is read before any row is merged
+        records = [{"before": stored.get(row["id"]), "after": row} for row in batch]
+        stored.update({row["id"]: row for row in batch})
+        for delta in rollup_deltas("lead", records):
+            rollups[delta["id"]] = rollups.get(delta["id"], 0) + delta["count"]
+        return {row["idx"] for row in batch}
+
+    lead = {"status": "New", "source": "web", "value": 10.0, "region": "EU"}
+    rows = [(0, {**lead, "id": "l1"}), (1, {**lead, "id": "l1", "status": "Qualified"}), (2, {**lead, "id": "l2"})]
+    result = asyncio.run(write_bulk(rows, [None] * 3, 1000, "missing", write_batch))
+    assert result.succeeded == 3
+    assert {key: count for key, count in rollups.items() if count} == {
+        "lead_breakdown|EU|Qualified|web": 1, "lead_breakdown|EU|New|web": 1,
+    }
+
+
+def test_driver_error_fails_only_its_batch():
+    async def write_batch(batch):
+        if batch[0]["id"] == "b":
+            raise ServiceUnavailable("connection lost")
+        return {row["idx"] for row in batch}
+
+    rows = [(0, {"id": "a"}), (1, {"id": "b"}), (2, {"id": "c"})]
+    result = asyncio.run(write_bulk(rows, [None] * 3, 1, "missing", write_batch))
+    assert [r.status for r in result.results] == ["upserted", "failed", "upserted"]
+    assert "connection lost" in result.results[1].error
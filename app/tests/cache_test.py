@@ -0,0 +1,37 @@
+# tests/cache_test.py
+from app.utils.cache import TTLCache
+
+
+def test_lru_eviction_and_counters():
+    cache = TTLCache("lead", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache("lead", maxsize=10, ttl=5)
+    cache.set("a", 1)
+    now[0] += 6
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_read_started_before_a_write_does_not_repopulate():
+    cache = TTLCache("lead", maxsize=10, ttl=60)
+    generation = cache.generation
+    cache.invalidate("a")  # a write lands while the read is in flight
+    cache.set("a", "stale", generation)
+    assert cache.get("a") is None
+
+
+def test_zero_ttl_disables_cache():
+    cache = TTLCache("lead", maxsize=10, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
@@ -0,0 +1,54 @@
+# tests/changes_test.py
+import asyncio
+from app.utils import changes
+from app.utils.changes import ChangeNotifier, ChangeSequencer
+
+
+def test_notify_wakes_waiters_early():
+    notifier = ChangeNotifier()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        seen = notifier.version
+        loop.call_later(0.01, notifier.notify)
+        await notifier.wait(seen, timeout=5)
+        return loop.time() - started
+
+    assert asyncio.run(main()) < 1
+
+
+def test_commit_between_read_and_wait_is_not_missed():
+    notifier = ChangeNotifier()
+    seen = notifier.version
+    notifier.notify()  # lands after the caller read the log, before it waits
+
+    async def main():
+        await asyncio.wait_for(notifier.wait(seen, timeout=5), 0.5)
+
+    asyncio.run(main())
+
+
+def test_sequencer_folds_requests_made_during_a_run(monkeypatch):
+    sequencer = ChangeSequencer(batch=10)
+    calls = []
+
+    async def fake_sequence(limit):
+        calls.append(limit)
+        await asyncio.sleep(0.01)
+        return [3, 10, 0][len(calls) - 1]
+
+    monkeypatch.setattr(changes, "sequence_changes", fake_sequence)
+    seen = changes.change_notifier.version
+
+    async def main():
+        sequencer.request()
+        await asyncio.sleep(0)
+        sequencer.request()
+        sequencer.request()
+        await sequencer.drain()
+
+    asyncio.run(main())
+    # Requests made during a run add one more run, not two; a full batch runs again
+    assert calls == [10, 10, 10] and sequencer.sequenced == 13
+    assert changes.change_notifier.version == seen + 2
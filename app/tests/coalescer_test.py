@@ -0,0 +1,88 @@
+# tests/coalescer_test.py
+import asyncio
+from app.utils.coalescer import WriteCoalescer
+from app.utils.logger import request_id
+
+
+def fake_write(calls, fail_on=None):
+    async def tracked_write(entity, op, fields, query, rows):
+        calls.append([row["id"] for row in rows])
+        if fail_on and any(row["id"] == fail_on for row in rows):
+            raise RuntimeError(f"bad row {fail_on}")
+        # Rows whose id starts with "missing" are dropped, like a failed MATCH
+        return [{"idx": row["idx"], "id": row["id"]} for row in rows if not row["id"].startswith("missing")]
+    return tracked_write
+
+
+def test_concurrent_creates_share_one_transaction(monkeypatch):
+    calls = []
+    monkeypatch.setattr("app.utils.coalescer.tracked_write", fake_write(calls))
+    coalescer = WriteCoalescer("lead", "UNWIND", enabled=True, window_ms=5, max_rows=100)
+
+    async def main():
+        return await asyncio.gather(*(coalescer.submit({"id": i}) for i in ["a", "b", "missing"]))
+
+    a, b, missing = asyncio.run(main())
+    assert calls == [["a", "b", "missing"]]
+    assert (a["id"], b["id"], missing) == ("a", "b", None)
+    assert coalescer.stats()["batches"] == 1
+
+
+def test_full_batches_and_repeated_ids_flush_early(monkeypatch):
+    calls = []
+    monkeypatch.setattr("app.utils.coalescer.tracked_write", fake_write(calls))
+    coalescer = WriteCoalescer("lead", "UNWIND", enabled=True, window_ms=50, max_rows=2)
+
+    async def main():
+        await asyncio.gather(*(coalescer.submit({"id": i}) for i in ["a", "b", "c", "c"]))
+
+    asyncio.run(asyncio.wait_for(main(), 0.5))
+    assert calls == [["a", "b"], ["c"], ["c"]]
+
+
+def test_failed_batch_is_retried_row_by_row(monkeypatch):
+    calls = []
+    monkeypatch.setattr("app.utils.coalescer.tracked_write", fake_write(calls, fail_on="bad"))
+    coalescer = WriteCoalescer("lead", "UNWIND", enabled=True, window_ms=1, max_rows=100)
+
+    async def main():
+        return await asyncio.gather(*(coalescer.submit({"id": i}) for i in ["a", "bad"]), return_exceptions=True)
+
+    good, bad = asyncio.run(main())
+    assert good["id"] == "a"
+    assert isinstance(bad, RuntimeError)
+    assert coalescer.stats()["retried_batches"] == 1
+
+
+def test_drain_writes_queued_rows_and_waits_for_them(monkeypatch):
+    calls = []
+    monkeypatch.setattr("app.utils.coalescer.tracked_write", fake_write(calls))
+    coalescer = WriteCoalescer("lead", "UNWIND", enabled=True, window_ms=60000, max_rows=100)
+
+    async def main():
+        pending = [asyncio.ensure_future(coalescer.submit({"id": i})) for i in ["a", "b"]]
+        await asyncio.sleep(0)
+        await coalescer.drain()
+        assert all(task.done() for task in pending)
+        return coalescer.stats()
+
+    stats = asyncio.run(asyncio.wait_for(main(), 0.5))
+    assert calls == [["a", "b"]] and stats["in_flight"] == 0 and stats["pending"] == 0
+
+
+def test_batch_writes_do_not_run_in_a_callers_context(monkeypatch):
+    seen = []
+
+    async def tracked_write(entity, op, fields, query, rows):
+        seen.append(request_id.get())
+        return [{"idx": row["idx"], "id": row["id"]} for row in rows]
+
+    monkeypatch.setattr("app.utils.coalescer.tracked_write", tracked_write)
+    coalescer = WriteCoalescer("lead", "UNWIND", enabled=True, window_ms=1, max_rows=1)
+
+    async def main():
+        request_id.set("first-caller")
+        await coalescer.submit({"id": "a"})
+
+    asyncio.run(main())
+    assert seen == [None]
@@ -0,0 +1,10 @@
+# tests/conftest.py
+import atexit
+import os
+import shutil
+import tempfile
+
+# Loaded before any test module imports the app: app.utils.logger opens its
+# log file under LOG_DIR on import, so point it away from the working tree.
+os.environ["LOG_DIR"] = tempfile.mkdtemp(prefix="crm-api-test-logs-")
+atexit.register(shutil.rmtree, os.environ["LOG_DIR"], ignore_errors=True)
@@ -0,0 +1,48 @@
+# tests/fast_json_test.py
+import pytest
+from fastapi.testclient import TestClient
+from neo4j.time import DateTime
+from app.main import app
+from app.models.lead import Lead
+from app.repositories.memory import MemoryGraph
+from app.repositories.registry import repos
+from app.utils import fast_json
+
+
+@pytest.fixture
+def client():
+    repos.use("memory", MemoryGraph())
+    try:
+        with TestClient(app) as client:
+            client.post("/users/", json={"id": "u1", "name": "Ada", "role": "rep"})
+            for i in range(3):
+                client.post("/leads/", json={"id": f"l{i}", "name": f"Lead {i}", "email": f"lead{i}@example.com",
+                                             "value": 1000 * i, "assigned_to": "u1"})
+            yield client
+    finally:
+        repos.use("neo4j")
+
+
+def test_fast_path_sends_the_same_bytes(client, monkeypatch):
+    calls = [
+        ("get", "/leads/", {"params": {"limit": 2}}),
+        ("get", "/leads/l1", {}),
+        ("post", "/leads/batch-get", {"json": {"ids": ["l2", "nope"]}}),
+        ("get", "/users/u1", {}),
+    ]
+    validated = [getattr(client, method)(url, **kw).content for method, url, kw in calls]
+    monkeypatch.setattr(fast_json, "FAST_JSON", True)
+    fast = [getattr(client, method)(url, **kw) for method, url, kw in calls]
+    assert [r.content for r in fast] == validated
+    assert all(r.headers["content-type"] == "application/json" for r in fast)
+    # Missing rows still go through the route's own error handling
+    assert client.get("/leads/nope").status_code == 404
+
+
+def test_to_model_skips_validation_but_converts_neo4j_times(monkeypatch):
+    monkeypatch.setattr(fast_json, "FAST_JSON", True)
+    row = {"id": "l1", "name": "Ada", "email": "not-checked", "value": 5,
+           "created_at": DateTime(2025, 1, 2, 3, 4, 5), "relevance": 1.0}
+    lead = fast_json.to_model(Lead, row)
+    assert lead.email == "not-checked" and lead.created_at.year == 2025
+    assert '"value":5.0' in lead.model_dump_json()
@@ -0,0 +1,56 @@
+# tests/fields_test.py
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models.lead import Lead
+from app.repositories.memory import MemoryGraph
+from app.repositories.neo4j import Neo4jActivityRepository, Neo4jLeadRepository, Neo4jOpportunityRepository
+from app.repositories.registry import repos
+from app.utils.fields import parse_fields, sparse_model
+from app.utils.filters import ListQuery
+
+
+def test_parse_fields_adds_id_and_sort_field_in_model_order():
+    assert parse_fields(None, Lead) is None
+    assert parse_fields("status, name", Lead, "value") == ["name", "status", "value", "id"]
+    with pytest.raises(HTTPException) as e:
+        parse_fields("name,nope", Lead)
+    assert e.value.status_code == 400 and "nope" in e.value.detail
+
+
+def test_sparse_model_keeps_types_and_defaults():
+    model = sparse_model(Lead, ["name", "status", "id"])
+    assert model is sparse_model(Lead, ["name", "status", "id"])
+    assert model(id="l1", name="Ada").model_dump() == {"name": "Ada", "status": "New", "id": "l1"}
+
+
+def test_unrequested_expansions_are_skipped():
+    leads = Neo4jLeadRepository()
+    query = leads.list_query(ListQuery("l"), False, ["name", "status", "id"])
+    assert "ASSIGNED_TO" not in query and "BELONGS_TO" not in query
+    assert "RETURN l.id AS id, l.name AS name, l.status AS status" in " ".join(query.split())
+    query = leads.list_query(ListQuery("l"), False, ["account_id", "id"])
+    assert "BELONGS_TO" in query and "ASSIGNED_TO" not in query
+    # Rows are ordered again after the expansions, which may reorder them
+    assert query.rstrip().endswith("ORDER BY l.id")
+    # Without a selection every expansion and column is there
+    assert leads.related().count("OPTIONAL MATCH") == 2 and leads.projection().count(" AS ") == 11
+    assert Neo4jActivityRepository().related(["id"]) == ""
+    # Required parents are always matched
+    assert Neo4jOpportunityRepository().related(["id"]) == "MATCH (o)-[:FOR_LEAD]->(l:Lead)"
+
+
+def test_fields_param_narrows_responses():
+    repos.use("memory", MemoryGraph())
+    try:
+        with TestClient(app) as client:
+            client.post("/users/", json={"id": "u1", "name": "Ada", "role": "rep"})
+            client.post("/leads/", json={"id": "l1", "name": "Lead", "value": 5, "assigned_to": "u1"})
+            page = client.get("/leads/", params={"fields": "name,status"}).json()
+            assert page["items"] == [{"name": "Lead", "status": "New", "id": "l1"}]
+            assert client.get("/leads/l1", params={"fields": "assigned_to"}).json() == {"id": "l1", "assigned_to": "u1"}
+            assert client.get("/leads/l1", params={"fields": "bad"}).status_code == 400
+            assert len(client.get("/leads/l1").json()) == len(Lead.model_fields)
+    finally:
+        repos.use("neo4j")
@@ -0,0 +1,61 @@
+# tests/filters_test.py
+import pytest
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from app.models.lead import Lead
+from app.routes import accounts, activities, deals, leads, opportunities, user
+from app.schema import PROPERTY_INDEXES
+from app.utils.filters import ListQuery
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_unsorted_query_seeks_on_id():
+    q = ListQuery("l")
+    assert q.where() == "WHERE l.id IS NOT NULL"
+    assert q.order_by() == "ORDER BY l.id"
+
+    q = ListQuery("l", encode_cursor("lead-1"))
+    assert q.where() == "WHERE l.id > $after_id"
+    assert q.params == {"after_id": "lead-1"}
+
+
+def test_filters_compile_to_parameterized_predicates():
+    q = ListQuery("l").any_of("status", ["New"]).any_of("source", ["webinar", "ads"]).between("score", gte=50)
+    assert q.where() == (
+        "WHERE l.id IS NOT NULL AND l.status = $status AND l.source IN $source AND l.score >= $score_gte"
+    )
+    assert q.params == {"status": "New", "source": ["webinar", "ads"], "score_gte": 50}
+
+
+def test_sorted_cursor_seeks_past_sort_key_and_id():
+    q = ListQuery("d", encode_cursor("deal-9", "-amount", 50000), "-amount", ["amount"])
+    assert "(d.amount < $after_v OR (d.amount = $after_v AND d.id < $after_id))" in q.where()
+    assert q.order_by() == "ORDER BY d.amount DESC, d.id DESC"
+
+
+def test_cursor_from_another_sort_is_rejected():
+    with pytest.raises(HTTPException):
+        ListQuery("l", encode_cursor("lead-1"), "score", ["score"])
+    with pytest.raises(HTTPException):
+        ListQuery("l", sort="email", sortable=["score"])
+
+
+def test_page_uses_extra_row_as_next_marker():
+    leads = [Lead(id=f"lead-{i}", name=f"Lead {i}", score=i) for i in range(3)]
+    page = ListQuery("l", sort="score", sortable=["score"]).page(leads, limit=2)
+    assert [l.id for l in page.items] == ["lead-0", "lead-1"]
+    assert decode_cursor(page.next_cursor) == {"id": "lead-1", "sort": "score", "v": 1.0}
+    assert ListQuery("l").page(leads, limit=3).next_cursor is None
+
+
+def test_updated_since_assumes_utc_for_naive_times():
+    q = ListQuery("a").updated_since(datetime(2025, 1, 1, 12, 0))
+    assert "a.updated_at >= $updated_at_gte" in q.where()
+    assert q.params["updated_at_gte"] == datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_every_sortable_field_is_indexed():
+    for label, sortable in [("Account", accounts.ACCOUNT_SORTABLE), ("Activity", activities.ACTIVITY_SORTABLE),
+                            ("Deal", deals.DEAL_SORTABLE), ("Lead", leads.LEAD_SORTABLE),
+                            ("Opportunity", opportunities.OPPORTUNITY_SORTABLE), ("User", user.USER_SORTABLE)]:
+        assert {(label, field) for field in sortable} <= set(PROPERTY_INDEXES), label
@@ -0,0 +1,45 @@
+# tests/health_test.py
+import asyncio
+from fastapi import Response
+from app import db
+from app.routes import health
+
+
+def usage(in_use, max_size=10):
+    return lambda: {"max_size": max_size, "addresses": {"db:7687": {"in_use": in_use, "idle": max_size - in_use}}}
+
+
+def test_ready_when_database_answers(monkeypatch):
+    async def ping(driver):
+        pass
+    monkeypatch.setattr(db, "driver", object())
+    monkeypatch.setattr(db, "ping", ping)
+    monkeypatch.setattr(db, "pool_usage", usage(3))
+    response = Response()
+    report = asyncio.run(health.readyz(response))
+    assert response.status_code == 200
+    assert report["database"] == "reachable" and report["pool"]["saturation"] == 0.3
+
+
+def test_unready_when_pool_is_exhausted(monkeypatch):
+    async def ping(driver):
+        raise AssertionError("must not wait on an exhausted pool")
+    monkeypatch.setattr(db, "driver", object())
+    monkeypatch.setattr(db, "ping", ping)
+    monkeypatch.setattr(db, "pool_usage", usage(10))
+    response = Response()
+    report = asyncio.run(health.readyz(response))
+    assert response.status_code == 503
+    assert report["pool"]["saturated"]
+
+
+def test_unready_when_database_is_unreachable(monkeypatch):
+    async def ping(driver):
+        raise ConnectionError("refused")
+    monkeypatch.setattr(db, "driver", object())
+    monkeypatch.setattr(db, "ping", ping)
+    response = Response()
+    report = asyncio.run(health.readyz(response))
+    assert response.status_code == 503
+    assert report["database"] == "unreachable: ConnectionError"
+    assert report["pool"] == {"available": False}
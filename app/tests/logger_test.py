@@ -0,0 +1,44 @@
+# tests/logger_test.py
+import json
+import logging
+import os
+from logging.handlers import QueueHandler
+from app.utils.logger import DebugSampler, JsonFormatter, RequestIdFilter, _file_handler, get_logger, request_id
+
+
+def make_record(level=logging.INFO, msg="hello %s", args=("world",)):
+    return logging.LogRecord("app.test", level, __file__, 1, msg, args, None)
+
+
+def test_loggers_only_enqueue():
+    logger = get_logger("app.tests.queue")
+    assert [type(h) for h in logger.handlers] == [QueueHandler]
+    assert get_logger("app.tests.other").handlers[0] is logger.handlers[0]
+
+
+def test_json_output_carries_request_id():
+    token = request_id.set("req-1")
+    try:
+        record = make_record()
+        RequestIdFilter().filter(record)
+    finally:
+        request_id.reset(token)
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "hello world"
+    assert entry["request_id"] == "req-1"
+    assert entry["level"] == "INFO"
+
+
+def test_debug_sampling_never_drops_higher_levels():
+    sampler = DebugSampler(0.0)
+    assert not sampler.filter(make_record(logging.DEBUG))
+    assert sampler.filter(make_record(logging.INFO))
+    assert DebugSampler(1.0).filter(make_record(logging.DEBUG))
+
+
+def test_each_process_writes_its_own_file():
+    handler = _file_handler()
+    try:
+        assert os.path.basename(handler.baseFilename) == f"app.{os.getpid()}.log"
+    finally:
+        handler.close()
@@ -0,0 +1,31 @@
+# tests/metrics_test.py
+from prometheus_client import REGISTRY
+from app.utils.metrics import RequestTiming, _request, named_query, query_label, route_label, timed_query
+
+
+def list_leads():
+    pass
+
+
+def test_query_label_prefers_named_query_over_endpoint():
+    token = _request.set(RequestTiming({"endpoint": list_leads}))
+    try:
+        assert query_label() == "metrics_test.list_leads"
+        with named_query("leads.search"):
+            assert query_label() == "leads.search"
+        assert query_label() == "metrics_test.list_leads"
+    finally:
+        _request.reset(token)
+    assert query_label() == "unnamed"
+
+
+def test_timed_query_records_latency_and_rows():
+    with named_query("tests.timed"):
+        with timed_query() as timer:
+            timer.rows = 3
+    assert REGISTRY.get_sample_value("neo4j_query_duration_seconds_count", {"query": "tests.timed"}) == 1
+    assert REGISTRY.get_sample_value("neo4j_query_rows_sum", {"query": "tests.timed"}) == 3
+
+
+def test_unmatched_requests_share_one_route_label():
+    assert route_label({"path": "/leads/abc"}) == "unmatched"
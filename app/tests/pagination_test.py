@@ -0,0 +1,16 @@
+# tests/pagination_test.py
+import pytest
+from fastapi import HTTPException
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("lead-042")) == {"id": "lead-042"}
+    assert decode_cursor(encode_cursor("lead-042", "-score", 71.5)) == {"id": "lead-042", "sort": "-score", "v": 71.5}
+    assert decode_cursor(None) is None
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor")
+    assert exc.value.status_code == 400
@@ -0,0 +1,91 @@
+# tests/repositories_test.py
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.repositories.memory import MemoryGraph
+from app.repositories.neo4j import Neo4jLeadRepository
+from app.repositories.registry import repos
+
+
+@pytest.fixture
+def client():
+    repos.use("memory", MemoryGraph())
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        repos.use("neo4j")
+
+
+def seed(client):
+    client.post("/users/", json={"id": "u1", "name": "Ada", "role": "rep", "region": "EU"})
+    client.post("/accounts/", json={"id": "a1", "name": "Acme Corp", "industry": "tech"})
+    for i in range(5):
+        client.post("/leads/", json={"id": f"l{i}", "name": f"Lead {i}", "status": "New" if i % 2 else "Qualified",
+                                     "score": i * 10, "assigned_to": "u1", "account_id": "a1"})
+
+
+def test_crud_round_trip(client):
+    seed(client)
+    lead = client.get("/leads/l1").json()
+    assert lead["assigned_to"] == "u1" and lead["account_id"] == "a1" and lead["created_at"]
+
+    assert client.patch("/leads/l1", json={"status": "Won"}).json()["status"] == "Won"
+    assert client.get("/leads/missing").status_code == 404
+    assert client.post("/deals/", json={"id": "d1", "name": "x", "opportunity_id": "nope"}).status_code == 404
+
+    batch = client.post("/leads/batch-get", json={"ids": ["l2", "zz", "l2"]}).json()
+    assert [l["id"] for l in batch["items"]] == ["l2"] and batch["missing"] == ["zz"]
+
+
+def test_list_filters_sorting_and_cursor_paging(client):
+    seed(client)
+    page = client.get("/leads/", params={"status": "New", "limit": 1}).json()
+    assert [l["id"] for l in page["items"]] == ["l1"]
+    page = client.get("/leads/", params={"status": "New", "limit": 1, "cursor": page["next_cursor"]}).json()
+    assert [l["id"] for l in page["items"]] == ["l3"] and page["next_cursor"] is None
+
+    first = client.get("/leads/", params={"sort": "-score", "limit": 2}).json()
+    rest = client.get("/leads/", params={"sort": "-score", "cursor": first["next_cursor"]}).json()
+    assert [l["id"] for l in first["items"] + rest["items"]] == ["l4", "l3", "l2", "l1", "l0"]
+
+    streamed = client.get("/leads/", params={"stream": "true", "score_gte": 20}).text.splitlines()
+    assert [json.loads(line)["id"] for line in streamed] == ["l2", "l3", "l4"]
+
+
+def test_bulk_search_and_account_graph(client):
+    seed(client)
+    rows = [
+        {"id": "o1", "name": "Renewal", "stage": "Proposal", "lead_id": "l1"},
+        {"id": "o2", "name": "Orphan", "lead_id": "nope"},
+    ]
+    result = client.post("/opportunities/bulk", json=rows).json()
+    assert [r["status"] for r in result["results"]] == ["upserted", "not_found"]
+    client.post("/deals/", json={"id": "d1", "name": "Renewal deal", "opportunity_id": "o1"})
+
+    hits = client.get("/accounts/search_name", params={"name": "acm"}).json()
+    assert [h["item"]["id"] for h in hits] == ["a1"]
+
+    graph = client.get("/accounts/a1/graph").json()
+    lead = next(l for l in graph["leads"] if l["id"] == "l1")
+    assert lead["opportunities"][0]["deals"][0]["id"] == "d1"
+    assert client.get("/accounts/a1/graph", params={"depth": 1}).json()["leads"][0]["opportunities"] is None
+
+
+def test_cypher_only_routes_answer_501(client):
+    for method, path in [("GET", "/analytics/pipeline"), ("POST", "/analytics/pipeline/recompute"),
+                         ("GET", "/changes/"), ("GET", "/changes/stream"), ("POST", "/leads/score")]:
+        response = client.request(method, path)
+        assert response.status_code == 501, path
+        assert response.json()["detail"] == "Not available with the in-memory backend"
+
+
+def test_unknown_assigned_to_comes_back_null(client):
+    created = client.post("/leads/", json={"id": "l9", "name": "Lead", "assigned_to": "ghost", "account_id": "nope"}).json()
+    assert created["assigned_to"] is None and created["account_id"] is None
+    assert client.get("/leads/l9").json()["assigned_to"] is None
+    # The Neo4j queries read the ids back from the relationships they made, not from the input
+    for query in (Neo4jLeadRepository.UPSERT, Neo4jLeadRepository.UPSERT_ROWS):
+        assert "$assigned_to AS" not in query and "row.assigned_to AS" not in query
+        assert "head([(l)-[:ASSIGNED_TO]->(lu:User) | lu.id]) AS assigned_to" in query
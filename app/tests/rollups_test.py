@@ -0,0 +1,24 @@
+# tests/rollups_test.py
+from app.utils.rollups import NONE, rollup_deltas
+
+
+def test_new_deal_adds_to_its_status():
+    deltas = rollup_deltas("deal", [{"before": None, "after": {"status": "Won", "amount": 100.0}}])
+    assert deltas == [{"id": "deal_status|Won", "metric": "deal_status", "key": ["Won"],
+                       "count": 1, "total": 100.0, "weighted": 0.0}]
+
+
+def test_status_change_moves_between_rows_and_unchanged_rows_drop_out():
+    records = [
+        {"before": {"status": "Open", "amount": 50.0}, "after": {"status": "Won", "amount": 50.0}},
+        {"before": {"status": "Lost", "amount": 10.0}, "after": {"status": "Lost", "amount": 10.0}},
+    ]
+    deltas = {d["id"]: (d["count"], d["total"]) for d in rollup_deltas("deal", records)}
+    assert deltas == {"deal_status|Open": (-1, -50.0), "deal_status|Won": (1, 50.0)}
+
+
+def test_opportunity_weighted_value_and_missing_lead_dimensions():
+    opp = rollup_deltas("opportunity", [{"before": None, "after": {"stage": "Proposal", "estimated_value": 200.0, "probability": 0.25}}])
+    assert opp[0]["weighted"] == 50.0
+    lead = rollup_deltas("lead", [{"before": None, "after": {"status": "New", "source": None, "value": None, "region": None}}])
+    assert lead[0]["key"] == [NONE, "New", NONE]
@@ -0,0 +1,35 @@
+# tests/scoring_test.py
+from datetime import date
+import numpy as np
+from app.utils.scoring import FEATURES, WEIGHTS, features, score
+
+
+def lead(**overrides):
+    row = {"id": "l1", "value": None, "activities": 0, "last_activity": None,
+           "total_duration": 0.0, "high_touch": 0, "account": None}
+    return {**row, **overrides}
+
+
+def test_weights_cover_every_feature_and_bound_the_score():
+    assert len(WEIGHTS) == len(FEATURES)
+    assert np.isclose(WEIGHTS.sum(), 1.0)
+    assert score(np.ones((1, len(FEATURES))))[0] == 100.0
+
+
+def test_empty_lead_scores_zero_and_engagement_raises_score():
+    today = date(2025, 6, 30)
+    rows = [
+        lead(),
+        lead(id="l2", value=50000.0, activities=8, last_activity="2025-06-25T10:00:00Z",
+             total_duration=90.0, high_touch=4, account={"revenue": 2e6, "size": "Enterprise"}),
+    ]
+    matrix = features(rows, today)
+    assert matrix.shape == (2, len(FEATURES))
+    assert ((matrix >= 0) & (matrix <= 1)).all()
+    cold, warm = score(matrix)
+    assert cold == 0.0 and warm > 50
+
+
+def test_unparseable_timestamps_count_as_no_recent_activity():
+    matrix = features([lead(activities=1, last_activity="not a date")], date(2025, 6, 30))
+    assert matrix[0, FEATURES.index("recency")] == 0.0
@@ -0,0 +1,11 @@
+# tests/search_test.py
+from app.utils.search import fulltext_query
+
+
+def test_fulltext_query_matches_words_exactly_or_by_prefix():
+    assert fulltext_query("Acme corp") == "(acme OR acme*) (corp OR corp*)"
+
+
+def test_fulltext_query_escapes_lucene_syntax():
+    assert fulltext_query('AT&T (US)') == r"(at\&t OR at\&t*) (\(us\) OR \(us\)*)"
+    assert fulltext_query("   ") == ""
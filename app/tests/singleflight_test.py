@@ -0,0 +1,54 @@
+# tests/singleflight_test.py
+import asyncio
+from app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["row"]
+
+    async def main():
+        return await asyncio.gather(*(flight.do("q", fetch) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert results == [["row"]] * 5
+    assert flight.stats() == {"leaders": 1, "followers": 4, "in_flight": 0}
+
+
+def test_errors_fan_out_to_every_waiter():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(flight.do("q", fail), flight.do("q", fail), return_exceptions=True)
+
+    assert [str(e) for e in asyncio.run(main())] == ["boom", "boom"]
+
+
+def test_forget_starts_a_fresh_call_for_late_arrivals():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "row"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("q", fetch))
+        await asyncio.sleep(0)
+        flight.forget()  # a write committed while the first read was in flight
+        await flight.do("q", fetch)
+        await first
+
+    asyncio.run(main())
+    assert len(calls) == 2
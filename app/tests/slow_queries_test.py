@@ -0,0 +1,93 @@
+# tests/slow_queries_test.py
+import asyncio
+from types import SimpleNamespace
+from app.utils.slow_queries import SlowQueryLog, plan_summary, redact
+
+PROFILE = {
+    "operatorType": "ProduceResults@neo4j", "rows": 1, "dbHits": 0, "args": {},
+    "children": [{
+        "operatorType": "Filter@neo4j", "rows": 1, "dbHits": 40, "args": {"Details": "n.email = $email"},
+        "children": [{
+            "operatorType": "NodeByLabelScan@neo4j", "rows": 20, "dbHits": 21,
+            "args": {"Details": "n:Lead", "EstimatedRows": 20.0}, "children": [],
+        }],
+    }],
+}
+
+
+def test_redact_hides_sensitive_keys_and_trims_long_lists():
+    params = {"id": "l1", "email": "a@b.c", "rows": [{"id": str(i), "phone": "555"} for i in range(8)]}
+    redacted = redact(params)
+    assert redacted["id"] == "l1" and redacted["email"] == "***"
+    assert redacted["rows"][0] == {"id": "0", "phone": "***"}
+    assert redacted["rows"][-1] == "... 3 more"
+
+
+def test_plan_summary_totals_db_hits_and_flags_label_scans():
+    summary = plan_summary(PROFILE)
+    assert summary["db_hits"] == 61 and summary["rows"] == 1
+    assert summary["label_scans"] == ["n:Lead"]
+    assert [op["operator"] for op in summary["operators"]] == ["ProduceResults", "Filter", "NodeByLabelScan"]
+
+
+class FakeSession:
+    def __init__(self, statements):
+        self.statements = statements
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, **params):
+        self.statements.append(query)
+
+        async def consume():
+            return SimpleNamespace(profile=PROFILE, plan={"operatorType": "Merge@neo4j"})
+        return SimpleNamespace(consume=consume)
+
+
+def test_only_slow_statements_are_kept_and_sampled_for_plans(monkeypatch):
+    statements = []
+    monkeypatch.setattr("app.utils.slow_queries.get_driver", lambda: SimpleNamespace(session=lambda: FakeSession(statements)))
+    log = SlowQueryLog(threshold_ms=100, plan_sample=1.0, size=2)
+
+    async def main():
+        log.observe("leads.get_lead", "MATCH (n:Lead) RETURN n", {}, 0.05, 1)
+        log.observe("leads.get_lead", "MATCH (n:Lead)\n  RETURN n", {"email": "x"}, 0.2, 1)
+        log.observe("leads.create_lead", "MERGE (n:Lead {id: $id})", {"id": "l1"}, 0.3, 1)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert log.stats()["slow"] == 2
+    newest, oldest = log.recent()
+    assert oldest["query"] == "MATCH (n:Lead) RETURN n" and oldest["params"] == {"email": "***"}
+    assert oldest["plan"]["mode"] == "PROFILE" and oldest["plan"]["db_hits"] == 61
+    # Writes are only planned, never executed a second time
+    assert newest["plan"]["mode"] == "EXPLAIN"
+    assert statements[1].startswith("EXPLAIN MERGE")
+
+
+class HangingSession(FakeSession):
+    async def run(self, query, **params):
+        self.statements.append(query)
+        await asyncio.sleep(60)
+
+
+def test_close_cancels_plan_captures_in_flight(monkeypatch):
+    statements = []
+    monkeypatch.setattr("app.utils.slow_queries.get_driver", lambda: SimpleNamespace(session=lambda: HangingSession(statements)))
+    log = SlowQueryLog(threshold_ms=100, plan_sample=1.0)
+
+    async def main():
+        log.observe("leads.get_lead", "MATCH (n:Lead) RETURN n", {}, 0.2, 1)
+        await asyncio.sleep(0)
+        assert len(log._captures) == 1
+        await log.close()
+        return log._captures, log._planning
+
+    captures, planning = asyncio.run(asyncio.wait_for(main(), 1))
+    assert statements == ["PROFILE MATCH (n:Lead) RETURN n"]
+    assert not captures and not planning and log.recent()[0]["plan"] is None
@@ -0,0 +1,36 @@
+from typing import Dict, List, Type
+from pydantic import BaseModel
+from app.models.batch import BatchGetResult
+from app.utils.cache import TTLCache
+from app.utils.fast_json import to_model
+from app.utils.query import read
+
+
+async def batch_get(ids: List[str], query: str, model: Type[BaseModel], cache: TTLCache) -> BatchGetResult:
+    """
+    Resolve many ids in one round-trip. Ids already in the get-by-id cache are
+    served from it; `query` receives the rest as `$ids` and should
+    `UNWIND $ids AS id` into an index seek.
+    """
+    ids = list(dict.fromkeys(ids))
+    found: Dict[str, BaseModel] = {}
+    misses = []
+    for item_id in ids:
+        cached = cache.get(item_id)
+        if cached is not None:
+            found[item_id] = cached
+        else:
+            misses.append(item_id)
+
+    if misses:
+        generation = cache.generation
+        for record in await read(query, ids=misses):
+            item = to_model(model, record)
+            if item.id not in found:
+                found[item.id] = item
+                cache.set(item.id, item, generation)
+
+    return BatchGetResult(
+        items=[found[item_id] for item_id in ids if item_id in found],
+        missing=[item_id for item_id in ids if item_id not in found],
+    )
@@ -0,0 +1,113 @@
+import json
+import os
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple, Type
+from fastapi import HTTPException, Request
+from neo4j.exceptions import DriverError, Neo4jError
+from pydantic import BaseModel, ValidationError
+from app.models.bulk import BulkResult, BulkRowResult
+from app.utils.streaming import NDJSON_MEDIA_TYPE
+
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+MAX_BULK_BATCH_SIZE = 10000
+
+Rows = List[Tuple[int, Dict]]
+
+
+def bulk_openapi(model: Type[BaseModel]) -> dict:
+    """Request body docs for bulk routes, which read the raw body themselves."""
+    schema = {"type": "array", "items": model.model_json_schema()}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": schema},
+                NDJSON_MEDIA_TYPE: {"schema": model.model_json_schema()},
+            },
+        }
+    }
+
+
+async def parse_bulk_rows(request: Request, model: Type[BaseModel]) -> Tuple[Rows, List[Optional[BulkRowResult]]]:
+    """
+    Read a JSON array or NDJSON body. Rows that fail validation are reported
+    individually instead of rejecting the whole request.
+    """
+    body = await request.body()
+    if NDJSON_MEDIA_TYPE in request.headers.get("content-type", ""):
+        raw_rows = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                raw_rows.append(json.loads(line))
+            except ValueError as e:
+                raw_rows.append(e)
+    else:
+        try:
+            raw_rows = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(raw_rows, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+
+    rows: Rows = []
+    results: List[Optional[BulkRowResult]] = [None] * len(raw_rows)
+    for index, raw in enumerate(raw_rows):
+        if isinstance(raw, ValueError):
+            results[index] = BulkRowResult(index=index, status="invalid", error=f"Malformed JSON: {raw}")
+            continue
+        try:
+            rows.append((index, model.model_validate(raw).model_dump()))
+        except ValidationError as e:
+            row_id = raw.get("id") if isinstance(raw, dict) else None
+            error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            results[index] = BulkRowResult(index=index, id=row_id, status="invalid", error=error)
+    return rows, results
+
+
+def bulk_batches(rows: Rows, batch_size: int) -> Iterator[Rows]:
+    """
+    Split rows into batches of at most `batch_size`, starting a new batch
+    when an id repeats: the write queries snapshot every row's previous node
+    before merging any of them, so one id twice in a batch would be seen as
+    new (or unchanged) both times and counted twice in the rollups and the
+    change log.
+    """
+    batch: Rows = []
+    ids: Set[str] = set()
+    for index, row in rows:
+        if len(batch) >= batch_size or row["id"] in ids:
+            yield batch
+            batch, ids = [], set()
+        batch.append((index, row))
+        ids.add(row["id"])
+    if batch:
+        yield batch
+
+
+async def write_bulk(rows: Rows, results: List[Optional[BulkRowResult]], batch_size: int, not_found: str,
+                     write_batch: Callable[[List[Dict]], Awaitable[Set[int]]]) -> BulkResult:
+    """
+    Write rows in batches of up to `batch_size`, one row per id in each (see
+    `bulk_batches`); later rows for an id win. `write_batch` receives each batch
+    with an `idx` on every row and returns the idx of the rows it wrote; rows
+    it drops (e.g. a MATCH on a missing related node) are reported with
+    `not_found`.
+    """
+    for chunk in bulk_batches(rows, batch_size):
+        batch = [{**row, "idx": index} for index, row in chunk]
+        try:
+            written = await write_batch(batch)
+        except (Neo4jError, DriverError) as e:
+            # Earlier batches have committed; report this one's rows rather than fail the request
+            for index, row in chunk:
+                results[index] = BulkRowResult(index=index, id=row["id"], status="failed", error=str(e))
+            continue
+        for index, row in chunk:
+            if index in written:
+                results[index] = BulkRowResult(index=index, id=row["id"], status="upserted")
+            else:
+                results[index] = BulkRowResult(index=index, id=row["id"], status="not_found", error=not_found)
+
+    succeeded = sum(1 for r in results if r.status == "upserted")
+    return BulkResult(total=len(results), succeeded=succeeded, failed=len(results) - succeeded, results=results)
@@ -0,0 +1,100 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+# Defaults for every entity; override per entity with e.g. CACHE_TTL_LEAD / CACHE_SIZE_LEAD.
+# A TTL of 0 disables the cache for that entity.
+DEFAULT_TTL = float(os.getenv("CACHE_TTL", "30"))
+DEFAULT_SIZE = int(os.getenv("CACHE_SIZE", "10000"))
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with a per-entry time to live.
+
+    Caches live per worker process: a write invalidates only the worker that
+    served it, so other workers may serve the old record for up to `ttl`
+    seconds. Pick the TTL per entity accordingly.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # Bumped by every invalidation; a read that started before a write
+        # must not repopulate the cache with what it read.
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """Store `value`, unless something was invalidated since `generation` was read."""
+        if not self.enabled or (generation is not None and generation != self.generation):
+            return
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        self.generation += 1
+        self._entries.pop(key, None)
+
+    def invalidate_many(self, keys: Iterable[Hashable]):
+        self.generation += 1
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+caches: Dict[str, TTLCache] = {}
+
+
+def get_cache(entity: str) -> TTLCache:
+    """Shared cache for `entity`, configured from CACHE_TTL_<ENTITY> / CACHE_SIZE_<ENTITY>."""
+    if entity not in caches:
+        key = entity.upper()
+        ttl = float(os.getenv(f"CACHE_TTL_{key}", DEFAULT_TTL))
+        maxsize = int(os.getenv(f"CACHE_SIZE_{key}", DEFAULT_SIZE))
+        caches[entity] = TTLCache(entity, maxsize=maxsize, ttl=ttl)
+    return caches[entity]
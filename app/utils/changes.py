@@ -0,0 +1,209 @@
+import asyncio
+import contextvars
+import os
+from typing import Dict, List, Optional, Set
+from neo4j import AsyncManagedTransaction, Record
+from app.utils.logger import get_logger
+from app.utils.metrics import named_query
+from app.utils.query import after_commit, read, run, write_tx
+from app.utils.rollups import ROLLUP_KINDS, apply_rollups
+
+logger = get_logger(__name__)
+
+CHANGES_LIMIT = 500
+MAX_CHANGES_LIMIT = 5000
+# How often idle readers re-check the log for writes made by other processes
+CHANGE_POLL_INTERVAL = float(os.getenv("CHANGE_POLL_INTERVAL", "5"))
+
+# How many pending changes one sequencer transaction numbers, and how often the
+# lifespan sweeps for changes nobody sequenced (e.g. the writing process died)
+CHANGE_SEQUENCE_BATCH = int(os.getenv("CHANGE_SEQUENCE_BATCH", "5000"))
+CHANGE_SEQUENCE_INTERVAL = float(os.getenv("CHANGE_SEQUENCE_INTERVAL", "5"))
+
+# Each tracked write appends (:Change:Pending {entity, id, op, fields, at, n})
+# nodes in its own transaction, without a sequence number, so concurrent writers
+# share no lock. `at` is read when the node is created, after the write took its
+# locks, so two writes to the same node get their `at` in commit order.
+APPEND_CHANGES = """
+UNWIND range(0, size($events) - 1) AS n
+WITH n, $events[n] AS event
+CREATE (:Change:Pending {entity: event.entity, id: event.id, op: event.op,
+                         fields: event.fields, at: datetime.realtime(), n: n})
+"""
+
+# The sequencer numbers committed pending changes afterwards, in short
+# transactions of its own. It holds the write lock on the (:Sequence) node from
+# the first statement until commit, so sequence numbers become visible in order
+# and a reader that has seen seq N will never later find a change below N;
+# readers only see changes once they have a seq. Only sequencers wait on each
+# other, and each one numbers up to CHANGE_SEQUENCE_BATCH changes, so the feed
+# keeps up with any write rate below that many changes per sequencer round trip;
+# past it, changes queue up as Pending and reach readers late, but writers are
+# never slowed down.
+LOCK_SEQUENCE = """
+MERGE (s:Sequence {name: 'changes'})
+ON CREATE SET s.value = 0
+SET s._lock = true
+REMOVE s._lock
+"""
+
+# A separate statement, so the pending changes are read after the lock is held
+SEQUENCE_CHANGES = """
+MATCH (c:Change:Pending)
+WITH c ORDER BY c.at, c.n LIMIT $limit
+WITH collect(c) AS changes
+MATCH (s:Sequence {name: 'changes'})
+WITH s, s.value AS start, changes
+SET s.value = start + size(changes)
+WITH start, changes
+UNWIND range(0, size(changes) - 1) AS i
+WITH changes[i] AS c, start + i + 1 AS seq
+SET c.seq = seq
+REMOVE c:Pending
+RETURN count(c) AS sequenced
+"""
+
+
+class ChangeNotifier:
+    """Wakes long-poll and SSE readers in this process once a tracked write commits."""
+
+    def __init__(self):
+        self.version = 0
+        self._waiters: Set[asyncio.Future] = set()
+
+    def notify(self):
+        self.version += 1
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+    async def wait(self, seen: int, timeout: float):
+        """
+        Wait for a commit after `version` was `seen`; take `seen` before reading
+        the log so a commit in between returns at once instead of being missed.
+        """
+        if self.version != seen:
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._waiters.discard(waiter)
+
+
+change_notifier = ChangeNotifier()
+
+
+async def append_changes(tx: AsyncManagedTransaction, events: List[Dict]):
+    if events:
+        with named_query("changes.append"):
+            await run(tx, APPEND_CHANGES, events=events)
+
+
+async def tracked_write(entity: str, op: str, fields: List[str], query: str, **params) -> List[Record]:
+    """
+    write() for the create/update/link routes. Every record the query returns
+    (by its `id` column) is logged as a change, all in the same transaction.
+    Creates and updates of deals, opportunities and leads also move their
+    pipeline rollups (see rollups.py); links do not touch rollup fields.
+    """
+    async def work(tx: AsyncManagedTransaction) -> List[Record]:
+        records = await run(tx, query, **params)
+        if entity in ROLLUP_KINDS and op != "link":
+            await apply_rollups(tx, entity, records)
+        await append_changes(tx, [
+            {"entity": entity, "id": record["id"], "op": op, "fields": fields} for record in records
+        ])
+        return records
+    records = await write_tx(work)
+    if records:
+        after_commit(change_sequencer.request)
+    return records
+
+
+async def sequence_changes(limit: int = CHANGE_SEQUENCE_BATCH) -> int:
+    """Give up to `limit` committed pending changes their sequence numbers; returns how many."""
+    async def work(tx: AsyncManagedTransaction) -> int:
+        with named_query("changes.lock"):
+            await run(tx, LOCK_SEQUENCE)
+        with named_query("changes.sequence"):
+            records = await run(tx, SEQUENCE_CHANGES, limit=limit)
+        return records[0]["sequenced"] if records else 0
+    return await write_tx(work)
+
+
+class ChangeSequencer:
+    """
+    Runs sequence_changes() in the background after tracked writes commit, one
+    run at a time per process: requests made while a run is in flight are
+    folded into one more run after it. Readers are woken once changes have
+    their numbers.
+    """
+
+    def __init__(self, batch: int = CHANGE_SEQUENCE_BATCH):
+        self.batch = batch
+        self._task: Optional[asyncio.Task] = None
+        self._again = False
+        self.runs = 0
+        self.sequenced = 0
+
+    def request(self):
+        if self._task is not None and not self._task.done():
+            self._again = True
+            return
+        # A fresh context: the run must not count towards the request's DB time
+        # or join a transaction the caller might still be in
+        self._task = asyncio.get_running_loop().create_task(self._run(), context=contextvars.Context())
+
+    async def _run(self):
+        self._again = True
+        while self._again:
+            self._again = False
+            try:
+                sequenced = await sequence_changes(self.batch)
+            except Exception as e:
+                # Left Pending; the next request or the lifespan sweep picks them up
+                logger.error(f"Sequencing changes failed: {e}")
+                return
+            self.runs += 1
+            self.sequenced += sequenced
+            if sequenced:
+                change_notifier.notify()
+            if sequenced >= self.batch:
+                self._again = True
+
+    async def drain(self):
+        """Wait for the run in flight, if any; called at shutdown."""
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+change_sequencer = ChangeSequencer()
+
+
+async def sequence_forever(interval: float):
+    """Background task started by the lifespan when CHANGE_SEQUENCE_INTERVAL is set."""
+    while True:
+        await asyncio.sleep(interval)
+        change_sequencer.request()
+
+
+async def changes_since(since: int, limit: int, entities: Optional[List[str]] = None) -> List[Record]:
+    query = f"""
+    MATCH (c:Change)
+    WHERE c.seq > $since {"AND c.entity IN $entities" if entities else ""}
+    RETURN c.seq AS seq, c.entity AS entity, c.id AS id, c.op AS op, c.fields AS fields,
+           toString(c.at) AS at
+    ORDER BY c.seq
+    LIMIT $limit
+    """
+    return await read(query, since=since, limit=limit, entities=entities)
+
+
+def field_names(data: Dict) -> List[str]:
+    """Fields a create or update sets, as recorded on its change events."""
+    return [name for name in data if name != "id"]
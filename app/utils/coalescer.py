@@ -0,0 +1,162 @@
+import asyncio
+import contextvars
+import os
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from neo4j import Record
+from app.utils.changes import field_names, tracked_write
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Off by default: coalescing trades up to one window of latency per create for fewer commits
+COALESCE_WRITES = os.getenv("WRITE_COALESCE", "0").lower() in ("1", "true", "yes")
+COALESCE_WINDOW_MS = float(os.getenv("WRITE_COALESCE_WINDOW_MS", "5"))
+COALESCE_MAX_ROWS = int(os.getenv("WRITE_COALESCE_MAX_ROWS", "200"))
+
+Pending = Tuple[Dict, asyncio.Future, float]  # row, caller's future, enqueue time
+
+
+class WriteCoalescer:
+    """
+    Queues single-row creates for up to `window_ms` (or `max_rows` rows) and
+    writes them as one `UNWIND $rows AS row` tracked transaction. The query
+    must return `row.idx AS idx` for each row it wrote; every caller gets its
+    own record, or None when the query dropped its row (e.g. a MATCH on a
+    missing related node).
+
+    If the batch transaction fails, its rows are retried one per transaction
+    so a single bad row only fails its own caller.
+    """
+
+    def __init__(self, entity: str, query: str, enabled: bool = COALESCE_WRITES,
+                 window_ms: float = COALESCE_WINDOW_MS, max_rows: int = COALESCE_MAX_ROWS):
+        self.entity = entity
+        self.query = query
+        self.enabled = enabled
+        self.window_ms = window_ms
+        self.max_rows = max_rows
+        self._batch: List[Pending] = []
+        self._ids: Set[str] = set()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Batch writes in flight; the loop only keeps weak references to tasks
+        self._writes: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.rows = 0
+        self.full_flushes = 0
+        self.timer_flushes = 0
+        self.retried_batches = 0
+        self.failed_rows = 0
+        self.largest_batch = 0
+        self.queued_seconds = 0.0
+        self.commit_seconds = 0.0
+
+    async def submit(self, row: Dict) -> Optional[Record]:
+        loop = asyncio.get_running_loop()
+        if row["id"] in self._ids:
+            # One row per id per transaction, or the rollup snapshots would overlap
+            self._flush()
+        future = loop.create_future()
+        self._batch.append((row, future, time.perf_counter()))
+        self._ids.add(row["id"])
+        if len(self._batch) >= self.max_rows:
+            self.full_flushes += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush_on_timer)
+        return await future
+
+    def _flush_on_timer(self):
+        self._timer = None
+        self.timer_flushes += 1
+        self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._batch, self._ids = self._batch, [], set()
+        if batch:
+            # A fresh context: the batch's DB time, query label and request id
+            # belong to no single caller, least of all whoever queued first
+            task = asyncio.get_running_loop().create_task(self._write(batch), context=contextvars.Context())
+            self._writes.add(task)
+            task.add_done_callback(self._writes.discard)
+
+    async def drain(self):
+        """Write the queued rows now and wait for every batch in flight; called at shutdown."""
+        self._flush()
+        while self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    async def _write(self, batch: List[Pending]):
+        started = time.perf_counter()
+        self.queued_seconds += sum(started - queued for _, _, queued in batch)
+        rows = [{**row, "idx": index} for index, (row, _, _) in enumerate(batch)]
+        try:
+            records = await tracked_write(self.entity, "upsert", field_names(batch[0][0]), self.query, rows=rows)
+        except Exception as e:
+            if len(batch) > 1:
+                self.retried_batches += 1
+                logger.warning(f"Coalesced {self.entity} batch of {len(batch)} failed, retrying rows one by one: {e}")
+                await asyncio.gather(*(self._write([pending]) for pending in batch))
+                return
+            self.failed_rows += 1
+            _, future, _ = batch[0]
+            if not future.done():
+                future.set_exception(e)
+            return
+        self.commit_seconds += time.perf_counter() - started
+        self.batches += 1
+        self.rows += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        written = {record["idx"]: record for record in records}
+        for index, (_, future, _) in enumerate(batch):
+            if not future.done():  # the caller may have gone away
+                future.set_result(written.get(index))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window_ms,
+            "max_rows": self.max_rows,
+            "pending": len(self._batch),
+            "in_flight": len(self._writes),
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "full_flushes": self.full_flushes,
+            "timer_flushes": self.timer_flushes,
+            "retried_batches": self.retried_batches,
+            "failed_rows": self.failed_rows,
+            "avg_queued_ms": round(self.queued_seconds / self.rows * 1000, 3) if self.rows else 0.0,
+            "avg_commit_ms": round(self.commit_seconds / self.batches * 1000, 3) if self.batches else 0.0,
+        }
+
+
+coalescers: Dict[str, WriteCoalescer] = {}
+
+
+async def drain_coalescers():
+    for coalescer in coalescers.values():
+        await coalescer.drain()
+
+
+def get_coalescer(entity: str, query: str) -> WriteCoalescer:
+    """
+    Shared coalescer for an entity's creates. WRITE_COALESCE_<ENTITY>,
+    WRITE_COALESCE_WINDOW_MS_<ENTITY> and WRITE_COALESCE_MAX_ROWS_<ENTITY>
+    override the global settings.
+    """
+    if entity not in coalescers:
+        suffix = entity.upper()
+        enabled = os.getenv(f"WRITE_COALESCE_{suffix}")
+        coalescers[entity] = WriteCoalescer(
+            entity,
+            query,
+            enabled=COALESCE_WRITES if enabled is None else enabled.lower() in ("1", "true", "yes"),
+            window_ms=float(os.getenv(f"WRITE_COALESCE_WINDOW_MS_{suffix}", COALESCE_WINDOW_MS)),
+            max_rows=int(os.getenv(f"WRITE_COALESCE_MAX_ROWS_{suffix}", COALESCE_MAX_ROWS)),
+        )
+    return coalescers[entity]
@@ -0,0 +1,38 @@
+import os
+from typing import Any, Mapping, Type, TypeVar, Union
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+# Opt-in: build read models from database rows without validating them, and
+# send them as JSON bytes instead of through FastAPI's response_model pass.
+# Every row was validated by the request model on its way in, so the output
+# schema is the same; only rows written around the API (e.g. by hand in the
+# Neo4j browser) could get through unchecked.
+FAST_JSON = os.getenv("FAST_JSON", "0").lower() in ("1", "true", "yes")
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def native(value: Any) -> Any:
+    # neo4j.time types are not datetime subclasses; Timestamps converts them when validating
+    return value.to_native() if hasattr(value, "to_native") else value
+
+
+def to_model(model: Type[M], row: Mapping[str, Any]) -> M:
+    """The API model for a stored row: trusted with FAST_JSON, validated otherwise."""
+    if not FAST_JSON:
+        return model(**row)
+    return model.model_construct(**{key: native(value) for key, value in row.items()})
+
+
+def respond(value: BaseModel, sparse: bool = False) -> Union[BaseModel, Response]:
+    """
+    Return value for a route whose response_model is the type of `value`.
+    With FAST_JSON the model's compiled pydantic-core serializer writes the
+    body directly; the route's response_model still documents it. `sparse`
+    results (a `?fields=` selection) never match the response_model, so
+    they are always sent this way.
+    """
+    if not (FAST_JSON or sparse):
+        return value
+    return Response(value.model_dump_json(), media_type="application/json")
@@ -0,0 +1,38 @@
+from functools import lru_cache
+from typing import Annotated, List, Optional, Tuple, Type
+from fastapi import HTTPException
+from pydantic import BaseModel, BeforeValidator, create_model
+from app.utils.fast_json import native
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return, e.g. id,name,status; id is always included"
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel], sort_field: Optional[str] = None) -> Optional[List[str]]:
+    """
+    The `?fields=` selection in the model's field order, or None for every
+    field. id is always selected, and so is the sort field, since the next
+    page's cursor is built from them.
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - model.model_fields.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested |= {"id", sort_field} - {None}
+    return [name for name in model.model_fields if name in requested]
+
+
+@lru_cache(maxsize=None)
+def _sparse_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    # The full models' own validators (e.g. Timestamps.from_neo4j) are not inherited
+    definitions = {
+        name: (Annotated[model.model_fields[name].annotation, BeforeValidator(native)], model.model_fields[name])
+        for name in fields
+    }
+    return create_model(model.__name__, **definitions)
+
+
+def sparse_model(model: Type[BaseModel], fields: Optional[List[str]]) -> Type[BaseModel]:
+    """`model` cut down to `fields`, with the same types and defaults; built once per selection."""
+    return model if fields is None else _sparse_model(model, tuple(fields))
@@ -0,0 +1,106 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException
+from app.models.page import Page
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def sort_pattern(fields: Iterable[str]) -> str:
+    """Query-param regex for `field` / `-field` over the sortable fields."""
+    return f"^-?({'|'.join(fields)})$"
+
+
+class ListQuery:
+    """
+    WHERE and ORDER BY for a list route, compiled from typed filter params,
+    an optional sort and the keyset cursor. Every value is passed as a query
+    parameter; only whitelisted property names are interpolated.
+
+    Pages seek on (sort field, id) instead of skipping rows. Sorting by a field
+    leaves out rows where it is null, which is also what lets Neo4j return the
+    rows in index order instead of sorting them.
+
+    The filters are also kept as (op, field, value) `conditions` alongside the
+    decoded cursor in `after`, for backends that do not speak Cypher.
+    """
+
+    def __init__(self, var: str, cursor: Optional[str] = None, sort: Optional[str] = None,
+                 sortable: Iterable[str] = ()):
+        self.var = var
+        self.descending = bool(sort) and sort.startswith("-")
+        self.sort_field = sort.lstrip("-") if sort else None
+        if self.sort_field and self.sort_field not in sortable:
+            raise HTTPException(status_code=400, detail=f"Cannot sort by {self.sort_field}")
+        self.sort = sort
+        self.clauses: List[str] = []
+        self.params: Dict[str, Any] = {}
+        self.conditions: List[Tuple[str, str, Any]] = []
+
+        after = decode_cursor(cursor)
+        if after and after.get("sort") != sort:
+            raise HTTPException(status_code=400, detail="Cursor was issued for a different sort")
+        self.after = after
+        self._seek(after)
+
+    def _seek(self, after: Optional[Dict[str, Any]]):
+        var, op = self.var, "<" if self.descending else ">"
+        if self.sort_field:
+            field = f"{var}.{self.sort_field}"
+            self.clauses.append(f"{field} IS NOT NULL")
+            if after:
+                self.clauses.append(f"({field} {op} $after_v OR ({field} = $after_v AND {var}.id {op} $after_id))")
+                self.params.update(after_v=after["v"], after_id=after["id"])
+        elif after:
+            self.clauses.append(f"{var}.id > $after_id")
+            self.params["after_id"] = after["id"]
+        else:
+            self.clauses.append(f"{var}.id IS NOT NULL")
+
+    def any_of(self, field: str, values: Optional[List[Any]]) -> "ListQuery":
+        """Equality for one value, IN for several; skipped when no values are given."""
+        if values:
+            self.conditions.append(("in", field, list(values)))
+            if len(values) == 1:
+                self.clauses.append(f"{self.var}.{field} = ${field}")
+                self.params[field] = values[0]
+            else:
+                self.clauses.append(f"{self.var}.{field} IN ${field}")
+                self.params[field] = list(values)
+        return self
+
+    def between(self, field: str, gte: Any = None, lte: Any = None) -> "ListQuery":
+        """Inclusive range; either bound may be omitted."""
+        if gte is not None:
+            self.conditions.append((">=", field, gte))
+            self.clauses.append(f"{self.var}.{field} >= ${field}_gte")
+            self.params[f"{field}_gte"] = gte
+        if lte is not None:
+            self.conditions.append(("<=", field, lte))
+            self.clauses.append(f"{self.var}.{field} <= ${field}_lte")
+            self.params[f"{field}_lte"] = lte
+        return self
+
+    def updated_since(self, since: Optional[datetime]) -> "ListQuery":
+        """Rows written at or after `since`; a value without an offset is taken as UTC."""
+        if since is not None and since.tzinfo is None:
+            # Neo4j never matches a zoned DateTime against a LocalDateTime
+            since = since.replace(tzinfo=timezone.utc)
+        return self.between("updated_at", since)
+
+    def where(self) -> str:
+        return "WHERE " + " AND ".join(self.clauses)
+
+    def order_by(self) -> str:
+        direction = " DESC" if self.descending else ""
+        if self.sort_field:
+            return f"ORDER BY {self.var}.{self.sort_field}{direction}, {self.var}.id{direction}"
+        return f"ORDER BY {self.var}.id"
+
+    def page(self, items: List, limit: int) -> Page:
+        """Queries fetch limit + 1 rows; the extra row only signals another page."""
+        if len(items) <= limit:
+            return Page(items=items)
+        items = items[:limit]
+        last = items[-1]
+        value = getattr(last, self.sort_field) if self.sort_field else None
+        return Page(items=items, next_cursor=encode_cursor(last.id, self.sort, value))
@@ -1,38 +1,150 @@
+import atexit
+import json
 import logging
 import os
-from datetime import datetime
+import queue
+import random
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from typing import Optional
 
-def get_logger(name: str = "app", level: int = logging.INFO) -> logging.Logger:
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "text" for people, "json" for log shippers
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# Size-based rotation when LOG_MAX_BYTES is set, otherwise time-based (LOG_ROTATE_WHEN).
+# Each process writes and rotates its own LOG_DIR/app.<pid>.log: with several
+# workers sharing one file, each would rename it under the others on its own
+# schedule and lines would be lost.
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", "0"))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "midnight")
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "7"))
+# Share of DEBUG records kept; dropped ones are discarded before they are queued
+LOG_DEBUG_SAMPLE = float(os.getenv("LOG_DEBUG_SAMPLE", "1"))
+
+REQUEST_ID_HEADER = "x-request-id"
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps the current request id on the record while still in the caller's context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get() or "-"
+        return True
+
+
+class DebugSampler(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _formatter() -> logging.Formatter:
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter(
+        "[%(asctime)s] [%(levelname)s] [%(name)s] [%(request_id)s]: %(message)s",
+        "%Y-%m-%d %H:%M:%S"
+    )
+
+
+def _file_handler() -> logging.Handler:
+    os.makedirs(LOG_DIR, exist_ok=True)
+    path = os.path.join(LOG_DIR, f"app.{os.getpid()}.log")
+    if LOG_MAX_BYTES > 0:
+        return RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
+    return TimedRotatingFileHandler(path, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT)
+
+
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+
+
+def _shared_handler() -> QueueHandler:
+    """
+    Loggers only put records on an in-memory queue; one background thread
+    formats them and does the console and file I/O.
+    """
+    global _queue_handler, _listener
+    if _queue_handler is None:
+        records = queue.SimpleQueue()
+        formatter = _formatter()
+        handlers = [logging.StreamHandler(), _file_handler()]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        _queue_handler = QueueHandler(records)
+        _queue_handler.addFilter(DebugSampler(LOG_DEBUG_SAMPLE))
+        _queue_handler.addFilter(RequestIdFilter())
+        _listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+    return _queue_handler
+
+
+def stop_logging():
+    """Drain the queue and stop the writer thread; later records are dropped."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str = "app", level: Optional[int] = None) -> logging.Logger:
     logger = logging.getLogger(name)
-    logger.setLevel(level)
+    logger.setLevel(level or LOG_LEVEL)
 
     # Prevent duplicate handlers
     if not logger.handlers:
-        # Create logs directory if it doesn't exist
-        log_dir = "logs"
-        os.makedirs(log_dir, exist_ok=True)
+        logger.addHandler(_shared_handler())
+        logger.propagate = False
 
-        # Create log file with date in name
-        log_filename = os.path.join(log_dir, f"{name}_{datetime.now().strftime('%Y-%m-%d')}.log")
+    return logger
 
-        # Console handler
-        stream_handler = logging.StreamHandler()
-        # File handler
-        file_handler = logging.FileHandler(log_filename, mode='a')
 
-        # Formatter
-        formatter = logging.Formatter(
-            "[%(asctime)s] [%(levelname)s] [%(name)s]: %(message)s",
-            "%Y-%m-%d %H:%M:%S"
-        )
+class RequestIdMiddleware:
+    """
+    Plain ASGI middleware: reuses the caller's X-Request-ID or makes one up,
+    exposes it to log records through `request_id`, and echoes it back.
+    """
 
-        stream_handler.setFormatter(formatter)
-        file_handler.setFormatter(formatter)
+    def __init__(self, app):
+        self.app = app
 
-        # Add handlers to logger
-        logger.addHandler(stream_handler)
-        logger.addHandler(file_handler)
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        incoming = dict(scope["headers"]).get(REQUEST_ID_HEADER.encode())
+        rid = incoming.decode("latin-1")[:128] if incoming else uuid.uuid4().hex
+        token = request_id.set(rid)
 
-        logger.propagate = False
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER.encode(), rid.encode("latin-1"))]
+            await send(message)
 
-    return logger
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id.reset(token)
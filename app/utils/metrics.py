@@ -0,0 +1,167 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+from app import db
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency, from first byte in to last byte out",
+    ["method", "route", "status"],
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds", "Part of each request spent waiting on Neo4j (incl. session acquisition)",
+    ["route"],
+)
+REQUEST_APP_TIME = Histogram(
+    "http_request_app_seconds", "Part of each request spent outside Neo4j: validation, handler code, serialization",
+    ["route"],
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being served")
+
+QUERY_LATENCY = Histogram(
+    "neo4j_query_duration_seconds", "Statement latency including fetching every record", ["query"],
+)
+QUERY_ROWS = Histogram(
+    "neo4j_query_rows", "Records returned per statement", ["query"],
+    buckets=(0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000),
+)
+QUERY_ERRORS = Counter("neo4j_query_errors_total", "Statements that raised", ["query"])
+
+
+class RequestTiming:
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.db_seconds = 0.0
+
+
+_request: ContextVar[Optional[RequestTiming]] = ContextVar("metrics_request", default=None)
+_query_name: ContextVar[Optional[str]] = ContextVar("metrics_query_name", default=None)
+
+
+def route_label(scope: dict) -> str:
+    # Route templates, not raw paths, so ids do not explode label cardinality.
+    # FastAPI keeps the prefixed template of an included router's route here.
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or "unmatched"
+
+
+def query_label() -> str:
+    """Explicit named_query() name, else the handler as `<router module>.<function>`."""
+    name = _query_name.get()
+    if name:
+        return name
+    timing = _request.get()
+    endpoint = timing.scope.get("endpoint") if timing else None
+    if endpoint is not None:
+        return f"{endpoint.__module__.rsplit('.', 1)[-1]}.{endpoint.__name__}"
+    return "unnamed"
+
+
+@contextmanager
+def named_query(name: str) -> Iterator[None]:
+    """Label the statements run inside the block, for code that is not a route handler."""
+    token = _query_name.set(name)
+    try:
+        yield
+    finally:
+        _query_name.reset(token)
+
+
+class QueryTimer:
+    def __init__(self, label: str):
+        self.label = label
+        self.rows = 0
+        self.seconds = 0.0
+
+
+@contextmanager
+def timed_query() -> Iterator[QueryTimer]:
+    """Observe one statement; the caller sets `.rows` once the records are fetched."""
+    label = query_label()
+    timer = QueryTimer(label)
+    started = time.perf_counter()
+    try:
+        yield timer
+    except Exception:
+        QUERY_ERRORS.labels(label).inc()
+        raise
+    finally:
+        timer.seconds = time.perf_counter() - started
+        QUERY_LATENCY.labels(label).observe(timer.seconds)
+    QUERY_ROWS.labels(label).observe(timer.rows)
+
+
+class Elapsed:
+    seconds = 0.0
+
+
+@contextmanager
+def db_time() -> Iterator[Elapsed]:
+    """Charge the block to the current request's database time."""
+    elapsed = Elapsed()
+    started = time.perf_counter()
+    try:
+        yield elapsed
+    finally:
+        elapsed.seconds = time.perf_counter() - started
+        timing = _request.get()
+        if timing is not None:
+            timing.db_seconds += elapsed.seconds
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware so streamed responses are timed until their last chunk."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+        timing = RequestTiming(scope)
+        token = _request.set(timing)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec()
+            route = route_label(scope)
+            REQUEST_LATENCY.labels(scope["method"], route, str(status)).observe(elapsed)
+            REQUEST_DB_TIME.labels(route).observe(timing.db_seconds)
+            REQUEST_APP_TIME.labels(route).observe(max(elapsed - timing.db_seconds, 0.0))
+            _request.reset(token)
+
+
+class PoolCollector:
+    """Connection-pool usage read from the driver at scrape time."""
+
+    def collect(self):
+        in_use = GaugeMetricFamily("neo4j_pool_connections_in_use", "Pooled connections checked out", labels=["address"])
+        idle = GaugeMetricFamily("neo4j_pool_connections_idle", "Pooled connections available", labels=["address"])
+        max_size = GaugeMetricFamily("neo4j_pool_max_size", "Configured connection pool limit per address")
+        usage = db.pool_usage()
+        if usage is not None:
+            for address, counts in usage["addresses"].items():
+                in_use.add_metric([address], counts["in_use"])
+                idle.add_metric([address], counts["idle"])
+            max_size.add_metric([], usage["max_size"])
+        yield in_use
+        yield idle
+        yield max_size
+
+
+REGISTRY.register(PoolCollector())
@@ -0,0 +1,139 @@
+import re
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from app.models.account import AccountCreate, AccountUpdate
+from app.models.activity import ActivityCreate, ActivityUpdate
+from app.models.batch import BatchOperation, BatchOperationResult
+from app.models.deal import DealCreate, DealUpdate
+from app.models.lead import LeadCreate, LeadUpdate
+from app.models.opportunity import OpportunityCreate, OpportunityUpdate
+from app.models.user import UserCreate, UserUpdate
+from app.repositories.registry import repos
+
+# Entity -> (repository attribute, create model, update model)
+ENTITIES = {
+    "user": ("users", UserCreate, UserUpdate),
+    "lead": ("leads", LeadCreate, LeadUpdate),
+    "account": ("accounts", AccountCreate, AccountUpdate),
+    "opportunity": ("opportunities", OpportunityCreate, OpportunityUpdate),
+    "deal": ("deals", DealCreate, DealUpdate),
+    "activity": ("activities", ActivityCreate, ActivityUpdate),
+}
+LINKS_TO_ACCOUNT = {"lead", "opportunity", "deal"}
+
+REFERENCE = re.compile(r"^\$([A-Za-z_][\w-]*)$")
+
+
+@dataclass
+class Step:
+    """One operation with its references resolved and its data validated."""
+
+    index: int
+    operation: BatchOperation
+    id: str
+    data: Dict[str, Any]
+
+
+class OperationFailed(Exception):
+    def __init__(self, step: Step, detail: str):
+        super().__init__(detail)
+        self.step = step
+        self.detail = detail
+
+
+def _invalid(index: int, detail: str) -> HTTPException:
+    return HTTPException(status_code=400, detail=f"Operation {index}: {detail}")
+
+
+def _resolve(value: Any, refs: Dict[str, str], index: int) -> Any:
+    if isinstance(value, str):
+        match = REFERENCE.match(value)
+        if match:
+            if match.group(1) not in refs:
+                raise _invalid(index, f"{value} does not name an earlier operation's ref")
+            return refs[match.group(1)]
+    return value
+
+
+def plan(operations: List[BatchOperation]) -> List[Step]:
+    """
+    Resolve `$ref` back-references and validate every operation against the
+    entity's create/update model, before anything is written.
+    """
+    refs: Dict[str, str] = {}
+    steps = []
+    for index, operation in enumerate(operations):
+        data = {key: _resolve(value, refs, index) for key, value in operation.data.items()}
+        target: Optional[str] = _resolve(operation.id, refs, index)
+        _, create_model, update_model = ENTITIES[operation.entity]
+        try:
+            if operation.op == "create":
+                target = target or data.get("id") or uuid.uuid4().hex
+                if data.get("id", target) != target:
+                    raise _invalid(index, "id and data.id differ")
+                data = create_model(**{**data, "id": target}).model_dump()
+            elif target is None:
+                raise _invalid(index, f"{operation.op} needs an id")
+            elif operation.op == "update":
+                data = update_model(**data).model_dump(exclude_unset=True)
+                if not data:
+                    raise _invalid(index, "No fields to update")
+            else:
+                if operation.entity not in LINKS_TO_ACCOUNT:
+                    raise _invalid(index, f"Cannot link a {operation.entity} to an account")
+                if set(data) != {"account_id"} or not isinstance(data["account_id"], str):
+                    raise _invalid(index, 'link takes data {"account_id": "..."}')
+        except ValidationError as e:
+            raise RequestValidationError([
+                {**error, "loc": ("body", "operations", index, "data", *error["loc"])}
+                for error in e.errors(include_url=False, include_context=False)
+            ])
+        if operation.ref:
+            if operation.ref in refs:
+                raise _invalid(index, f"ref {operation.ref} is already used")
+            refs[operation.ref] = target
+        steps.append(Step(index, operation, target, data))
+    return steps
+
+
+async def apply(step: Step) -> BatchOperationResult:
+    operation = step.operation
+    repo = getattr(repos, ENTITIES[operation.entity][0])
+    name = repo.model.__name__
+    item = None
+    if operation.op == "create":
+        item = await repo.create(step.data)
+        if item is None:
+            raise OperationFailed(step, repo.not_found)
+    elif operation.op == "update":
+        item = await repo.update(step.id, step.data)
+        if item is None:
+            raise OperationFailed(step, f"{name} not found")
+    elif not await repo.link_account(step.id, step.data["account_id"]):
+        raise OperationFailed(step, f"{name} or Account not found")
+    return BatchOperationResult(
+        index=step.index, op=operation.op, entity=operation.entity, id=step.id, ref=operation.ref,
+        item=item.model_dump() if item is not None else None,
+    )
+
+
+async def execute(operations: List[BatchOperation]) -> List[BatchOperationResult]:
+    """Run the operations in order in one transaction; the first that fails rolls all of them back."""
+    steps = plan(operations)
+
+    async def work() -> List[BatchOperationResult]:
+        return [await apply(step) for step in steps]
+
+    try:
+        return await repos.atomic(work)
+    except OperationFailed as e:
+        operation = e.step.operation
+        raise HTTPException(
+            status_code=404,
+            detail=f"Operation {e.step.index} ({operation.op} {operation.entity} {e.step.id}): {e.detail}; "
+                   "no operation was applied",
+        )
@@ -0,0 +1,33 @@
+import base64
+import json
+from typing import Any, Dict, Optional
+from fastapi import HTTPException
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def encode_cursor(last_id: str, sort: Optional[str] = None, value: Any = None) -> str:
+    """Opaque cursor pointing just past `last_id` (and its sort key, when sorted)."""
+    payload = {"id": last_id}
+    if sort:
+        payload.update(sort=sort, v=value)
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        payload["id"] = str(payload["id"])
+        return payload
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def limit_clause(streaming: bool) -> str:
+    """Streamed reads walk the whole collection after the cursor."""
+    return "" if streaming else "LIMIT $limit"
@@ -0,0 +1,109 @@
+import json
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+from neo4j import AsyncManagedTransaction, Record
+from app.db import get_driver
+from app.utils.metrics import db_time, timed_query
+from app.utils.singleflight import SingleFlight
+from app.utils.slow_queries import slow_queries
+
+T = TypeVar("T")
+
+# Identical concurrent reads (same Cypher text and parameters) share one round-trip
+read_flight = SingleFlight()
+
+
+class SharedTransaction:
+    """The transaction an atomic() block's writes join, and what to do once it commits."""
+
+    def __init__(self, tx: AsyncManagedTransaction):
+        self.tx = tx
+        self.callbacks: List[Callable[[], Any]] = []
+
+
+_shared: ContextVar[Optional[SharedTransaction]] = ContextVar("shared_transaction", default=None)
+
+
+async def run(tx: AsyncManagedTransaction, query: str, **params) -> List[Record]:
+    """
+    Run one statement inside a transaction and return all of its records.
+    Every statement the routers issue goes through here (or ndjson_response),
+    so this is where latency is measured and slow statements are captured.
+    """
+    with timed_query() as timer:
+        result = await tx.run(query, **params)
+        records = [record async for record in result]
+        timer.rows = len(records)
+    slow_queries.observe(timer.label, query, params, timer.seconds, timer.rows)
+    return records
+
+
+async def _read(query: str, params: Dict[str, Any]) -> List[Record]:
+    async with get_driver().session() as session:
+        return await session.execute_read(run, query, **params)
+
+
+async def read(query: str, **params) -> List[Record]:
+    """
+    Run a read query and return all records. Callers get the same list when
+    their call was coalesced, so they must not mutate it.
+    """
+    key = (query, json.dumps(params, sort_keys=True, default=str))
+    with db_time():
+        return await read_flight.do(key, lambda: _read(query, params))
+
+
+def in_transaction() -> bool:
+    return _shared.get() is not None
+
+
+def after_commit(callback: Callable[[], Any]):
+    """Run `callback` now, or when the enclosing atomic() block commits (never, if it rolls back)."""
+    shared = _shared.get()
+    if shared is None:
+        callback()
+    else:
+        shared.callbacks.append(callback)
+
+
+async def write_tx(work: Callable[[AsyncManagedTransaction], Awaitable[T]]) -> T:
+    """
+    Run `work` in a managed (retried) write transaction; it may issue several
+    statements. Inside atomic() it joins that block's transaction instead.
+    """
+    shared = _shared.get()
+    if shared is not None:
+        return await work(shared.tx)
+    try:
+        with db_time():
+            async with get_driver().session() as session:
+                return await session.execute_write(work)
+    finally:
+        # Reads in flight may have started before this write; nobody arriving
+        # from now on may join them, or a client could miss its own write.
+        read_flight.forget()
+
+
+async def atomic(work: Callable[[], Awaitable[T]]) -> T:
+    """
+    Run `work` with every write_tx() it makes (and so every tracked_write())
+    in one managed write transaction: all of them commit, or none do if it
+    raises. The driver may retry `work` from the start on transient errors.
+    """
+    async def attempt(tx: AsyncManagedTransaction):
+        shared = SharedTransaction(tx)
+        token = _shared.set(shared)
+        try:
+            return await work(), shared.callbacks
+        finally:
+            _shared.reset(token)
+
+    result, callbacks = await write_tx(attempt)
+    for callback in callbacks:
+        callback()
+    return result
+
+
+async def write(query: str, **params) -> List[Record]:
+    """Run a single write query and return all records."""
+    return await write_tx(lambda tx: run(tx, query, **params))
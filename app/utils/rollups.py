@@ -0,0 +1,142 @@
+import asyncio
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from neo4j import AsyncManagedTransaction, Record
+from app.utils.logger import get_logger
+from app.utils.metrics import named_query
+from app.utils.query import run, write_tx
+
+logger = get_logger(__name__)
+
+# Seconds between full recomputes; 0 leaves reconciliation to POST /analytics/pipeline/recompute
+RECONCILE_INTERVAL = float(os.getenv("ROLLUP_RECONCILE_INTERVAL", "0"))
+
+NONE = "(none)"  # stands in for a missing dimension; Neo4j lists cannot hold nulls
+
+# Pipeline totals kept as (:Rollup {id, metric, key, count, total, weighted}) nodes,
+# one per metric/key pair:
+#   deal_status        key [status]                 total = sum(amount)
+#   opportunity_stage  key [stage]                  total = sum(estimated_value),
+#                                                   weighted = sum(estimated_value * probability)
+#   lead_breakdown     key [region, status, source] total = sum(value)
+#
+# Write queries for deals, opportunities and leads return `before` and `after`
+# maps of the fields below (`before` is null for a new node). The difference
+# is applied in the same transaction, so reads never scan the entities.
+# Drift (e.g. a user changing region, which moves their leads) is repaired by
+# the full recompute.
+
+Contribution = Tuple[str, Tuple[str, ...], float, float]  # metric, key, total, weighted
+
+
+def _dim(value) -> str:
+    return NONE if value is None else str(value)
+
+
+def contributions(kind: str, snapshot: Optional[Dict]) -> List[Contribution]:
+    if not snapshot:
+        return []
+    if kind == "deal":
+        return [("deal_status", (_dim(snapshot.get("status")),), snapshot.get("amount") or 0.0, 0.0)]
+    if kind == "opportunity":
+        value = snapshot.get("estimated_value") or 0.0
+        weighted = value * (snapshot.get("probability") or 0.0)
+        return [("opportunity_stage", (_dim(snapshot.get("stage")),), value, weighted)]
+    if kind == "lead":
+        key = (_dim(snapshot.get("region")), _dim(snapshot.get("status")), _dim(snapshot.get("source")))
+        return [("lead_breakdown", key, snapshot.get("value") or 0.0, 0.0)]
+    raise ValueError(f"No rollups for {kind}")
+
+
+def rollup_deltas(kind: str, records: Iterable[Record]) -> List[Dict]:
+    """Net change to each rollup row from a batch of before/after snapshots."""
+    net: Dict[Tuple[str, Tuple[str, ...]], List[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+    for record in records:
+        for sign, snapshot in ((-1, record["before"]), (1, record["after"])):
+            for metric, key, total, weighted in contributions(kind, snapshot):
+                row = net[(metric, key)]
+                row[0] += sign
+                row[1] += sign * total
+                row[2] += sign * weighted
+    deltas = [
+        {"id": "|".join((metric,) + key), "metric": metric, "key": list(key),
+         "count": count, "total": total, "weighted": weighted}
+        for (metric, key), (count, total, weighted) in net.items()
+        if count or total or weighted
+    ]
+    # Lock rollup nodes in a fixed order so concurrent writers cannot deadlock
+    return sorted(deltas, key=lambda delta: delta["id"])
+
+
+APPLY_DELTAS = """
+UNWIND $deltas AS delta
+MERGE (r:Rollup {id: delta.id})
+ON CREATE SET r.metric = delta.metric, r.key = delta.key, r.count = 0, r.total = 0.0, r.weighted = 0.0
+SET r._lock = true
+WITH r, delta, r.count AS count, r.total AS total, r.weighted AS weighted
+SET r.count = count + delta.count,
+    r.total = total + delta.total,
+    r.weighted = weighted + delta.weighted
+REMOVE r._lock
+"""
+# The _lock write takes the node's write lock before the counters are read;
+# a bare `SET r.count = r.count + 1` can lose updates under read-committed.
+
+ROLLUP_KINDS = {"deal", "opportunity", "lead"}
+
+
+async def apply_rollups(tx: AsyncManagedTransaction, kind: str, records: List[Record]):
+    deltas = rollup_deltas(kind, records)
+    if deltas:
+        with named_query("rollups.apply"):
+            await run(tx, APPLY_DELTAS, deltas=deltas)
+
+
+# Full recompute: one aggregation per metric, replacing every Rollup node
+RECOMPUTE = [
+    """
+    MATCH (d:Deal)
+    WITH coalesce(d.status, $none) AS status, count(*) AS count, sum(coalesce(d.amount, 0.0)) AS total
+    CREATE (:Rollup {id: 'deal_status|' + status, metric: 'deal_status', key: [status],
+                     count: count, total: total, weighted: 0.0})
+    """,
+    """
+    MATCH (o:Opportunity)
+    WITH coalesce(o.stage, $none) AS stage, count(*) AS count,
+         sum(coalesce(o.estimated_value, 0.0)) AS total,
+         sum(coalesce(o.estimated_value, 0.0) * coalesce(o.probability, 0.0)) AS weighted
+    CREATE (:Rollup {id: 'opportunity_stage|' + stage, metric: 'opportunity_stage', key: [stage],
+                     count: count, total: total, weighted: weighted})
+    """,
+    """
+    MATCH (l:Lead)
+    WITH l, coalesce(head([(l)-[:ASSIGNED_TO]->(u:User) | u.region]), $none) AS region
+    WITH region, coalesce(l.status, $none) AS status, coalesce(l.source, $none) AS source,
+         count(*) AS count, sum(coalesce(l.value, 0.0)) AS total
+    CREATE (:Rollup {id: 'lead_breakdown|' + region + '|' + status + '|' + source,
+                     metric: 'lead_breakdown', key: [region, status, source],
+                     count: count, total: total, weighted: 0.0})
+    """,
+]
+
+
+async def recompute_rollups():
+    """Rebuild every rollup from the entities in one transaction."""
+    async def work(tx: AsyncManagedTransaction):
+        with named_query("rollups.recompute"):
+            await run(tx, "MATCH (r:Rollup) DETACH DELETE r")
+            for statement in RECOMPUTE:
+                await run(tx, statement, none=NONE)
+    await write_tx(work)
+
+
+async def reconcile_forever(interval: float):
+    """Background task started by the lifespan when ROLLUP_RECONCILE_INTERVAL is set."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await recompute_rollups()
+            logger.info("Pipeline rollups recomputed")
+        except Exception as e:
+            logger.error(f"Rollup recompute failed: {e}")
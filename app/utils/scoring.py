@@ -0,0 +1,148 @@
+import asyncio
+import os
+import time
+from datetime import date
+from typing import Dict, List, Optional
+import numpy as np
+from app.models.scoring import ScoringRun
+from app.utils.cache import get_cache
+from app.utils.logger import get_logger
+from app.utils.metrics import named_query
+from app.utils.query import read, write
+
+logger = get_logger(__name__)
+
+SCORING_BATCH_SIZE = int(os.getenv("SCORING_BATCH_SIZE", "10000"))
+MAX_SCORING_BATCH_SIZE = 50000
+# Seconds between background scoring runs; 0 leaves scoring to POST /leads/score
+SCORING_INTERVAL = float(os.getenv("SCORING_INTERVAL", "0"))
+
+# Channels that count as direct contact for the channel-mix feature
+HIGH_TOUCH_CHANNELS = ["in-person", "meeting", "video", "phone", "call"]
+
+# Account.size is free text; anything not listed scores as unknown (0)
+SIZE_WEIGHTS = {
+    "small": 0.3, "smb": 0.3, "startup": 0.3,
+    "medium": 0.6, "mid": 0.6, "mid-market": 0.6,
+    "large": 0.9, "enterprise": 1.0,
+}
+
+# Feature order used by features() and WEIGHTS; weights sum to 1 so scores land in [0, 100]
+FEATURES = ["activity", "recency", "duration", "high_touch", "value", "revenue", "size"]
+WEIGHTS = np.array([0.20, 0.20, 0.10, 0.10, 0.20, 0.10, 0.10])
+
+# One page of leads with their activity aggregates, keyset-paged on id
+FEATURE_QUERY = """
+MATCH (l:Lead)
+WHERE l.id > $after
+WITH l ORDER BY l.id LIMIT $limit
+OPTIONAL MATCH (act:Activity)-[:FOR_LEAD]->(l)
+WITH l, count(act) AS activities, max(act.timestamp) AS last_activity,
+     sum(coalesce(act.duration, 0.0)) AS total_duration,
+     sum(CASE WHEN toLower(act.channel) IN $high_touch THEN 1 ELSE 0 END) AS high_touch
+RETURN l.id AS id, l.value AS value, activities, last_activity, total_duration, high_touch,
+       head([(l)-[:BELONGS_TO]->(a:Account) | a {.revenue, .size}]) AS account
+"""
+
+# Unchanged scores are skipped so a scoring run only bumps updated_at where the score moved
+WRITE_SCORES = """
+UNWIND $rows AS row
+MATCH (l:Lead {id: row.id})
+WHERE l.score IS NULL OR l.score <> row.score
+SET l.score = row.score, l.updated_at = datetime()
+"""
+
+scoring_lock = asyncio.Lock()
+
+
+def _days_since(timestamps: List[Optional[str]], today: np.datetime64) -> np.ndarray:
+    """Whole days since each ISO timestamp; NaN where missing or unparseable."""
+    days = np.array([t[:10] if t else "NaT" for t in timestamps])
+    try:
+        parsed = days.astype("datetime64[D]")
+    except ValueError:
+        parsed = np.array([_parse_day(d) for d in days], dtype="datetime64[D]")
+    elapsed = (today - parsed).astype("timedelta64[D]").astype("int64").astype("float64")
+    return np.where(np.isnat(parsed), np.nan, elapsed)
+
+
+def _parse_day(day: str) -> np.datetime64:
+    try:
+        return np.datetime64(day, "D")
+    except ValueError:
+        return np.datetime64("NaT", "D")
+
+
+def features(records: List[Dict], today: Optional[date] = None) -> np.ndarray:
+    """(n_leads, len(FEATURES)) matrix with every feature scaled to [0, 1]."""
+    today = np.datetime64(today or date.today(), "D")
+    activities = np.array([r["activities"] for r in records], dtype="float64")
+    duration = np.array([r["total_duration"] or 0.0 for r in records], dtype="float64")
+    high_touch = np.array([r["high_touch"] for r in records], dtype="float64")
+    value = np.array([r["value"] or 0.0 for r in records], dtype="float64")
+    accounts = [r["account"] or {} for r in records]
+    revenue = np.array([a.get("revenue") or 0.0 for a in accounts], dtype="float64")
+    size = np.array([SIZE_WEIGHTS.get(str(a.get("size") or "").lower(), 0.0) for a in accounts])
+    days = _days_since([r["last_activity"] for r in records], today)
+
+    return np.column_stack([
+        1 - np.exp(-activities / 5),                               # saturates around 15 activities
+        np.nan_to_num(np.exp(-np.clip(days, 0, None) / 30), nan=0.0),  # halves roughly every 3 weeks
+        1 - np.exp(-np.clip(duration, 0, None) / 120),             # minutes of contact
+        np.divide(high_touch, activities, out=np.zeros_like(activities), where=activities > 0),
+        np.clip(np.log1p(np.clip(value, 0, None)) / np.log1p(1e6), 0, 1),
+        np.clip(np.log1p(np.clip(revenue, 0, None)) / np.log1p(1e9), 0, 1),
+        size,
+    ])
+
+
+def score(matrix: np.ndarray) -> np.ndarray:
+    return np.round(matrix @ WEIGHTS * 100, 2)
+
+
+async def _fetch_page(after: str, limit: int) -> List[Dict]:
+    with named_query("scoring.features"):
+        records = await read(FEATURE_QUERY, after=after, limit=limit, high_touch=HIGH_TOUCH_CHANNELS)
+    return [dict(r) for r in records]
+
+
+async def score_all_leads(batch_size: int = SCORING_BATCH_SIZE) -> ScoringRun:
+    """
+    Score every lead, one page of `batch_size` at a time: one read for the
+    features, one vectorized pass, one UNWIND write. The next page is fetched
+    while the current one is being written.
+    """
+    started = time.perf_counter()
+    scored = batches = 0
+    lead_cache = get_cache("lead")
+    async with scoring_lock:
+        page = await _fetch_page("", batch_size)
+        while page:
+            last_id = max(r["id"] for r in page)
+            upcoming = asyncio.ensure_future(_fetch_page(last_id, batch_size)) if len(page) == batch_size else None
+            try:
+                scores = score(features(page))
+                rows = [{"id": r["id"], "score": float(s)} for r, s in zip(page, scores)]
+                with named_query("scoring.write"):
+                    await write(WRITE_SCORES, rows=rows)
+            except BaseException:
+                if upcoming:
+                    upcoming.cancel()
+                raise
+            lead_cache.clear()
+            scored += len(page)
+            batches += 1
+            page = await upcoming if upcoming else []
+    seconds = round(time.perf_counter() - started, 3)
+    logger.info(f"Scored {scored} leads in {batches} batches ({seconds}s)")
+    return ScoringRun(scored=scored, batches=batches, seconds=seconds)
+
+
+async def score_forever(interval: float):
+    """Background task started by the lifespan when SCORING_INTERVAL is set."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await score_all_leads()
+        except Exception as e:
+            logger.error(f"Lead scoring failed: {e}")
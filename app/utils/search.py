@@ -1,14 +1,42 @@
-from neo4j import GraphDatabase
-import os
+import re
+from typing import List, Type
+from pydantic import BaseModel
+from app.models.search import SearchHit
+from app.schema import fulltext_index_name
+from app.utils.query import read
 
-driver = GraphDatabase.driver(os.getenv("NEO4J_URI"), auth=(os.getenv("NEO4J_USER"), os.getenv("NEO4J_PASSWORD")))
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
 
-def search_nodes(label: str, name: str):
+LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+
+def fulltext_query(text: str) -> str:
+    """
+    Turn free text into a Lucene query: every word matches exactly or as a
+    prefix, so "acm" still finds "Acme" while exact words rank higher.
+    Lower-casing keeps words like AND/OR from being read as operators.
+    """
+    terms = [LUCENE_SPECIAL.sub(r"\\\1", term.lower()) for term in text.split()]
+    return " ".join(f"({term} OR {term}*)" for term in terms)
+
+
+async def search_nodes(label: str, var: str, name: str, model: Type[BaseModel],
+                       returns: str, limit: int = SEARCH_LIMIT) -> List[SearchHit]:
+    """
+    Search `label` through its full-text index. `returns` continues the query
+    from the matched node (bound to `var`) and its `relevance`, and must
+    project the fields of `model` plus `relevance`.
+    """
+    terms = fulltext_query(name)
+    if not terms:
+        return []
     query = f"""
-    MATCH (n:{label})
-    WHERE toLower(n.name) CONTAINS toLower($name)
-    RETURN n
+    CALL db.index.fulltext.queryNodes($index, $terms, {{limit: $limit}})
+    YIELD node AS {var}, score AS relevance
+    {returns}
+    ORDER BY relevance DESC
     """
-    with driver.session() as session:
-        results = session.run(query, name=name)
-        return [record["n"] for record in results]
\ No newline at end of file
+    params = {"index": fulltext_index_name(label), "terms": terms, "limit": limit}
+    records = await read(query, **params)
+    return [SearchHit(item=model(**record), score=record["relevance"]) for record in records]
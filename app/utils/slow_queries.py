@@ -0,0 +1,153 @@
+import asyncio
+import os
+import random
+import re
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Set
+from app.db import get_driver
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Statements slower than this are logged and kept in the admin ring buffer
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+# Share of slow statements re-run under PROFILE/EXPLAIN for their plan; 0 disables it
+SLOW_QUERY_PLAN_SAMPLE = float(os.getenv("SLOW_QUERY_PLAN_SAMPLE", "0"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+# Parameter names containing any of these are replaced before logging
+SENSITIVE_PARAMS = [
+    name.strip().lower()
+    for name in os.getenv("SLOW_QUERY_REDACT", "password,secret,token,api_key,email,phone").split(",")
+    if name.strip()
+]
+REDACTED = "***"
+# Long lists (bulk `rows`) are cut down to their first few items in the log
+MAX_LIST_ITEMS = 5
+
+# Only statements with none of these clauses are executed again under PROFILE;
+# writes get EXPLAIN, which plans the statement without running it.
+WRITE_CLAUSES = re.compile(r"\b(CREATE|MERGE|SET|DELETE|REMOVE|FOREACH|CALL|LOAD\s+CSV)\b", re.IGNORECASE)
+
+
+def redact(value: Any, key: str = "") -> Any:
+    if key and any(name in key.lower() for name in SENSITIVE_PARAMS):
+        return REDACTED
+    if isinstance(value, dict):
+        return {k: redact(v, str(k)) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [redact(v) for v in value[:MAX_LIST_ITEMS]]
+        if len(value) > MAX_LIST_ITEMS:
+            items.append(f"... {len(value) - MAX_LIST_ITEMS} more")
+        return items
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def plan_summary(plan: Dict) -> Dict[str, Any]:
+    """Flatten a PROFILE or EXPLAIN plan tree into per-operator rows and totals."""
+    operators = []
+
+    def walk(node: Dict, depth: int):
+        args = node.get("args") or {}
+        operators.append({
+            # Newer servers suffix the operator with its runtime, e.g. "NodeIndexSeek@neo4j"
+            "operator": node.get("operatorType", "").split("@")[0],
+            "depth": depth,
+            "details": args.get("Details"),
+            "estimated_rows": args.get("EstimatedRows"),
+            "rows": node.get("rows"),
+            "db_hits": node.get("dbHits"),
+        })
+        for child in node.get("children") or []:
+            walk(child, depth + 1)
+
+    walk(plan, 0)
+    profiled = any(op["db_hits"] is not None for op in operators)
+    return {
+        "db_hits": sum(op["db_hits"] or 0 for op in operators) if profiled else None,
+        "rows": operators[0]["rows"],
+        "label_scans": [op["details"] for op in operators if op["operator"] in ("NodeByLabelScan", "AllNodesScan")],
+        "operators": operators,
+    }
+
+
+class SlowQueryLog:
+    """
+    Ring buffer of statements that took longer than `threshold_ms`. A sample
+    of them is planned again in the background; the plan is attached to the
+    entry once it arrives.
+    """
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_MS, plan_sample: float = SLOW_QUERY_PLAN_SAMPLE,
+                 size: int = SLOW_QUERY_LOG_SIZE):
+        self.threshold_ms = threshold_ms
+        self.plan_sample = plan_sample
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self.slow = 0
+        self.planned = 0
+        self._planning: Set[str] = set()
+        # Plan captures in flight; the loop only keeps weak references to tasks
+        self._captures: Set[asyncio.Task] = set()
+
+    def observe(self, label: str, query: str, params: Dict[str, Any], seconds: float, rows: int):
+        ms = seconds * 1000
+        if ms < self.threshold_ms:
+            return
+        self.slow += 1
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "query_name": label,
+            "ms": round(ms, 2),
+            "rows": rows,
+            "query": " ".join(query.split()),
+            "params": redact(params),
+            "plan": None,
+        }
+        self.entries.append(entry)
+        logger.warning(f"Slow query {label} took {entry['ms']}ms ({rows} rows): {entry['query']} params={entry['params']}")
+        # One plan per statement text at a time; its parameters are what make it slow or not
+        if query not in self._planning and random.random() < self.plan_sample:
+            self._planning.add(query)
+            task = asyncio.ensure_future(self._capture_plan(entry, query, params))
+            self._captures.add(task)
+            task.add_done_callback(self._captures.discard)
+
+    async def _capture_plan(self, entry: Dict[str, Any], query: str, params: Dict[str, Any]):
+        mode = "EXPLAIN" if WRITE_CLAUSES.search(query) else "PROFILE"
+        try:
+            async with get_driver().session() as session:
+                # Straight through the session so the plan run is not timed or logged itself
+                result = await session.run(f"{mode} {query}", **params)
+                summary = await result.consume()
+            plan = summary.profile if mode == "PROFILE" else summary.plan
+            if plan:
+                entry["plan"] = {"mode": mode, **plan_summary(plan)}
+                self.planned += 1
+        except Exception as e:
+            logger.warning(f"Could not {mode} slow query {entry['query_name']}: {e}")
+        finally:
+            self._planning.discard(query)
+
+    async def close(self):
+        """Cancel plan captures still running; called at shutdown, before the driver closes."""
+        for task in self._captures:
+            task.cancel()
+        await asyncio.gather(*self._captures, return_exceptions=True)
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        entries = list(self.entries)[::-1]
+        return entries[:limit] if limit else entries
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "plan_sample": self.plan_sample,
+            "size": self.entries.maxlen,
+            "slow": self.slow,
+            "planned": self.planned,
+        }
+
+
+slow_queries = SlowQueryLog()
@@ -0,0 +1,62 @@
+from typing import AsyncIterator
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from neo4j import Record
+from pydantic import BaseModel
+from app.db import get_driver
+from app.utils.metrics import db_time, timed_query
+from app.utils.slow_queries import slow_queries
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Rows are yielded in chunks so the ASGI server is not handed one tiny
+# write per row.
+CHUNK_ROWS = 500
+
+# OpenAPI entry for list routes that can answer with NDJSON
+NDJSON_RESPONSES = {200: {"content": {NDJSON_MEDIA_TYPE: {}}}}
+
+
+def wants_ndjson(request: Request, stream: bool) -> bool:
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def stream_records(query: str, **params) -> AsyncIterator[Record]:
+    """
+    Yield records while the Neo4j cursor is still being consumed. The session
+    stays open until the caller stops iterating.
+    """
+    async with get_driver().session() as session:
+        with timed_query() as timer:
+            with db_time() as waited:
+                result = await session.run(query, **params)
+            db_seconds = waited.seconds
+            records = aiter(result)
+            while True:
+                # Only the waits on the cursor count as database time
+                with db_time() as waited:
+                    record = await anext(records, None)
+                db_seconds += waited.seconds
+                if record is None:
+                    break
+                timer.rows += 1
+                yield record
+        # A slow client is not a slow query: judge the stream by its cursor waits
+        slow_queries.observe(timer.label, query, params, db_seconds, timer.rows)
+
+
+def ndjson_response(items: AsyncIterator[BaseModel]) -> StreamingResponse:
+    """Stream models as newline-delimited JSON as they arrive."""
+    async def rows() -> AsyncIterator[bytes]:
+        chunk = []
+        flush_at = 1  # send the first row on its own so the client sees a byte right away
+        async for item in items:
+            chunk.append(item.model_dump_json())
+            if len(chunk) >= flush_at:
+                yield ("\n".join(chunk) + "\n").encode()
+                chunk = []
+                flush_at = CHUNK_ROWS
+        if chunk:
+            yield ("\n".join(chunk) + "\n").encode()
+
+    return StreamingResponse(rows(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,140 @@
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Dict, List
+import httpx
+from tqdm import tqdm
+
+# Order matters: every entity only points at entities loaded before it
+ENTITIES = ["users", "accounts", "leads", "opportunities", "deals", "activities"]
+ENDPOINTS = {
+    "users": "/users/bulk",
+    "accounts": "/accounts/bulk",
+    "leads": "/leads/bulk",
+    "opportunities": "/opportunities/bulk",
+    "deals": "/deals/bulk",
+    "activities": "/activities/bulk",
+}
+
+FIRST_NAMES = ["Ada", "Grace", "Alan", "Edsger", "Barbara", "Donald", "Margaret", "Linus", "Frances", "Ken"]
+LAST_NAMES = ["Lovelace", "Hopper", "Turing", "Dijkstra", "Liskov", "Knuth", "Hamilton", "Torvalds", "Allen", "Thompson"]
+COMPANY_WORDS = ["Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Hooli", "Vandelay", "Soylent", "Tyrell"]
+COMPANY_SUFFIXES = ["Corp", "Labs", "Systems", "Holdings", "Group", "Industries"]
+INDUSTRIES = ["software", "finance", "healthcare", "retail", "manufacturing", "energy"]
+SIZES = ["startup", "small", "mid-market", "large", "enterprise"]
+REGIONS = ["EU", "NA", "APAC", "LATAM"]
+ROLES = ["rep", "rep", "rep", "manager"]
+LEAD_STATUSES = ["New", "Contacted", "Qualified", "Lost", "Won"]
+LEAD_SOURCES = ["web", "referral", "webinar", "ads", "event"]
+STAGES = ["Prospecting", "Proposal", "Negotiation", "Closed Won", "Closed Lost"]
+DEAL_STATUSES = ["Open", "Won", "Lost"]
+ACTIVITY_TYPES = ["call", "email", "meeting", "note"]
+CHANNELS = ["phone", "email", "in-person", "video", "meeting"]
+
+
+@dataclass
+class Cardinalities:
+    """Graph size; the per-parent values are means, so 0.5 gives every other parent one child."""
+
+    users: int = 50
+    accounts: int = 200
+    leads_per_user: float = 40
+    opportunities_per_lead: float = 0.5
+    deals_per_opportunity: float = 0.6
+    activities_per_lead: float = 5
+    # Share of leads that belong to an account
+    account_coverage: float = 0.8
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _count(rng: random.Random, mean: float) -> int:
+    whole = int(mean)
+    return whole + (1 if rng.random() < mean - whole else 0)
+
+
+def _day(rng: random.Random, today: date, within_days: int) -> str:
+    return (today - timedelta(days=rng.randrange(within_days))).isoformat()
+
+
+def generate(cardinalities: Cardinalities, seed: int = 42, today: date = date(2025, 1, 1),
+             progress: bool = True) -> Dict[str, List[Dict]]:
+    """
+    Rows for every bulk endpoint, keyed by entity in load order. The same
+    cardinalities and seed always give the same graph.
+    """
+    rng = random.Random(seed)
+    c = cardinalities
+    data: Dict[str, List[Dict]] = {entity: [] for entity in ENTITIES}
+
+    for i in range(c.users):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        data["users"].append({
+            "id": f"user-{i:05d}", "name": f"{first} {last}", "role": rng.choice(ROLES),
+            "region": rng.choice(REGIONS), "email": f"{first}.{last}{i}@example.com".lower(),
+        })
+    for i in range(c.accounts):
+        data["accounts"].append({
+            "id": f"account-{i:05d}",
+            "name": f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)} {i}",
+            "industry": rng.choice(INDUSTRIES), "size": rng.choice(SIZES),
+            "revenue": round(rng.lognormvariate(15, 1.5), 2),
+        })
+
+    with tqdm(total=c.users, desc="generate", unit="user", disable=not progress) as bar:
+        for user in data["users"]:
+            for _ in range(_count(rng, c.leads_per_user)):
+                lead_id = f"lead-{len(data['leads']):07d}"
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                has_account = data["accounts"] and rng.random() < c.account_coverage
+                data["leads"].append({
+                    "id": lead_id, "name": f"{first} {last}",
+                    "email": f"{first}.{last}.{lead_id}@example.com".lower(),
+                    "source": rng.choice(LEAD_SOURCES), "status": rng.choice(LEAD_STATUSES),
+                    "value": round(rng.lognormvariate(9, 1), 2),
+                    "assigned_to": user["id"],
+                    "account_id": rng.choice(data["accounts"])["id"] if has_account else None,
+                })
+                for _ in range(_count(rng, c.activities_per_lead)):
+                    data["activities"].append({
+                        "id": f"activity-{len(data['activities']):08d}", "type": rng.choice(ACTIVITY_TYPES),
+                        "note": f"Follow-up with {first}", "timestamp": _day(rng, today, 180),
+                        "duration": float(rng.randrange(5, 90)), "channel": rng.choice(CHANNELS),
+                        "user_id": user["id"], "lead_id": lead_id,
+                    })
+                for _ in range(_count(rng, c.opportunities_per_lead)):
+                    opportunity_id = f"opportunity-{len(data['opportunities']):07d}"
+                    estimated = round(rng.lognormvariate(10, 1), 2)
+                    data["opportunities"].append({
+                        "id": opportunity_id, "name": f"{rng.choice(COMPANY_WORDS)} expansion",
+                        "stage": rng.choice(STAGES), "estimated_value": estimated,
+                        "probability": round(rng.random(), 2),
+                        "expected_close_date": _day(rng, today + timedelta(days=180), 360),
+                        "lead_id": lead_id,
+                    })
+                    for _ in range(_count(rng, c.deals_per_opportunity)):
+                        data["deals"].append({
+                            "id": f"deal-{len(data['deals']):07d}", "name": f"{rng.choice(COMPANY_WORDS)} deal",
+                            "amount": round(estimated * rng.uniform(0.5, 1.2), 2),
+                            "status": rng.choice(DEAL_STATUSES), "closed_date": _day(rng, today, 365),
+                            "opportunity_id": opportunity_id,
+                        })
+            bar.update()
+    return data
+
+
+async def load(client: httpx.AsyncClient, data: Dict[str, List[Dict]], batch_size: int = 1000,
+               progress: bool = True):
+    """Write the dataset through the bulk endpoints, so it works against any backend."""
+    for entity in ENTITIES:
+        rows = data[entity]
+        with tqdm(total=len(rows), desc=f"load {entity}", unit="row", disable=not progress) as bar:
+            for start in range(0, len(rows), batch_size):
+                chunk = rows[start:start + batch_size]
+                response = await client.post(ENDPOINTS[entity], json=chunk, params={"batch_size": batch_size})
+                response.raise_for_status()
+                failed = response.json()["failed"]
+                if failed:
+                    raise RuntimeError(f"{failed} {entity} rows were not loaded")
+                bar.update(len(chunk))
@@ -0,0 +1,93 @@
+import json
+import platform
+import resource
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import numpy as np
+from benchmarks.scenarios import ScenarioResult
+
+PERCENTILES = (50, 95, 99)
+# Lower is better for latencies, higher for throughput
+COMPARED = [("rps", 1), ("p50_ms", -1), ("p95_ms", -1), ("p99_ms", -1)]
+
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    if not seconds:
+        return {f"p{p}_ms": 0.0 for p in PERCENTILES} | {"mean_ms": 0.0, "max_ms": 0.0}
+    ms = np.asarray(seconds) * 1000
+    summary = {f"p{p}_ms": round(float(v), 3) for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES))}
+    return summary | {"mean_ms": round(float(ms.mean()), 3), "max_ms": round(float(ms.max()), 3)}
+
+
+def scenario_report(result: ScenarioResult) -> Dict:
+    every = [s for latencies in result.latencies.values() for s in latencies]
+    return {
+        "requests": result.requests,
+        "concurrency": result.concurrency,
+        "seconds": round(result.seconds, 3),
+        "rps": round(result.requests / result.seconds, 1) if result.seconds else 0.0,
+        "errors": sum(result.errors.values()),
+        "cpu_ms_per_request": round(result.cpu_seconds / result.requests * 1000, 3) if result.requests else 0.0,
+        **latency_summary(every),
+        "operations": {
+            op: {"requests": len(latencies), "errors": result.errors.get(op, 0), **latency_summary(latencies)}
+            for op, latencies in sorted(result.latencies.items())
+        },
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process; ru_maxrss is KiB on Linux and bytes on macOS."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+
+
+def build_report(results: List[ScenarioResult], config: Dict, dataset: Dict[str, int]) -> Dict:
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "dataset": dataset,
+        # In-process runs measure the app and the client together; live runs only the client
+        "peak_rss_mb": peak_rss_mb(),
+        "scenarios": {result.scenario: scenario_report(result) for result in results},
+    }
+
+
+def compare(baseline: Dict, current: Dict) -> List[str]:
+    """One line per scenario both reports ran, with the relative change of each headline number."""
+    lines = [f"baseline {baseline.get('commit')} -> current {current.get('commit')}"]
+    for name, now in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        parts = []
+        for key, better in COMPARED:
+            change = (now[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            verdict = "better" if change * better > 0 else "worse" if change else "same"
+            parts.append(f"{key} {before[key]:g} -> {now[key]:g} ({change:+.1f}%, {verdict})")
+        lines.append(f"{name:12} " + ", ".join(parts))
+    return lines
+
+
+def write_report(report: Dict, path: Optional[str]):
+    text = json.dumps(report, indent=2)
+    if path:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
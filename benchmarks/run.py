@@ -0,0 +1,110 @@
+"""
+Benchmark the API with a synthetic CRM graph.
+
+    python -m benchmarks.run                                  # in-process, in-memory backend
+    python -m benchmarks.run --backend neo4j                  # in-process against NEO4J_URI
+    python -m benchmarks.run --url http://localhost:8000 --skip-load
+    python -m benchmarks.run --output after.json --baseline before.json
+
+Writes a JSON report (latency percentiles, requests per second and peak RSS
+per scenario, plus the git commit) to --output, or stdout.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from contextlib import AsyncExitStack
+import httpx
+from app.utils import fast_json
+from benchmarks.generate import Cardinalities, generate, load
+from benchmarks.report import build_report, compare, write_report
+from benchmarks.scenarios import SCENARIOS, Context, run_scenario
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    defaults = Cardinalities()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_argument_group("target")
+    target.add_argument("--url", help="Benchmark a running server instead of the app in-process")
+    target.add_argument("--backend", choices=["memory", "neo4j"], default="memory",
+                        help="Repository backend for in-process runs")
+    data = parser.add_argument_group("dataset")
+    data.add_argument("--users", type=int, default=defaults.users)
+    data.add_argument("--accounts", type=int, default=defaults.accounts)
+    data.add_argument("--leads-per-user", type=float, default=defaults.leads_per_user)
+    data.add_argument("--opportunities-per-lead", type=float, default=defaults.opportunities_per_lead)
+    data.add_argument("--deals-per-opportunity", type=float, default=defaults.deals_per_opportunity)
+    data.add_argument("--activities-per-lead", type=float, default=defaults.activities_per_lead)
+    data.add_argument("--account-coverage", type=float, default=defaults.account_coverage)
+    data.add_argument("--seed", type=int, default=42)
+    data.add_argument("--load-batch-size", type=int, default=1000)
+    data.add_argument("--skip-load", action="store_true",
+                      help="The target already holds this dataset (same cardinalities and seed)")
+    run = parser.add_argument_group("run")
+    run.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                     help="Repeat for several; default: read-heavy, mixed and write-heavy")
+    run.add_argument("--requests", type=int, default=2000, help="Measured requests per scenario")
+    run.add_argument("--warmup", type=int, default=200, help="Unmeasured requests before each scenario")
+    run.add_argument("--concurrency", type=int, default=16)
+    run.add_argument("--timeout", type=float, default=30)
+    run.add_argument("--output", help="Write the JSON report here instead of stdout")
+    run.add_argument("--baseline", help="Earlier report to compare against (printed to stderr)")
+    run.add_argument("--quiet", action="store_true", help="No progress bars")
+    return parser.parse_args(argv)
+
+
+async def benchmark(args: argparse.Namespace) -> dict:
+    cardinalities = Cardinalities(
+        users=args.users, accounts=args.accounts, leads_per_user=args.leads_per_user,
+        opportunities_per_lead=args.opportunities_per_lead, deals_per_opportunity=args.deals_per_opportunity,
+        activities_per_lead=args.activities_per_lead, account_coverage=args.account_coverage,
+    )
+    progress = not args.quiet
+    data = generate(cardinalities, seed=args.seed, progress=progress)
+    scenarios = args.scenario or ["read-heavy", "mixed", "write-heavy"]
+
+    async with AsyncExitStack() as stack:
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout,
+                                       limits=httpx.Limits(max_connections=args.concurrency))
+        else:
+            from app.main import app
+            from app.repositories.registry import repos
+            repos.use(args.backend)
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                       timeout=args.timeout)
+        await stack.enter_async_context(client)
+
+        if not args.skip_load:
+            await load(client, data, batch_size=args.load_batch_size, progress=progress)
+        # New ids are unique per run, so repeated runs against one database do not collide
+        ctx = Context(data, random.Random(args.seed), run_id=f"{int(time.time()):x}")
+        results = [
+            await run_scenario(client, name, ctx, args.requests, args.concurrency, args.warmup, progress)
+            for name in scenarios
+        ]
+
+    config = {
+        "target": args.url or f"in-process ({args.backend})",
+        # Only known for in-process runs; a live server reads its own environment
+        "fast_json": None if args.url else fast_json.FAST_JSON,
+        "requests": args.requests, "warmup": args.warmup, "concurrency": args.concurrency,
+        "seed": args.seed, "cardinalities": cardinalities.as_dict(),
+    }
+    return build_report(results, config, {entity: len(rows) for entity, rows in data.items()})
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(benchmark(args))
+    write_report(report, args.output)
+    if args.baseline:
+        with open(args.baseline) as f:
+            print("\n".join(compare(json.load(f), report)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
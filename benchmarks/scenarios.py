@@ -0,0 +1,149 @@
+import asyncio
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Callable, Dict, List, Optional, Tuple
+import httpx
+from tqdm import tqdm
+from benchmarks.generate import CHANNELS, COMPANY_WORDS, FIRST_NAMES, LEAD_SOURCES, LEAD_STATUSES, STAGES
+
+# (method, url, params, json body)
+Call = Tuple[str, str, Optional[Dict], Optional[Dict]]
+
+
+class Context:
+    """What operations draw from: the loaded dataset's ids and a counter for new ones."""
+
+    def __init__(self, data: Dict[str, List[Dict]], rng: random.Random, run_id: str):
+        self.ids = {entity: [row["id"] for row in rows] for entity, rows in data.items()}
+        self.rng = rng
+        self.run_id = run_id
+        self.created = count()
+
+    def pick(self, entity: str) -> str:
+        return self.rng.choice(self.ids[entity])
+
+    def new_id(self, entity: str) -> str:
+        return f"bench-{self.run_id}-{entity}-{next(self.created)}"
+
+
+def get_by_id(ctx: Context) -> Call:
+    entity = ctx.rng.choice(["users", "leads", "accounts", "opportunities", "deals", "activities"])
+    return "GET", f"/{entity}/{ctx.pick(entity)}", None, None
+
+
+def list_page(ctx: Context) -> Call:
+    rng = ctx.rng
+    return rng.choice([
+        ("GET", "/leads/", {"status": rng.choice(LEAD_STATUSES), "limit": 50}, None),
+        ("GET", "/leads/", {"sort": "-value", "limit": 50}, None),
+        ("GET", "/opportunities/", {"stage": rng.choice(STAGES), "limit": 50}, None),
+        ("GET", "/deals/", {"amount_gte": 10000, "sort": "-amount", "limit": 50}, None),
+        ("GET", "/activities/", {"channel": rng.choice(CHANNELS), "limit": 50}, None),
+    ])
+
+
+def search(ctx: Context) -> Call:
+    entity, term = ctx.rng.choice([
+        ("leads", ctx.rng.choice(FIRST_NAMES)),
+        ("accounts", ctx.rng.choice(COMPANY_WORDS)),
+        ("opportunities", ctx.rng.choice(COMPANY_WORDS)),
+    ])
+    return "GET", f"/{entity}/search_name", {"name": term, "limit": 20}, None
+
+
+def create(ctx: Context) -> Call:
+    rng = ctx.rng
+    if rng.random() < 0.5:
+        lead_id = ctx.new_id("lead")
+        return "POST", "/leads/", None, {
+            "id": lead_id, "name": f"{rng.choice(FIRST_NAMES)} Bench", "email": f"{lead_id}@example.com",
+            "source": rng.choice(LEAD_SOURCES), "status": "New", "value": round(rng.uniform(1000, 50000), 2),
+            "assigned_to": ctx.pick("users"), "account_id": ctx.pick("accounts"),
+        }
+    return "POST", "/activities/", None, {
+        "id": ctx.new_id("activity"), "type": "call", "note": "Benchmark call", "duration": 15.0,
+        "channel": "phone", "user_id": ctx.pick("users"), "lead_id": ctx.pick("leads"),
+    }
+
+
+def update(ctx: Context) -> Call:
+    rng = ctx.rng
+    if rng.random() < 0.5:
+        return "PATCH", f"/leads/{ctx.pick('leads')}", None, {"status": rng.choice(LEAD_STATUSES)}
+    return "PATCH", f"/opportunities/{ctx.pick('opportunities')}", None, {
+        "stage": rng.choice(STAGES), "probability": round(rng.random(), 2),
+    }
+
+
+OPERATIONS: Dict[str, Callable[[Context], Call]] = {
+    "get": get_by_id,
+    "list": list_page,
+    "search": search,
+    "create": create,
+    "update": update,
+}
+
+# Scenario name -> operation weights
+SCENARIOS: Dict[str, Dict[str, float]] = {
+    "get": {"get": 1},
+    "list": {"list": 1},
+    "search": {"search": 1},
+    "create": {"create": 1},
+    "update": {"update": 1},
+    "read-heavy": {"get": 70, "list": 20, "search": 10},
+    "mixed": {"get": 40, "list": 15, "search": 10, "create": 20, "update": 15},
+    "write-heavy": {"get": 20, "create": 40, "update": 40},
+}
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    requests: int
+    concurrency: int
+    seconds: float = 0.0
+    # Process CPU time over the measured calls (app and client when in-process)
+    cpu_seconds: float = 0.0
+    # Operation -> latencies in seconds, and -> count of non-2xx responses
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, ctx: Context, requests: int,
+                       concurrency: int, warmup: int = 0, progress: bool = True) -> ScenarioResult:
+    """
+    Send `requests` calls drawn from the scenario's mix, `concurrency` at a
+    time. The sequence of calls only depends on the context's seed; the
+    first `warmup` calls are sent but not recorded.
+    """
+    weights = SCENARIOS[name]
+    plan = ctx.rng.choices(list(weights), weights=list(weights.values()), k=warmup + requests)
+    calls = [(op, OPERATIONS[op](ctx)) for op in plan]
+    result = ScenarioResult(name, requests, concurrency)
+
+    async def drive(batch: List[Tuple[str, Call]], record: bool, bar: tqdm):
+        queue = iter(batch)
+
+        async def worker():
+            for op, (method, url, params, body) in queue:
+                started = time.perf_counter()
+                response = await client.request(method, url, params=params, json=body)
+                elapsed = time.perf_counter() - started
+                if record:
+                    result.latencies[op].append(elapsed)
+                    if response.status_code >= 400:
+                        result.errors[op] += 1
+                bar.update()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    with tqdm(total=len(calls), desc=name, unit="req", disable=not progress) as bar:
+        await drive(calls[:warmup], False, bar)
+        started, cpu_started = time.perf_counter(), time.process_time()
+        await drive(calls[warmup:], True, bar)
+        result.seconds = time.perf_counter() - started
+        result.cpu_seconds = time.process_time() - cpu_started
+    return result
@@ -0,0 +1,120 @@
+"""
+CPU cost per row of the read path, with and without FAST_JSON.
+
+    python -m benchmarks.serialization --users 100 --page-size 500
+
+Pages through GET /leads/ in-process on the in-memory backend, once per
+mode, and reports CPU microseconds per row for the whole request and for
+building the models alone.
+"""
+import argparse
+import asyncio
+import platform
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+import httpx
+from benchmarks.generate import Cardinalities, generate, load
+from benchmarks.report import git_commit, peak_rss_mb, write_report
+
+MODES = {"validated": False, "fast": True}
+
+
+def cpu_per_row(seconds: float, rows: int) -> float:
+    return round(seconds / rows * 1e6, 3) if rows else 0.0
+
+
+async def page_through(client: httpx.AsyncClient, page_size: int) -> int:
+    rows, cursor = 0, None
+    while True:
+        params = {"limit": page_size, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/leads/", params=params)
+        response.raise_for_status()
+        page = response.json()
+        rows += len(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return rows
+
+
+async def http_cost(client: httpx.AsyncClient, page_size: int, rounds: int) -> Dict[str, float]:
+    """Best of `rounds` full passes over the leads, in CPU microseconds per row."""
+    best, rows = None, 0
+    for _ in range(rounds):
+        started = time.process_time()
+        rows = await page_through(client, page_size)
+        seconds = time.process_time() - started
+        best = seconds if best is None else min(best, seconds)
+    return {"rows": rows, "cpu_us_per_row": cpu_per_row(best, rows)}
+
+
+def build_cost(rows: List[Dict], rounds: int) -> float:
+    """Model construction alone: what the repositories do per database row."""
+    from app.models.lead import Lead
+    from app.utils.fast_json import to_model
+    best = None
+    for _ in range(rounds):
+        started = time.process_time()
+        for row in rows:
+            to_model(Lead, row)
+        seconds = time.process_time() - started
+        best = seconds if best is None else min(best, seconds)
+    return cpu_per_row(best, len(rows))
+
+
+async def benchmark(args: argparse.Namespace) -> Dict:
+    from app.main import app
+    from app.repositories.memory import MemoryGraph
+    from app.repositories.registry import repos
+    from app.utils import fast_json
+
+    cardinalities = Cardinalities(users=args.users, leads_per_user=args.leads_per_user)
+    data = generate(cardinalities, seed=args.seed, progress=not args.quiet)
+    now = datetime.now(timezone.utc)
+    stored = [{**lead, "score": None, "created_at": now, "updated_at": now} for lead in data["leads"]]
+
+    backend, graph = repos.backend, repos.graph
+    repos.use("memory", MemoryGraph())
+    previous, results = fast_json.FAST_JSON, {}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            await load(client, data, progress=not args.quiet)
+            for mode, enabled in MODES.items():
+                fast_json.FAST_JSON = enabled
+                await page_through(client, args.page_size)  # warm up
+                results[mode] = {
+                    **await http_cost(client, args.page_size, args.rounds),
+                    "build_cpu_us_per_row": build_cost(stored, args.rounds),
+                }
+    finally:
+        fast_json.FAST_JSON = previous
+        repos.use(backend, graph)
+
+    validated, fast = results["validated"]["cpu_us_per_row"], results["fast"]["cpu_us_per_row"]
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {"page_size": args.page_size, "rounds": args.rounds, "seed": args.seed,
+                   "cardinalities": cardinalities.as_dict()},
+        "peak_rss_mb": peak_rss_mb(),
+        "modes": results,
+        "speedup": round(validated / fast, 2) if fast else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--leads-per-user", type=float, default=100)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--quiet", action="store_true", help="No progress bars")
+    args = parser.parse_args(argv)
+    write_report(asyncio.run(benchmark(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Write throughput with and without the change feed, on Neo4j.
+
+    python -m benchmarks.writes --writers 1 --writers 16 --writers 64 --writes 2000
+
+Runs `--writes` single-account upserts from each number of concurrent
+writers, three ways:
+
+  no-feed          write(): the upsert alone
+  feed             tracked_write(): the upsert plus its pending change event;
+                   the sequencer numbers events after commit, off the write path
+  global-sequence  the upsert plus an event numbered inside the write itself
+                   under the (:Sequence) lock, as the feed used to do
+
+`feed` should track `no-feed` as writers are added, while `global-sequence`
+levels off at one commit per lock hold, whatever the concurrency. For `feed`
+the report also gives `drain_ms`, how long after the last write the last
+event got its sequence number.
+
+Uses NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD like the app. Run it against a
+scratch database: accounts and change events it writes are deleted at the
+end, but their sequence numbers are not given back.
+"""
+import argparse
+import asyncio
+import platform
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List
+from benchmarks.report import git_commit, latency_summary, write_report
+
+MODES = ["no-feed", "feed", "global-sequence"]
+
+UPSERT = """
+MERGE (a:Account {id:$id})
+ON CREATE SET a.created_at=datetime()
+SET a.updated_at=datetime(), a.name=$name
+RETURN a.id AS id
+"""
+
+# The append every tracked write made before sequencing moved off the write path
+GLOBAL_SEQUENCE_APPEND = """
+MERGE (s:Sequence {name: 'changes'})
+ON CREATE SET s.value = 0
+SET s._lock = true
+WITH s, s.value AS start
+SET s.value = start + size($events)
+REMOVE s._lock
+WITH start
+UNWIND range(0, size($events) - 1) AS i
+WITH start + i + 1 AS seq, $events[i] AS event
+CREATE (:Change {seq: seq, entity: event.entity, id: event.id, op: event.op,
+                 fields: event.fields, at: datetime()})
+"""
+
+CLEANUP = """
+MATCH (n) WHERE (n:Account OR n:Change) AND n.id STARTS WITH $prefix
+DETACH DELETE n
+"""
+
+
+async def run_mode(mode: str, writers: int, writes: int, prefix: str) -> Dict:
+    from app.utils import changes
+    from app.utils.query import write
+
+    async def upsert(index: int):
+        params = {"id": f"{prefix}{mode}-{writers}-{index}", "name": f"Account {index}"}
+        if mode == "no-feed":
+            await write(UPSERT, **params)
+        else:
+            await changes.tracked_write("account", "upsert", ["name"], UPSERT, **params)
+
+    latencies: List[float] = []
+
+    async def writer(indexes: range):
+        for index in indexes:
+            started = time.perf_counter()
+            await upsert(index)
+            latencies.append(time.perf_counter() - started)
+
+    current = changes.APPEND_CHANGES
+    if mode == "global-sequence":
+        changes.APPEND_CHANGES = GLOBAL_SEQUENCE_APPEND
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(writer(range(w, writes, writers)) for w in range(writers)))
+        seconds = time.perf_counter() - started
+        await changes.change_sequencer.drain()
+        drained = time.perf_counter() - started - seconds
+    finally:
+        changes.APPEND_CHANGES = current
+    result = {
+        "writers": writers,
+        "writes": writes,
+        "seconds": round(seconds, 3),
+        "writes_per_second": round(writes / seconds, 1) if seconds else 0.0,
+        **latency_summary(latencies),
+    }
+    if mode == "feed":
+        result["drain_ms"] = round(drained * 1000, 3)
+    return result
+
+
+async def benchmark(args: argparse.Namespace) -> Dict:
+    from app.db import close_driver, init_driver
+    from app.utils.query import write
+
+    prefix = f"bench-writes-{uuid.uuid4().hex[:8]}-"
+    await init_driver()
+    results: Dict[str, List[Dict]] = {mode: [] for mode in args.mode}
+    try:
+        for writers in args.writers:
+            for mode in args.mode:
+                results[mode].append(await run_mode(mode, writers, args.writes, prefix))
+                if not args.quiet:
+                    rate = results[mode][-1]["writes_per_second"]
+                    print(f"{mode:>16} x{writers:<4} {rate:>10} writes/s", file=sys.stderr)
+    finally:
+        await write(CLEANUP, prefix=prefix)
+        await close_driver()
+
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {"writers": args.writers, "writes": args.writes},
+        "modes": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, action="append",
+                        help="Concurrent writers; repeat to sweep (default 1, 4, 16, 64)")
+    parser.add_argument("--writes", type=int, default=2000, help="Upserts per mode and writer count")
+    parser.add_argument("--mode", action="append", choices=MODES, help="Repeat to pick several (default: all)")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--quiet", action="store_true", help="No per-run lines")
+    args = parser.parse_args(argv)
+    args.writers = args.writers or [1, 4, 16, 64]
+    args.mode = args.mode or MODES
+    write_report(asyncio.run(benchmark(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()